@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures as _fut
+import threading
+import warnings
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .errors import SupRuntimeError
+
+# Seconds ``shutdown`` lets tasks the script never awaited run before cancelling them
+_DRAIN_SECONDS = 30.0
+
+
+class AsyncRuntime:
+    """An asyncio event loop running on a background thread.
+
+    Scripts get ``concurrent.futures.Future`` objects back, so the tree-walking
+    interpreter can block on them from its own thread. ``concurrency`` bounds how
+    many tasks run at once (blocking work shares an executor of the same size), and
+    every task is wrapped in ``asyncio.wait_for`` with its timeout.
+    """
+
+    def __init__(self, *, concurrency: int = 64) -> None:
+        self.concurrency = max(1, int(concurrency))
+        self._loop = asyncio.new_event_loop()
+        self._executor = _fut.ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="sup-async-io"
+        )
+        self._loop.set_default_executor(self._executor)
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sup-async", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        self._sem = asyncio.run_coroutine_threadsafe(
+            self._make_semaphore(), self._loop
+        ).result()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(self._ready.set)
+        self._loop.run_forever()
+
+    async def _make_semaphore(self) -> asyncio.Semaphore:
+        return asyncio.Semaphore(self.concurrency)
+
+    def submit(
+        self, make: Callable[[], Awaitable[Any]], *, timeout: float | None = None
+    ) -> _fut.Future:
+        async def guarded() -> Any:
+            async with self._sem:
+                try:
+                    return await asyncio.wait_for(make(), timeout)
+                except asyncio.TimeoutError:
+                    raise _timed_out(timeout)
+
+        return asyncio.run_coroutine_threadsafe(guarded(), self._loop)
+
+    def run_blocking(
+        self, fn: Callable[..., Any], *args: Any, timeout: float | None = None
+    ) -> _fut.Future:
+        """Run ``fn`` on the executor; its slot stays taken until the thread returns.
+
+        A timeout fails the task, but the thread cannot be interrupted, so the
+        slot is only given back once ``fn`` finishes.
+        """
+
+        def finished(work: asyncio.Future) -> None:
+            self._sem.release()
+            if not work.cancelled():
+                work.exception()  # retrieved, so a late failure is not logged
+
+        async def guarded() -> Any:
+            await self._sem.acquire()
+            work = self._loop.run_in_executor(None, fn, *args)
+            work.add_done_callback(finished)
+            try:
+                return await asyncio.wait_for(asyncio.shield(work), timeout)
+            except asyncio.TimeoutError:
+                raise _timed_out(timeout)
+
+        return asyncio.run_coroutine_threadsafe(guarded(), self._loop)
+
+    def subprocess(self, cmd: str, *, timeout: float | None = None) -> _fut.Future:
+        async def run() -> dict[str, str | int]:
+            proc = await asyncio.create_subprocess_shell(
+                cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                out, err = await proc.communicate()
+            except asyncio.CancelledError:
+                proc.kill()
+                await proc.wait()
+                raise
+            return {
+                "code": int(proc.returncode or 0),
+                "out": out.decode("utf-8", "replace"),
+                "err": err.decode("utf-8", "replace"),
+            }
+
+        return self.submit(run, timeout=timeout)
+
+    def shutdown(self) -> None:
+        """Stop the loop once pending tasks finish.
+
+        Tasks the script started but never awaited still run, each within its
+        own timeout; any left after ``_DRAIN_SECONDS`` are cancelled with a
+        ``RuntimeWarning``.
+        """
+        if not self._loop.is_running():
+            return
+
+        async def drain() -> None:
+            tasks = [
+                t for t in asyncio.all_tasks() if t is not asyncio.current_task()
+            ]
+            if not tasks:
+                return
+            _done, pending = await asyncio.wait(tasks, timeout=_DRAIN_SECONDS)
+            if pending:
+                warnings.warn(
+                    f"Cancelled {len(pending)} async task(s) still running at exit.",
+                    RuntimeWarning,
+                    stacklevel=2,
+                )
+                for t in pending:
+                    t.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(drain(), self._loop).result(
+                _DRAIN_SECONDS + 5
+            )
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        # Closing a loop that is still running raises; leave it to the daemon thread
+        if not self._thread.is_alive():
+            self._loop.close()
+
+
+def _timed_out(timeout: float | None) -> SupRuntimeError:
+    return SupRuntimeError(message=f"Async task timed out after {timeout:g}s.")
+
+
+def wait_all(futures: list[_fut.Future]) -> list[object]:
+    """Results in submission order; the first failure (in that order) is raised."""
+    _fut.wait(futures)
+    return [f.result() for f in futures]
+
+
+def wait_first(futures: list[_fut.Future]) -> object:
+    """Result of the first task to succeed; the remaining tasks are cancelled."""
+    pending = set(futures)
+    error: BaseException | None = None
+    try:
+        while pending:
+            done, pending = _fut.wait(pending, return_when=_fut.FIRST_COMPLETED)
+            for f in futures:
+                if f in done:
+                    if f.cancelled():
+                        continue
+                    exc = f.exception()
+                    if exc is None:
+                        return f.result()
+                    if error is None:
+                        error = exc
+        if error is not None:
+            raise error
+        raise SupRuntimeError(message="await first: all tasks were cancelled.")
+    finally:
+        for f in pending:
+            f.cancel()
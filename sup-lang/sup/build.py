@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import marshal
+import os
+import re
+import stat
+import sys
+import tempfile
+import time
+import zipfile
+from dataclasses import dataclass, field
+from types import CodeType
+
+from . import loader
+
+# Build graph stored in the output directory: per module, the source hash it
+# was built from, its imports and the files it produced
+GRAPH_FILE = ".sup-build.json"
+_GRAPH_VERSION = 1
+
+
+@dataclass
+class BuildStats:
+    modules: int = 0
+    rebuilt: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    # py module name -> milliseconds spent parsing and emitting it
+    module_ms: dict[str, float] = field(default_factory=dict)
+    ms: float = 0.0
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.modules} modules: {len(self.rebuilt)} rebuilt, "
+            f"{len(self.unchanged)} unchanged, {len(self.removed)} removed "
+            f"in {self.ms:.1f} ms"
+        ]
+        for name in self.rebuilt:
+            lines.append(f"  rebuilt {name} ({self.module_ms.get(name, 0.0):.1f} ms)")
+        for name in self.removed:
+            lines.append(f"  removed {name}")
+        return "\n".join(lines)
+
+
+def sanitize_module(name: str) -> str:
+    safe = re.sub(r"[^0-9A-Za-z_]", "_", name)
+    if not re.match(r"[A-Za-z_]", safe):
+        safe = "m_" + safe
+    return safe
+
+
+def resolve_module(module: str) -> str:
+    # Search SUP_PATH then CWD for module.sup
+    search_paths = loader.search_paths()
+    path = loader.resolve(module, search_paths)
+    if path is None:
+        raise FileNotFoundError(
+            f"Cannot find module '{module}' (searched {search_paths})"
+        )
+    return path
+
+
+def _load_graph(out_dir: str, emitter: str) -> dict[str, dict]:
+    try:
+        with open(os.path.join(out_dir, GRAPH_FILE), encoding="utf-8") as f:
+            graph = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Output from another emitter is stale as a whole
+    if graph.get("version") != _GRAPH_VERSION or graph.get("emitter") != emitter:
+        return {}
+    modules = graph.get("modules")
+    return modules if isinstance(modules, dict) else {}
+
+
+def _write_atomic(path: str, text: str) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _transpile_module(
+    source: str, src_path: str, py_module: str, out_dir: str, exports: bool
+) -> tuple[list[str], float]:
+    """Parse and emit one module into ``out_dir``; returns (imports, ms).
+
+    Runs in build workers, so it only takes and returns plain data.
+    """
+    from .parser import Parser
+    from .transpiler import build_sourcemap_mappings, to_python_with_map
+
+    t0 = time.perf_counter()
+    program = Parser().parse(source)
+    py_path = os.path.join(out_dir, f"{py_module}.py")
+    # Imported modules keep top-level names global so importers can read them
+    py_code, src_lines, src_cols = to_python_with_map(program, exports=exports)
+    _write_atomic(py_path, py_code)
+    sm = {
+        "version": 3,
+        "file": os.path.basename(py_path),
+        "sources": [os.path.basename(src_path)],
+        "names": [],
+        "mappings": build_sourcemap_mappings(src_lines, src_cols),
+    }
+    _write_atomic(py_path + ".map", json.dumps(sm))
+    return loader.imports_of(program), (time.perf_counter() - t0) * 1000
+
+
+def build_project(entry_file: str, out_dir: str, *, jobs: int | None = None) -> BuildStats:
+    """Transpile ``entry_file`` and every module it imports into ``out_dir``.
+
+    Modules whose source hash matches the build graph from the previous run (and
+    whose outputs still exist) are skipped without parsing; their recorded imports
+    are followed instead. Generated Python resolves imports at run time, so a
+    change to one module never requires re-emitting its importers. Changed
+    modules are transpiled on up to ``jobs`` worker processes (default: one per
+    CPU). Outputs of modules no longer reachable from the entry are deleted.
+    """
+    import concurrent.futures as _fut
+
+    from .pybackend import emitter_tag
+
+    t_start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    emitter = emitter_tag()
+    previous = _load_graph(out_dir, emitter)
+    graph: dict[str, dict] = {}
+    stats = BuildStats()
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    pool: _fut.ProcessPoolExecutor | None = None
+    futures: dict[_fut.Future, str] = {}
+    seen: set[str] = set()
+
+    def visit(path: str, exports: bool) -> None:
+        nonlocal pool
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        py_module = sanitize_module(module_name)
+        if py_module in seen:
+            return
+        seen.add(py_module)
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        entry = {
+            "source": os.path.abspath(path),
+            "sha256": digest,
+            "exports": exports,
+            "imports": [],
+            "outputs": [f"{py_module}.py", f"{py_module}.py.map"],
+        }
+        graph[py_module] = entry
+        old = previous.get(py_module)
+        if (
+            old is not None
+            and old.get("sha256") == digest
+            and old.get("exports") == exports
+            and old.get("source") == entry["source"]
+            and all(os.path.exists(os.path.join(out_dir, o)) for o in entry["outputs"])
+        ):
+            entry["imports"] = list(old.get("imports", []))
+            stats.unchanged.append(py_module)
+            follow(entry["imports"])
+            return
+        args = (source, path, py_module, out_dir, exports)
+        if jobs == 1:
+            entry["imports"], stats.module_ms[py_module] = _transpile_module(*args)
+            stats.rebuilt.append(py_module)
+            follow(entry["imports"])
+            return
+        if pool is None:
+            pool = _fut.ProcessPoolExecutor(max_workers=jobs)
+        futures[pool.submit(_transpile_module, *args)] = py_module
+
+    def follow(imports: list[str]) -> None:
+        for mod in imports:
+            if sanitize_module(mod) not in seen:
+                visit(resolve_module(mod), exports=True)
+
+    try:
+        visit(entry_file, exports=False)
+        while futures:
+            done, _ = _fut.wait(futures, return_when=_fut.FIRST_COMPLETED)
+            for f in done:
+                py_module = futures.pop(f)
+                imports, ms = f.result()
+                graph[py_module]["imports"] = imports
+                stats.module_ms[py_module] = ms
+                stats.rebuilt.append(py_module)
+                follow(imports)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    for py_module, old in previous.items():
+        if py_module in graph:
+            continue
+        for out in old.get("outputs", []):
+            try:
+                os.remove(os.path.join(out_dir, out))
+            except OSError:
+                pass
+        stats.removed.append(py_module)
+
+    # Write a simple runner; importing the entry module runs the program
+    entry_py = sanitize_module(os.path.splitext(os.path.basename(entry_file))[0])
+    runner = f"if __name__ == '__main__':\n    import {entry_py}  # noqa: F401\n"
+    run_path = os.path.join(out_dir, "run.py")
+    try:
+        with open(run_path, encoding="utf-8") as f:
+            current = f.read()
+    except OSError:
+        current = None
+    if current != runner:
+        _write_atomic(run_path, runner)
+    _write_atomic(
+        os.path.join(out_dir, GRAPH_FILE),
+        json.dumps(
+            {"version": _GRAPH_VERSION, "emitter": emitter, "entry": entry_py, "modules": graph},
+            indent=2,
+            sort_keys=True,
+        ),
+    )
+    stats.modules = len(graph)
+    stats.rebuilt.sort()
+    stats.unchanged.sort()
+    stats.removed.sort()
+    stats.ms = (time.perf_counter() - t_start) * 1000
+    return stats
+
+
+# Name of the manifest stored at the root of bundles
+MANIFEST_FILE = "sup-bundle.json"
+
+
+def _pyc(code: CodeType) -> bytes:
+    # Timestamp-style header with no source to validate against: zipimport loads
+    # sourceless .pyc files as long as the magic number matches
+    return importlib.util.MAGIC_NUMBER + bytes(12) + marshal.dumps(code)
+
+
+def bundle(out_dir: str, target: str) -> dict[str, object]:
+    """Pack a build in ``out_dir`` into an executable zipapp at ``target``.
+
+    The archive holds every module of the build graph (in the ``_sup_mod``
+    package) and the ``sup`` runtime package as precompiled ``.pyc`` files, plus
+    a manifest. At startup Python imports straight from the archive, so nothing
+    is parsed or compiled and ``SUP_PATH`` is never searched. Module code keeps
+    sup line numbers. The bundle only runs on the Python minor version that
+    built it. Returns the manifest.
+    """
+    from .pybackend import MODULE_PACKAGE, compile_source
+
+    with open(os.path.join(out_dir, GRAPH_FILE), encoding="utf-8") as f:
+        graph = json.load(f)
+    entry = graph["entry"]
+    files: dict[str, bytes] = {}
+    modules: dict[str, str] = {}
+    for py_module, info in sorted(graph["modules"].items()):
+        with open(info["source"], encoding="utf-8") as f:
+            source = f.read()
+        # Compile from the sup source so tracebacks name the .sup file and line
+        code = compile_source(
+            source, os.path.basename(info["source"]), exports=bool(info["exports"])
+        )
+        files[f"{MODULE_PACKAGE}/{py_module}.pyc"] = _pyc(code)
+        modules[py_module] = info["sha256"]
+    files[f"{MODULE_PACKAGE}/__init__.pyc"] = _pyc(compile("", "__init__.py", "exec"))
+
+    pkg_dir = os.path.dirname(os.path.abspath(__file__))
+    for root, dirs, names in os.walk(pkg_dir):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        for name in sorted(names):
+            full = os.path.join(root, name)
+            rel = os.path.relpath(full, os.path.dirname(pkg_dir)).replace(os.sep, "/")
+            if name.endswith(".py"):
+                with open(full, encoding="utf-8") as f:
+                    code = compile(f.read(), rel, "exec", dont_inherit=True)
+                files[rel[:-3] + ".pyc"] = _pyc(code)
+            elif not name.endswith((".pyc", ".pyo")):
+                with open(full, "rb") as f:
+                    files[rel] = f.read()
+
+    version = sys.version_info[:2]
+    main_src = (
+        "import sys\n"
+        f"if sys.version_info[:2] != {version!r}:\n"
+        f"    sys.exit('This bundle was built for Python {version[0]}.{version[1]}')\n"
+        f"import {MODULE_PACKAGE}.{entry}  # noqa: F401\n"
+    )
+    files["__main__.pyc"] = _pyc(compile(main_src, "__main__.py", "exec", dont_inherit=True))
+    from . import __version__
+
+    manifest: dict[str, object] = {
+        "entry": entry,
+        "modules": modules,
+        "python": f"{version[0]}.{version[1]}",
+        "sup": __version__,
+    }
+    files[MANIFEST_FILE] = json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(target)), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(b"#!/usr/bin/env python3\n")
+        with zipfile.ZipFile(f, "w", compression=zipfile.ZIP_STORED) as zf:
+            for name in sorted(files):
+                # Fixed timestamps keep bundles byte-for-byte reproducible
+                info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+                info.compress_type = zipfile.ZIP_STORED
+                zf.writestr(info, files[name])
+    mode = os.stat(tmp).st_mode
+    os.chmod(tmp, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    os.replace(tmp, target)
+    return manifest
+
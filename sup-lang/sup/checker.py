@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from . import tooling
+
+
+@dataclass
+class Diagnostic:
+    path: str
+    line: int | None
+    column: int | None
+    code: str
+    message: str
+
+    def __str__(self) -> str:
+        loc = f"{self.path}:{self.line}" if self.line else self.path
+        return f"{loc}: {self.code}: {self.message}"
+
+
+def _typecheck(program: Any) -> list[Any]:
+    try:
+        from .typecheck import check
+    except ImportError:  # pragma: no cover - typecheck is optional
+        return []
+    from .memo import check as check_cached
+
+    # Imported modules come from the loader's cache; CheckCache records them as
+    # dependencies of the result
+    issues = list(check(program, imports="load")) + check_cached(program)
+    return sorted(issues, key=lambda e: e.line or 0)
+
+
+def check_source(source: str, path: str) -> list[Diagnostic]:
+    """Parse and type-check one file's text."""
+    return _check(source, path)[0]
+
+
+def _check(source: str, path: str) -> tuple[list[Diagnostic], list[tuple[str, str, str]]]:
+    """Diagnostics for one file's text, plus the modules they depend on."""
+    from .errors import SupSyntaxError
+
+    try:
+        program = tooling.parser().parse(source)
+    except SupSyntaxError as e:
+        return [Diagnostic(path, e.line, e.column, "SYNTAX", e.message)], []
+    diags = [
+        Diagnostic(path, getattr(e, "line", None), getattr(e, "column", None), e.code, e.message)
+        for e in _typecheck(program)
+    ]
+    return diags, tooling.dependencies(program)
+
+
+def _check_job(job: tuple[str, str]) -> tuple[list[Diagnostic], list[tuple[str, str, str]]]:
+    path, source = job
+    return _check(source, path)
+
+
+def _checker_tag() -> str:
+    # Diagnostics change with the parser, the type checker and the lexicon
+    tag = tooling.source_tag(["checker.py", "parser.py", "typecheck.py", "memo.py"])
+    return f"{tag}|{tooling.lexicon_hash()}"
+
+
+class CheckCache:
+    """Diagnostics keyed by file content, valid for one parser/checker/lexicon.
+
+    An entry also records the modules the file imports, transitively, and is
+    only used while each still resolves to the same content.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.tag = _checker_tag()
+        data = tooling.load_json(path)
+        if data.get("tag") != self.tag:
+            data = {}
+        self._old: dict[str, dict[str, Any]] = data.get("files", {})
+        # Only entries used by this run are written back, so the file stays small
+        self._new: dict[str, dict[str, Any]] = {}
+        self._hashes: dict[str, str | None] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(source: str) -> str:
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    def _hash(self, path: str) -> str | None:
+        if path not in self._hashes:
+            try:
+                self._hashes[path] = tooling.sha256_file(path)
+            except OSError:
+                self._hashes[path] = None
+        return self._hashes[path]
+
+    def get(self, key: str, path: str) -> list[Diagnostic] | None:
+        entry = self._old.get(key, self._new.get(key))
+        if entry is None or not tooling.dependencies_unchanged(entry["deps"], self._hash):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._new[key] = entry
+        return [Diagnostic(path, *row) for row in entry["diags"]]
+
+    def put(
+        self, key: str, diags: list[Diagnostic], deps: list[tuple[str, str, str]]
+    ) -> None:
+        self._new[key] = {
+            "diags": [[d.line, d.column, d.code, d.message] for d in diags],
+            "deps": [list(d) for d in deps],
+        }
+
+    def save(self) -> None:
+        tooling.save_json(self.path, {"tag": self.tag, "files": self._new})
+
+
+def default_cache_path(paths: list[str]) -> str:
+    """Cache file under ``SUP_CHECK_CACHE`` or ~/.cache/sup/check for these paths."""
+    return tooling.cache_path("SUP_CHECK_CACHE", "check", paths)
+
+
+def check_files(
+    files: list[str], *, jobs: int = 1, cache: CheckCache | None = None
+) -> list[Diagnostic]:
+    """Diagnostics for ``files`` in file order; cached files are not parsed.
+
+    Files left to check are parsed on up to ``jobs`` processes.
+    """
+    per_file: list[list[Diagnostic] | None] = [None] * len(files)
+    todo: list[tuple[int, str, str]] = []
+    for i, path in enumerate(files):
+        try:
+            with open(path, encoding="utf-8") as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            per_file[i] = [Diagnostic(path, None, None, "IO", str(e))]
+            continue
+        key = CheckCache.key(source)
+        hit = cache.get(key, path) if cache is not None else None
+        if hit is not None:
+            per_file[i] = hit
+        else:
+            todo.append((i, key, source))
+
+    jobs_list = [(files[i], source) for i, _key, source in todo]
+    jobs = max(1, min(jobs, len(todo)))
+    if jobs == 1:
+        checked = [_check_job(job) for job in jobs_list]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunk = max(1, min(32, len(todo) // (jobs * 4)))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            checked = list(pool.map(_check_job, jobs_list, chunksize=chunk))
+    for (i, key, _source), (diags, deps) in zip(todo, checked):
+        per_file[i] = diags
+        if cache is not None:
+            cache.put(key, diags, deps)
+    if cache is not None:
+        cache.save()
+    return [d for diags in per_file for d in (diags or [])]
+
+
+def json_report(files: list[str], diags: list[Diagnostic]) -> str:
+    return json.dumps(
+        {"files": len(files), "diagnostics": [asdict(d) for d in diags]}, indent=2
+    )
@@ -0,0 +1,732 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+from . import __version__
+from .errors import SupError
+from .interpreter import Interpreter
+
+from .optimizer import optimize_ex
+from .parser import AST  # type: ignore
+from .parser import Parser
+from .transpiler import to_python, to_python_with_map
+
+
+def run_source(
+    source: str,
+    *,
+    stdin: str | None = None,
+    emit: str | None = None,
+    backend: str = "interp",
+) -> str:
+    if backend == "python" and emit is None:
+        import contextlib
+        import io
+
+        from . import pybackend
+
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            pybackend.run_source(source, stdin=stdin)
+        return buf.getvalue()
+    parser = Parser()
+    program = parser.parse(source)
+    if emit == "python":
+        return to_python(program)
+    interpreter = Interpreter()
+    return interpreter.run(program, stdin=stdin)
+
+
+def run_file(path: str) -> int:
+    try:
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        output = run_source(source)
+        if output:
+            sys.stdout.write(output)
+        return 0
+    except SupError as e:
+        sys.stderr.write(str(e) + "\n")
+        return 2
+    except Exception as e:
+        # Catch-all to avoid hanging on unexpected exceptions
+        sys.stderr.write(str(e) + "\n")
+        return 2
+
+
+def _run_profiled(program: AST.Program, path: str, out_path: str | None) -> int:
+    from .profiler import ProfilingInterpreter
+
+    interp = ProfilingInterpreter(path)
+    try:
+        out = interp.run(program)
+        if out:
+            sys.stdout.write(out)
+    finally:
+        # Failed runs are profiled too, up to the error
+        prof = interp._profiler
+        sys.stderr.write(prof.report())
+        if out_path:
+            if out_path.lower().endswith(".json"):
+                prof.dump_json(out_path)
+            else:
+                prof.dump_pstats(out_path)
+    return 0
+
+
+def _run_sampled(program: AST.Program, args: argparse.Namespace) -> int:
+    from .profiler import Sampler
+
+    sampler = Sampler(args.file, interval=args.sample_interval / 1000, mode=args.sample_mode)
+    interp = Interpreter()
+    sampler.start()
+    try:
+        out = interp.run(program)
+    finally:
+        sampler.stop()
+        sys.stderr.write(sampler.report())
+        if args.sample_out:
+            sampler.dump(args.sample_out)
+    if out:
+        sys.stdout.write(out)
+    return 0
+
+
+def repl() -> int:
+    print("sup (type 'bye' to exit)")
+    buffer: list[str] = []
+    while True:
+        try:
+            line = input("> ")
+        except EOFError:
+            print()
+            break
+        if line.strip().lower() == "bye":
+            break
+        buffer.append(line)
+        if line.strip().lower() == "bye":
+            # unreachable due to break above, kept for clarity
+            pass
+        # Execute when a program block is complete: detect lines starting with 'sup' and ending with 'bye'
+        src = "\n".join(buffer)
+        if (
+            "\n" in src
+            and src.strip().lower().startswith("sup")
+            and src.strip().lower().endswith("bye")
+        ):
+            try:
+                out = run_source(src)
+                if out:
+                    print(out, end="")
+            except SupError as e:
+                print(str(e))
+            except Exception as e:
+                print(str(e))
+            buffer.clear()
+    return 0
+
+
+def _resolve_module_path(module: str) -> str:
+    from .build import resolve_module
+
+    return resolve_module(module)
+
+
+def _gather_imports(program: AST.Program, acc: set[str]) -> None:
+    def walk(node: AST.Node) -> None:  # type: ignore[override]
+        if isinstance(node, AST.Import):
+            acc.add(node.module)
+        elif isinstance(node, AST.FromImport):
+            acc.add(node.module)
+        # Recurse into composite nodes
+        for attr in (
+            "statements",
+            "body",
+            "else_body",
+            "count_expr",
+            "expr",
+            "left",
+            "right",
+            "iterable",
+        ):
+            if hasattr(node, attr):
+                val = getattr(node, attr)
+                if isinstance(val, list):
+                    for x in val:
+                        if isinstance(x, AST.Node):
+                            walk(x)
+                elif isinstance(val, AST.Node):
+                    walk(val)
+        # Also check common fields that are lists of nodes
+        if isinstance(node, AST.Program):
+            for s in node.statements:
+                walk(s)
+
+    walk(program)  # type: ignore[arg-type]
+
+
+def transpile_project(entry_file: str, out_dir: str, *, jobs: int | None = None):
+    """Incrementally transpile ``entry_file`` and its imports; returns BuildStats."""
+    from .build import build_project
+
+    return build_project(entry_file, out_dir, jobs=jobs)
+
+
+def main(argv: list[str] | None = None) -> int:
+    # Make CLI robust: treat 'transpile' as a dedicated mode; otherwise accept 'file' and '--emit'.
+    if argv is None:
+        argv = sys.argv[1:]
+
+    # Route explicitly to transpile mode if first token is 'transpile'
+    if len(argv) > 0 and argv[0] == "transpile":
+        p_tr = argparse.ArgumentParser(
+            prog="sup transpile",
+            description="Transpile a sup program (and its imports) to Python files",
+        )
+        p_tr.add_argument("entry", help="Entry .sup file")
+        p_tr.add_argument("--out", required=True, help="Output directory for .py files")
+        p_tr.add_argument(
+            "-j", "--jobs", type=int, help="Worker processes (default: one per CPU)"
+        )
+        p_tr.add_argument(
+            "--stats", action="store_true", help="Report rebuilt modules and timings"
+        )
+        tr_args = p_tr.parse_args(argv[1:])
+        try:
+            stats = transpile_project(tr_args.entry, tr_args.out, jobs=tr_args.jobs)
+            print(f"Transpiled to {tr_args.out}")
+            if tr_args.stats:
+                print(stats.summary())
+            return 0
+        except Exception as e:
+            sys.stderr.write(str(e) + "\n")
+            return 2
+
+    # Package/typecheck subcommands: build, lock, test, publish, check, init, install
+    if len(argv) > 0 and argv[0] in {
+        "build",
+        "lock",
+        "test",
+        "publish",
+        "check",
+        "init",
+        "install",
+    }:
+        cmd = argv[0]
+        if cmd == "install":
+            p = argparse.ArgumentParser(
+                prog="sup install",
+                description="Install a SUP module from a local directory or HTTP registry",
+            )
+            p.add_argument(
+                "name", help="Module name to install (optionally name@version)"
+            )
+            p.add_argument(
+                "--registry",
+                default=os.path.join(os.getcwd(), "registry"),
+                help="Path to local registry or HTTP base URL (default: ./registry)",
+            )
+            args_i2 = p.parse_args(argv[1:])
+            try:
+                name_ver = args_i2.name
+                if "@" in name_ver:
+                    name, ver = name_ver.split("@", 1)
+                else:
+                    name, ver = name_ver, None
+                # local dir registry
+                if args_i2.registry.startswith(
+                    "http://"
+                ) or args_i2.registry.startswith("https://"):
+                    import json as _json
+                    import urllib.request as _u
+
+                    meta_url = (
+                        args_i2.registry.rstrip("/")
+                        + f"/resolve?name={name}&version={ver or '*'}"
+                    )
+                    with _u.urlopen(meta_url) as r:
+                        if r.getcode() // 100 != 2:
+                            raise RuntimeError("Registry resolve failed")
+                        meta = _json.loads(r.read().decode("utf-8"))
+                    src_code = meta.get("source", "")
+                    if not src_code:
+                        raise RuntimeError("Registry returned empty source")
+                else:
+                    reg_dir = os.path.abspath(args_i2.registry)
+                    cand = os.path.join(reg_dir, f"{name}.sup")
+                    if not os.path.exists(cand):
+                        raise FileNotFoundError(
+                            f"Module '{name}' not found in {reg_dir}"
+                        )
+                    src_code = open(cand, encoding="utf-8").read()
+                # Write to project
+                dst = os.path.join(os.getcwd(), f"{name}.sup")
+                with open(dst, "w", encoding="utf-8") as wf:
+                    wf.write(src_code)
+                # Update lockfile v2 (JSON)
+                import hashlib as _hh
+                import json as _json
+
+                h = _hh.sha256(src_code.encode("utf-8")).hexdigest()
+                lock_path = os.path.join(os.getcwd(), "sup.lock.json")
+                lock: dict = {"version": 2, "modules": {}}
+                if os.path.exists(lock_path):
+                    try:
+                        lock = _json.loads(open(lock_path, encoding="utf-8").read())
+                    except Exception:
+                        pass
+                lock.setdefault("modules", {})[name] = {
+                    "sha256": h,
+                    "source": "url" if args_i2.registry.startswith("http") else "local",
+                    "version": ver or "*",
+                }
+                with open(lock_path, "w", encoding="utf-8") as lf:
+                    lf.write(_json.dumps(lock, indent=2))
+                print(f"Installed {name} -> {dst}")
+                return 0
+            except Exception as e:
+                sys.stderr.write(str(e) + "\n")
+                return 2
+        if cmd == "check":
+            p = argparse.ArgumentParser(
+                prog="sup check", description="Static checks for SUP files"
+            )
+            p.add_argument(
+                "paths", nargs="+", metavar="path", help=".sup files or directories to check"
+            )
+            p.add_argument(
+                "-j", "--jobs", type=int, help="Worker processes (default: one per CPU)"
+            )
+            p.add_argument(
+                "--format",
+                choices=["text", "json"],
+                default="text",
+                help="Diagnostics as text lines (default) or one JSON document",
+            )
+            p.add_argument(
+                "--no-cache", action="store_true", help="Re-check files whose content is unchanged"
+            )
+            args_c = p.parse_args(argv[1:])
+            try:
+                from . import checker, tooling
+
+                files = tooling.discover(args_c.paths)
+                cache = None
+                if not args_c.no_cache:
+                    cache = checker.CheckCache(checker.default_cache_path(args_c.paths))
+                diags = checker.check_files(
+                    files, jobs=args_c.jobs or os.cpu_count() or 1, cache=cache
+                )
+                if args_c.format == "json":
+                    print(checker.json_report(files, diags))
+                else:
+                    for d in diags:
+                        print(d)
+                return 1 if diags else 0
+            except Exception as e:
+                sys.stderr.write(str(e) + "\n")
+                return 2
+        if cmd == "build":
+            p = argparse.ArgumentParser(
+                prog="sup build", description="Build a SUP project"
+            )
+            p.add_argument("entry", help="Entry .sup file")
+            p.add_argument(
+                "--out", required=True, help="Output directory for build artifacts"
+            )
+            p.add_argument(
+                "-j", "--jobs", type=int, help="Worker processes (default: one per CPU)"
+            )
+            p.add_argument(
+                "--stats", action="store_true", help="Report rebuilt modules and timings"
+            )
+            p.add_argument(
+                "--bundle",
+                metavar="APP.pyz",
+                help="Also pack the build into a single-file zipapp with precompiled bytecode",
+            )
+            args_b = p.parse_args(argv[1:])
+            try:
+                stats = transpile_project(args_b.entry, args_b.out, jobs=args_b.jobs)
+                print(f"Built to {args_b.out}")
+                if args_b.bundle:
+                    from .build import bundle
+
+                    bundle(args_b.out, args_b.bundle)
+                    print(f"Bundled to {args_b.bundle}")
+                if args_b.stats:
+                    print(stats.summary())
+                return 0
+            except Exception as e:
+                sys.stderr.write(str(e) + "\n")
+                return 2
+        if cmd == "lock":
+            p = argparse.ArgumentParser(
+                prog="sup lock", description="Create a lockfile for a SUP project"
+            )
+            p.add_argument("entry", help="Entry .sup file")
+            args_l = p.parse_args(argv[1:])
+            try:
+                import hashlib as _hh
+                import json as _json
+
+                parser = Parser()
+                src = open(args_l.entry, encoding="utf-8").read()
+                program = parser.parse(src)
+                mods: set[str] = set()
+                _gather_imports(program, mods)
+
+                modules: dict[str, dict] = {}
+                entry_name = os.path.splitext(os.path.basename(args_l.entry))[0]
+                all_modules = set(mods)
+                all_modules.add(entry_name)
+                for mod in sorted(all_modules):
+                    if mod == entry_name:
+                        path = os.path.abspath(args_l.entry)
+                    else:
+                        path = _resolve_module_path(mod)
+                    code = open(path, "rb").read()
+                    sha256 = _hh.sha256(code).hexdigest()
+                    modules[mod] = {
+                        "version": "*",
+                        "sha256": sha256,
+                        "path": os.path.relpath(path, os.getcwd()),
+                        "source": "local",
+                    }
+                lock_obj = {"version": 2, "modules": modules}
+                lock_path_json = os.path.join(os.getcwd(), "sup.lock.json")
+                with open(lock_path_json, "w", encoding="utf-8") as lf:
+                    lf.write(_json.dumps(lock_obj, indent=2))
+                print(f"Wrote lockfile {lock_path_json}")
+                return 0
+            except Exception as e:
+                sys.stderr.write(str(e) + "\n")
+                return 2
+        if cmd == "test":
+            p = argparse.ArgumentParser(
+                prog="sup test",
+                description="Run .sup tests in a directory",
+                epilog=(
+                    "Passing results are cached and reused while the test, the modules "
+                    "it imports and the SUP_* settings are unchanged. Other inputs are "
+                    "not tracked: declare data files with a 'note test: data FILE' line "
+                    "(relative to the test), or mark tests that read stdin or the "
+                    "network with 'note test: no-cache'."
+                ),
+            )
+            p.add_argument("tests_dir", help="Directory containing .sup test files")
+            p.add_argument(
+                "-j", "--jobs", type=int, help="Worker processes (default: one per CPU)"
+            )
+            p.add_argument("--json", metavar="PATH", help="Write a JSON report")
+            p.add_argument("--junit", metavar="PATH", help="Write a JUnit XML report")
+            p.add_argument(
+                "--slowest",
+                type=int,
+                default=5,
+                metavar="N",
+                help="Show the N slowest tests that ran (default: 5)",
+            )
+            p.add_argument(
+                "--no-cache",
+                action="store_true",
+                help="Run every test, ignoring cached passing results",
+            )
+            args_t = p.parse_args(argv[1:])
+            try:
+                import time as _time
+
+                from . import testrunner, tooling
+
+                def report(r: testrunner.TestResult) -> None:
+                    status = "PASS" if r.passed else "FAIL"
+                    note = " (cached)" if r.cached else f" ({r.ms:.1f} ms)"
+                    print(f"{status} {r.path}{note}")
+                    if not r.passed:
+                        if r.output:
+                            sys.stdout.write(r.output)
+                        print(f"  {r.message}")
+
+                t0 = _time.perf_counter()
+                paths = tooling.discover([args_t.tests_dir])
+                cache = None
+                if not args_t.no_cache:
+                    cache = testrunner.ResultCache(
+                        testrunner.default_cache_path(args_t.tests_dir)
+                    )
+                results = testrunner.run_tests(
+                    paths,
+                    jobs=args_t.jobs or os.cpu_count() or 1,
+                    cache=cache,
+                    on_result=report,
+                )
+                seconds = _time.perf_counter() - t0
+                ran = sorted((r for r in results if not r.cached), key=lambda r: -r.ms)
+                if args_t.slowest > 0 and ran:
+                    print(f"slowest {min(args_t.slowest, len(ran))}:")
+                    for r in ran[: args_t.slowest]:
+                        print(f"  {r.ms:9.1f} ms  {r.path}")
+                failed = sum(not r.passed for r in results)
+                cached = sum(r.cached for r in results)
+                print(
+                    f"{len(results) - failed} passed, {failed} failed, "
+                    f"{cached} cached in {seconds:.2f}s"
+                )
+                if args_t.json:
+                    with open(args_t.json, "w", encoding="utf-8") as f:
+                        f.write(testrunner.json_report(results, seconds))
+                if args_t.junit:
+                    with open(args_t.junit, "w", encoding="utf-8") as f:
+                        f.write(testrunner.junit_report(results, seconds))
+                return 1 if failed else 0
+            except Exception as e:
+                sys.stderr.write(str(e) + "\n")
+                return 2
+        if cmd == "publish":
+            p = argparse.ArgumentParser(
+                prog="sup publish",
+                description="Create a distributable tarball of a SUP project or upload to a registry",
+            )
+            p.add_argument("project_dir", help="Project directory containing sup.json")
+            p.add_argument(
+                "--registry", help="HTTP registry base URL (if provided, upload)"
+            )
+            args_p = p.parse_args(argv[1:])
+            try:
+                import hashlib as _hh
+                import json
+                import tarfile
+                import urllib.request as _u
+
+                proj = os.path.abspath(args_p.project_dir)
+                meta_path = os.path.join(proj, "sup.json")
+                data = json.loads(open(meta_path, encoding="utf-8").read())
+                name = data.get("name", "app")
+                version = data.get("version", "0.0.0")
+                entry = data.get("entry", "main.sup")
+                out_dir = os.path.join(proj, "dist_sup")
+                os.makedirs(out_dir, exist_ok=True)
+                tar_name = f"{name}-{version}.tar.gz"
+                tar_path = os.path.join(out_dir, tar_name)
+                with tarfile.open(tar_path, "w:gz") as tf:
+                    # include entry and metadata for now
+                    tf.add(os.path.join(proj, entry), arcname=entry)
+                    tf.add(meta_path, arcname="sup.json")
+                # integrity
+                digest = _hh.sha256(open(tar_path, "rb").read()).hexdigest()
+                if args_p.registry:
+                    # POST to registry: /upload?name=&version=&sha256=
+                    url = args_p.registry.rstrip("/") + "/upload"
+                    body = json.dumps(
+                        {"name": name, "version": version, "sha256": digest}
+                    ).encode("utf-8")
+                    req = _u.Request(
+                        url, data=body, headers={"Content-Type": "application/json"}
+                    )
+                    with _u.urlopen(req) as r:
+                        if r.getcode() // 100 != 2:
+                            raise RuntimeError("Registry upload failed")
+                print(f"Created {tar_path}")
+                return 0
+            except Exception as e:
+                sys.stderr.write(str(e) + "\n")
+                return 2
+        if cmd == "init":
+            p = argparse.ArgumentParser(
+                prog="sup init", description="Scaffold a new SUP project"
+            )
+            p.add_argument("name", help="Project name")
+            p.add_argument("--dir", default=".", help="Target directory (default: .)")
+            args_i = p.parse_args(argv[1:])
+            try:
+                proj = os.path.abspath(args_i.dir)
+                os.makedirs(proj, exist_ok=True)
+                main_path = os.path.join(proj, "main.sup")
+                json_path = os.path.join(proj, "sup.json")
+                if not os.path.exists(main_path):
+                    with open(main_path, "w", encoding="utf-8") as f:
+                        f.write(
+                            """sup
+print "Hello from SUP!"
+bye
+"""
+                        )
+                meta = {
+                    "name": args_i.name,
+                    "version": "0.1.0",
+                    "entry": "main.sup",
+                }
+                import json as _json
+
+                with open(json_path, "w", encoding="utf-8") as jf:
+                    jf.write(_json.dumps(meta, indent=2))
+                print(f"Initialized project '{args_i.name}' in {proj}")
+                return 0
+            except Exception as e:
+                sys.stderr.write(str(e) + "\n")
+                return 2
+
+    # Default mode: run a file or start a REPL; optional --emit python; --version
+    arg_parser = argparse.ArgumentParser(prog="sup", description="Sup language CLI")
+    arg_parser.add_argument("file", nargs="?", help="Path to .sup file to run")
+    arg_parser.add_argument(
+        "--emit",
+        choices=["python"],
+        help="Transpile to target language and print",
+    )
+    arg_parser.add_argument(
+        "--backend",
+        choices=["interp", "python"],
+        default="interp",
+        help="Execute with the interpreter (default) or as compiled Python (cached)",
+    )
+    arg_parser.add_argument(
+        "--opt", action="store_true", help="Run optimizer on AST before execution"
+    )
+    arg_parser.add_argument(
+        "--version", action="store_true", help="Print version and exit"
+    )
+    arg_parser.add_argument(
+        "--opt-passes",
+        help=(
+            "Comma-separated passes to run: const_fold,licm,strength_reduce,closed_form"
+        ),
+    )
+    arg_parser.add_argument(
+        "--opt-dump",
+        help="Path to write optimized AST (use '-' for stdout)",
+    )
+    arg_parser.add_argument(
+        "--opt-timings",
+        action="store_true",
+        help="Print per-pass timings (ms)",
+    )
+    arg_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report time per function, line and builtin on stderr",
+    )
+    arg_parser.add_argument(
+        "--profile-out",
+        help="Also write the profile: JSON for a .json path, otherwise pstats",
+    )
+    arg_parser.add_argument(
+        "--sample",
+        action="store_true",
+        help="Sample the call stack during the run and report hot frames on stderr",
+    )
+    arg_parser.add_argument(
+        "--sample-out",
+        help="Also write the samples: speedscope for a .json path, otherwise collapsed stacks",
+    )
+    arg_parser.add_argument(
+        "--sample-interval",
+        type=float,
+        default=10.0,
+        help="Milliseconds between samples (default 10)",
+    )
+    arg_parser.add_argument(
+        "--sample-mode",
+        choices=["wall", "cpu"],
+        default="wall",
+        help="Sample wall-clock time from a thread, or CPU time with SIGPROF",
+    )
+    args = arg_parser.parse_args(argv)
+
+    if args.version:
+        print(__version__)
+        return 0
+
+    if args.file:
+        if args.emit:
+            with open(args.file, encoding="utf-8") as f:
+                src = f.read()
+            try:
+                if args.emit == "python":
+                    program = Parser().parse(src)
+                    py_code, src_lines, _src_cols = to_python_with_map(program)
+                    sys.stdout.write(py_code)
+                    return 0
+                out = run_source(src, emit=args.emit)
+                if out:
+                    sys.stdout.write(out)
+                return 0
+            except SupError as e:
+                sys.stderr.write(str(e) + "\n")
+                return 2
+        # normal execute path; apply optimizer if requested
+        try:
+            passes = None
+            if args.opt_passes:
+                passes = [p.strip() for p in args.opt_passes.split(",") if p.strip()]
+            profile = args.profile or bool(args.profile_out)
+            sample = args.sample or bool(args.sample_out)
+            if (profile or sample) and args.backend == "python":
+                flag = "--profile" if profile else "--sample"
+                sys.stderr.write(f"{flag} requires the interpreter backend\n")
+                return 2
+            if args.backend == "python":
+                from . import pybackend
+
+                def _optimize(prog):
+                    return optimize_ex(prog, enabled_passes=passes)[0]
+
+                # The code cache is keyed by source, so the passes are part of the key
+                pybackend.run_file(
+                    args.file,
+                    transform=_optimize if args.opt else None,
+                    variant="opt:" + ",".join(passes or []) if args.opt else "",
+                )
+                return 0
+            with open(args.file, encoding="utf-8") as f:
+                src = f.read()
+            parser2 = Parser()
+            program = parser2.parse(src)
+            if args.opt:
+                dump_file = None
+                dump_stream = None
+                if args.opt_dump:
+                    dump_file = args.opt_dump
+                    if dump_file == "-":
+                        dump_stream = sys.stdout
+                    else:
+                        try:
+                            dump_stream = open(dump_file, "w", encoding="utf-8")
+                        except Exception:
+                            dump_stream = None
+                program, timings = optimize_ex(
+                    program,
+                    enabled_passes=passes,
+                    collect_timings=args.opt_timings,
+                    dump_stream=dump_stream,
+                )
+                if dump_stream is not None and dump_stream is not sys.stdout:
+                    try:
+                        dump_stream.close()  # type: ignore[call-arg]
+                    except Exception:
+                        pass
+                if args.opt_timings and timings:
+                    for k in sorted(timings.keys()):
+                        print(f"opt[{k}]: {timings[k]:.3f} ms", file=sys.stderr)
+            if profile:
+                return _run_profiled(program, args.file, args.profile_out)
+            if sample:
+                return _run_sampled(program, args)
+            interp = Interpreter()
+            out = interp.run(program)
+            if out:
+                sys.stdout.write(out)
+            return 0
+        except SupError as e:
+            sys.stderr.write(str(e) + "\n")
+            return 2
+        except Exception as e:
+            sys.stderr.write(str(e) + "\n")
+            return 2
+    return repl()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
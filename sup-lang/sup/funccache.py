@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from . import __version__
+from . import ast as AST
+
+# Stored results between recounts of the database size
+_RESYNC_EVERY = 256
+# Fields that do not change what a function computes
+_IGNORED_FIELDS = frozenset({"line", "column", "typed", "memo"})
+
+
+def cache_dir() -> str | None:
+    """Result cache directory from ``SUP_FUNC_CACHE`` (1 for ~/.cache/sup/func), or None."""
+    value = os.environ.get("SUP_FUNC_CACHE") or None
+    if value is None or value.lower() in {"0", "off", "no", "false"}:
+        return None
+    if value.lower() in {"1", "true", "yes"}:
+        return os.path.join(os.path.expanduser("~"), ".cache", "sup", "func")
+    return value
+
+
+def _canonical(value: object) -> str:
+    if isinstance(value, AST.Node):
+        fields = ",".join(
+            f"{k}={_canonical(v)}" for k, v in vars(value).items() if k not in _IGNORED_FIELDS
+        )
+        return f"{type(value).__name__}({fields})"
+    if isinstance(value, list):
+        return "[" + ",".join(_canonical(v) for v in value) + "]"
+    return repr(value)
+
+
+def fingerprint(
+    fn: AST.FunctionDef, resolve: Callable[[str], AST.FunctionDef | None]
+) -> str | None:
+    """Hash of ``fn`` and of every function it calls, as ``resolve`` finds them.
+
+    None when a callee cannot be resolved; results of such calls are not stored.
+    """
+    h = hashlib.sha256(__version__.encode("utf-8"))
+    order: dict[int, int] = {id(fn): 0}
+    todo = [fn]
+    while todo:
+        current = todo.pop()
+        h.update(b"\0" + _canonical(current).encode("utf-8"))
+        for node in AST.walk(current):
+            if isinstance(node, AST.Call):
+                callee = resolve(node.name.lower())
+                if callee is None:
+                    return None
+                if id(callee) not in order:
+                    order[id(callee)] = len(order)
+                    todo.append(callee)
+                # Which function each name runs matters, not only their bodies
+                h.update(f"\0{node.name.lower()}={order[id(callee)]}".encode())
+    return h.hexdigest()
+
+
+def encode(value: object) -> str | None:
+    """JSON for ``value``, or None when it would not decode to an equal sup value."""
+    if not _encodable(value):
+        return None
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _encodable(value: object) -> bool:
+    t = type(value)
+    if t in (int, float, str, bool) or value is None:
+        return True
+    if t is list:
+        return all(_encodable(v) for v in value)  # type: ignore[attr-defined]
+    if t is dict:
+        return all(
+            type(k) is str and _encodable(v) for k, v in value.items()  # type: ignore[attr-defined]
+        )
+    return False
+
+
+class FunctionCache:
+    """Results of ``define cached function`` calls shared across runs and processes.
+
+    Entries live in one SQLite database (WAL mode, so concurrent runs can read
+    while another writes), keyed by the function's fingerprint and its encoded
+    arguments. Once the stored results exceed ``max_bytes`` the least recently
+    used ones are deleted down to 90% of it; the total is tracked as results are stored and only
+    re-read from the database when it may be over the limit, or now and then to
+    account for other processes. Database errors make the cache miss rather than
+    fail.
+    """
+
+    def __init__(self, directory: str, *, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.path = os.path.join(directory, "results.sqlite3")
+        self.max_bytes = max(0, int(max_bytes))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db: Any = None
+        # Estimated size of all stored results; None until first needed
+        self._total: int | None = None
+        self._puts = 0
+        try:
+            import sqlite3
+
+            os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            # Still crash-safe in WAL mode, without a sync on every stored result
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "used REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS results_used ON results(used)")
+            db.commit()
+            self._db = db
+        except Exception:
+            self._db = None
+
+    @staticmethod
+    def key(digest: str, args: list[object]) -> str | None:
+        encoded = encode(args)
+        if encoded is None:
+            return None
+        return hashlib.sha256(f"{digest}\0{encoded}".encode()).hexdigest()
+
+    def get(self, key: str) -> tuple[object, object] | None:
+        """``(value, last_result)`` stored for ``key``."""
+        if self._db is None:
+            return None
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT value FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE results SET used = ? WHERE key = ?", (time.time(), key)
+                    )
+                    self._db.commit()
+            except Exception:
+                row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        value, last = json.loads(row[0])
+        return value, last
+
+    def put(self, key: str, value: object, last_result: object) -> None:
+        data = encode([value, last_result])
+        if self._db is None or data is None or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT size FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                    (key, data, len(data), time.time()),
+                )
+                self._puts += 1
+                if self._total is None or self._puts % _RESYNC_EVERY == 0:
+                    self._total = self._stored_bytes()
+                else:
+                    self._total += len(data) - (row[0] if row else 0)
+                if self._total > self.max_bytes:
+                    self._evict()
+                self._db.commit()
+            except Exception:
+                self._total = None
+                try:
+                    self._db.rollback()
+                except Exception:
+                    pass
+
+    def _stored_bytes(self) -> int:
+        return int(self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0])
+
+    def _evict(self) -> None:
+        # Other processes may have evicted already; recount before deleting
+        total = self._stored_bytes()
+        if total <= self.max_bytes:
+            self._total = total
+            return
+        # Free a tenth more than needed so the next few stores do not evict again
+        target = self.max_bytes - self.max_bytes // 10
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY used"):
+            doomed.append((key,))
+            total -= size
+            if total <= target:
+                break
+        self._db.executemany("DELETE FROM results WHERE key = ?", doomed)
+        self._total = total
+
+    def close(self) -> None:
+        if self._db is not None:
+            try:
+                self._db.close()
+            except Exception:
+                pass
+            self._db = None
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from email.utils import parsedate_to_datetime
+
+from .httpclient import Response
+
+# Stored entries between recounts of the directory size
+_RESYNC_EVERY = 256
+
+# Describe the stored body, so a 304 must not overwrite them
+_ENTITY_HEADERS = frozenset(
+    {"content-length", "content-type", "content-encoding", "content-range", "transfer-encoding"}
+)
+
+
+def _parse_cache_control(value: str) -> dict[str, str | None]:
+    out: dict[str, str | None] = {}
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" in part:
+            k, v = part.split("=", 1)
+            out[k.strip().lower()] = v.strip().strip('"')
+        else:
+            out[part.lower()] = None
+    return out
+
+
+def _http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except Exception:
+        return None
+
+
+class HttpCache:
+    """Opt-in on-disk cache for GET responses with conditional revalidation.
+
+    Each entry is a single ``<key>.entry`` file, replaced atomically, holding a
+    JSON metadata line followed by the body. Keys cover the URL and every request
+    header, and so any header a response's ``Vary`` names; ``Vary: *`` responses
+    are not stored. Fresh entries (``Cache-Control: max-age`` / ``Expires``) are
+    served without network I/O; stale entries carrying an ``ETag`` or
+    ``Last-Modified`` are revalidated with ``If-None-Match`` /
+    ``If-Modified-Since``. File mtimes track recency so the directory can be
+    trimmed least-recently-used first once it exceeds ``max_bytes``.
+    """
+
+    def __init__(self, directory: str, *, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_bytes = max(0, int(max_bytes))
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        # Bytes stored, kept up to date by each store and recounted now and then
+        self._total: int | None = None
+        self._stores = 0
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        send: Callable[[dict[str, str]], Response],
+        url: str,
+        headers: dict[str, str],
+    ) -> Response:
+        key = self._key(url, headers)
+        entry = self._load(key)
+        now = time.time()
+        if entry is not None:
+            meta, body = entry
+            if not meta.get("no_cache") and now < float(meta.get("expires", 0)):
+                self.hits += 1
+                self._touch(key)
+                return self._response(url, meta, body)
+            cond = dict(headers)
+            if meta.get("etag"):
+                cond["If-None-Match"] = str(meta["etag"])
+            if meta.get("last_modified"):
+                cond["If-Modified-Since"] = str(meta["last_modified"])
+            if len(cond) > len(headers):
+                resp = send(cond)
+                if resp.status == 304:
+                    self.revalidated += 1
+                    # Refresh freshness from the 304 headers, keep the stored body
+                    merged = dict(meta.get("headers", {}))
+                    merged.update(
+                        (k, v) for k, v in resp.headers.items() if k not in _ENTITY_HEADERS
+                    )
+                    stored = self._store(key, url, 200, merged, body, now)
+                    return self._response(url, stored or meta, body)
+                self.misses += 1
+                self._maybe_store(key, resp, now)
+                return resp
+        self.misses += 1
+        resp = send(dict(headers))
+        self._maybe_store(key, resp, now)
+        return resp
+
+    def clear(self) -> None:
+        # Also drops .json/.body pairs left by the earlier two-file layout
+        for fn in os.listdir(self.directory):
+            if fn.endswith((".entry", ".json", ".body")):
+                try:
+                    os.remove(os.path.join(self.directory, fn))
+                except OSError:
+                    pass
+        with self._lock:
+            self._total = None
+
+    # ---- internals ----
+    def _key(self, url: str, headers: dict[str, str]) -> str:
+        h = hashlib.sha256(url.encode("utf-8"))
+        for k in sorted(headers, key=str.lower):
+            h.update(f"\n{k.lower()}:{headers[k]}".encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.entry")
+
+    def _load(self, key: str) -> tuple[dict, bytes] | None:
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        head, sep, body = data.partition(b"\n")
+        if not sep:
+            return None
+        try:
+            meta = json.loads(head)
+        except ValueError:
+            return None
+        return (meta, body) if isinstance(meta, dict) else None
+
+    def _touch(self, key: str) -> None:
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def _response(self, url: str, meta: dict, body: bytes) -> Response:
+        return Response(
+            status=int(meta.get("status", 200)),
+            url=url,
+            body=body,
+            headers=dict(meta.get("headers", {})),
+            from_cache=True,
+        )
+
+    def _maybe_store(self, key: str, resp: Response, now: float) -> None:
+        if resp.status != 200 or resp.truncated:
+            return
+        self._store(key, resp.url, resp.status, resp.headers, resp.body, now)
+
+    def _store(
+        self,
+        key: str,
+        url: str,
+        status: int,
+        headers: dict[str, str],
+        body: bytes,
+        now: float,
+    ) -> dict | None:
+        """Write an entry; returns its metadata, or None if it is not cacheable."""
+        cc = _parse_cache_control(headers.get("cache-control", ""))
+        if "no-store" in cc or headers.get("vary", "").strip() == "*":
+            return None
+        expires = now
+        if cc.get("max-age") is not None:
+            try:
+                expires = now + max(0, int(str(cc["max-age"])))
+            except ValueError:
+                pass
+        elif headers.get("expires"):
+            expires = _http_date(headers.get("expires")) or now
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if expires <= now and not etag and not last_modified:
+            # Neither fresh nor revalidatable; storing it would never pay off
+            return None
+        meta = {
+            "url": url,
+            "status": status,
+            "headers": headers,
+            "stored": now,
+            "expires": expires,
+            "no_cache": "no-cache" in cc,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+        data = json.dumps(meta).encode("utf-8") + b"\n" + body
+        if len(data) > self.max_bytes:
+            return None
+        path = self._path(key)
+        with self._lock:
+            try:
+                old = os.stat(path).st_size
+            except OSError:
+                old = 0
+            self._atomic_write(path, data)
+            self._stores += 1
+            if self._total is None or self._stores % _RESYNC_EVERY == 0:
+                self._total = self._stored_bytes()
+            else:
+                self._total += len(data) - old
+            if self._total > self.max_bytes:
+                self._evict()
+        return meta
+
+    def _atomic_write(self, path: str, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        """``(mtime, size, path)`` of every stored entry."""
+        out = []
+        for fn in os.listdir(self.directory):
+            if not fn.endswith(".entry"):
+                continue
+            path = os.path.join(self.directory, fn)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def _stored_bytes(self) -> int:
+        return sum(size for _mtime, size, _path in self._entries())
+
+    def _evict(self) -> None:
+        # Other processes share the directory; recount before deleting
+        entries = self._entries()
+        total = sum(size for _mtime, size, _path in entries)
+        # Free a tenth more than needed so the next few stores do not evict again
+        target = self.max_bytes - self.max_bytes // 10
+        if total > self.max_bytes:
+            for _mtime, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= target:
+                    break
+        self._total = total
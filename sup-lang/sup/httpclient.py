@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import base64
+import http.client
+import threading
+import urllib.parse
+import urllib.request
+from collections import deque
+from dataclasses import dataclass, field
+
+from .errors import SupRuntimeError
+
+_REDIRECTS = {301, 302, 303, 307, 308}
+# Dropped when a redirect leaves the original scheme, host and port
+_CREDENTIAL_HEADERS = {"authorization", "cookie", "proxy-authorization"}
+# Errors that mean a reused keep-alive socket was closed by the server
+_STALE = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+# Safe to resend when a reused socket fails: the server may have acted on the first copy
+_IDEMPOTENT = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+
+
+# (scheme, host, port, CONNECT tunnel through (proxy host, proxy port, auth) or None)
+_Key = tuple[str, str, int, "tuple[str, int, str | None] | None"]
+
+
+def _origin(url: str) -> tuple[str, str, int]:
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in {"http", "https"} or not parts.hostname:
+        raise SupRuntimeError(message=f"Unsupported URL '{url}'.")
+    return scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80)
+
+
+@dataclass
+class Response:
+    status: int
+    url: str
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+    # Body was cut off at ``max_bytes``
+    truncated: bool = False
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", "replace")
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections shared by the HTTP builtins.
+
+    Idle connections are kept per (scheme, host, port), at most ``max_per_host``
+    of each. A connection is only returned to the pool once its response has been
+    fully read; truncated or ``Connection: close`` responses drop the socket.
+    ``HTTP_PROXY``/``HTTPS_PROXY``/``NO_PROXY`` are honored as urllib does: plain
+    HTTP goes through the proxy, HTTPS is tunneled with ``CONNECT``.
+    """
+
+    def __init__(self, *, max_per_host: int = 4, max_redirects: int = 5) -> None:
+        self.max_per_host = max(1, int(max_per_host))
+        self.max_redirects = max_redirects
+        self._idle: dict[_Key, deque[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        # Counters are handy for tests and benchmarks
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float = 10.0,
+        max_bytes: int = 1_000_000,
+    ) -> Response:
+        headers = dict(headers or {})
+        for _ in range(self.max_redirects + 1):
+            resp = self._send(method, url, body, headers, timeout, max_bytes)
+            location = resp.headers.get("location")
+            if resp.status not in _REDIRECTS or not location:
+                return resp
+            target = urllib.parse.urljoin(url, location)
+            if _origin(target) != _origin(url):
+                headers = {
+                    k: v
+                    for k, v in headers.items()
+                    if k.lower() not in _CREDENTIAL_HEADERS
+                }
+            url = target
+            if resp.status in {301, 302, 303} and method != "HEAD":
+                method, body = "GET", None
+                headers = {
+                    k: v
+                    for k, v in headers.items()
+                    if k.lower() not in {"content-type", "content-length"}
+                }
+        raise SupRuntimeError(message=f"Too many redirects for {url}.")
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    # ---- internals ----
+    def _key(self, url: str) -> tuple[_Key, str, dict[str, str]]:
+        """Pool key, request target and extra headers for ``url``, after proxying."""
+        scheme, host, port = _origin(url)
+        parts = urllib.parse.urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        proxy = urllib.request.getproxies().get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return (scheme, host, port, None), target, {}
+        px = urllib.parse.urlsplit(proxy if "://" in proxy else "http://" + proxy)
+        if not px.hostname:
+            return (scheme, host, port, None), target, {}
+        auth = None
+        if px.username:
+            user = urllib.parse.unquote(px.username)
+            password = urllib.parse.unquote(px.password or "")
+            token = base64.b64encode(f"{user}:{password}".encode()).decode("ascii")
+            auth = "Basic " + token
+        if scheme == "http":
+            # Plain HTTP: send the absolute URL to the proxy itself
+            extra = {"Proxy-Authorization": auth} if auth else {}
+            return ("http", px.hostname, px.port or 80, None), url, extra
+        return (scheme, host, port, (px.hostname, px.port or 80, auth)), target, {}
+
+    def _acquire(
+        self, key: _Key, timeout: float
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            conns = self._idle.get(key)
+            if conns:
+                conn = conns.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        scheme, host, port, tunnel = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        self.connections_opened += 1
+        if tunnel is None:
+            return cls(host, port, timeout=timeout), False
+        proxy_host, proxy_port, auth = tunnel
+        conn = cls(proxy_host, proxy_port, timeout=timeout)
+        extra = {"Proxy-Authorization": auth} if auth else None
+        conn.set_tunnel(host, port, headers=extra)
+        return conn, False
+
+    def _release(self, key: _Key, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            conns = self._idle.setdefault(key, deque())
+            if len(conns) < self.max_per_host:
+                conns.append(conn)
+                return
+        conn.close()
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None,
+        headers: dict[str, str],
+        timeout: float,
+        max_bytes: int,
+    ) -> Response:
+        key, target, extra = self._key(url)
+        if extra:
+            headers = {**headers, **extra}
+        while True:
+            conn, reused = self._acquire(key, timeout)
+            try:
+                self.requests_sent += 1
+                conn.request(method, target, body=body, headers=headers)
+                resp = conn.getresponse()
+            except _STALE as e:
+                conn.close()
+                if not reused:
+                    raise
+                if method.upper() not in _IDEMPOTENT:
+                    raise SupRuntimeError(
+                        message=f"Connection closed during {method.upper()} {url}; "
+                        "not retried since it may have been received."
+                    ) from e
+                # Server dropped an idle keep-alive socket; retry on a fresh one
+                continue
+            except Exception:
+                conn.close()
+                raise
+            break
+        try:
+            data = resp.read(max_bytes)
+            truncated = not resp.isclosed() and resp.read(1) != b""
+        except Exception:
+            conn.close()
+            raise
+        if truncated or resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        hdrs = {k.lower(): v for k, v in resp.getheaders()}
+        return Response(
+            status=int(resp.status), url=url, body=data, headers=hdrs, truncated=truncated
+        )
@@ -0,0 +1,1801 @@
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from . import ast as AST
+from . import memo
+from .errors import SupRuntimeError
+from .streams import Stream
+
+
+@dataclass
+class IOHooks:
+    stdin: str | None = None
+    outputs: list[str] = field(default_factory=list)
+
+    def read_input(self) -> str:
+        if self.stdin is None:
+            # Interactive input
+            return input()
+        # Pop first line from stdin buffer
+        if "\n" in self.stdin:
+            line, rest = self.stdin.split("\n", 1)
+            self.stdin = rest
+        else:
+            line, self.stdin = self.stdin, None
+        return line
+
+    def write_output(self, text: str) -> None:
+        self.outputs.append(text)
+
+
+# Ints in this range convert to float exactly, so Python arithmetic on them
+# agrees with the float-based generic path in Interpreter.eval
+_EXACT_INT = 2**53
+
+
+def _exact(v: object) -> bool:
+    t = type(v)
+    return t is float or (t is int and -_EXACT_INT <= v <= _EXACT_INT)  # type: ignore[operator]
+
+
+class Interpreter:
+    def __init__(self) -> None:
+        self.env: dict[str, object] = {}
+        self.functions: dict[str, AST.FunctionDef] = {}
+        self.module_cache: dict[str, dict[str, object]] = {}
+        self.loading_modules: set[str] = set()
+        self.last_result: object | None = None
+        self.io = IOHooks()
+        # Lazy helpers for logging/async tasks
+        self._logger: Any = None
+        self._async: Any = None
+        # Capability model (safe-by-default). Categories: net, process, fs_write, archive, sql
+        # Allow override via env SUP_UNSAFE=1 (disable gating) or SUP_CAPS=comma,separated,list
+        import os as _os_caps  # local import to avoid global side effects
+
+        self._unsafe_all = _os_caps.environ.get("SUP_UNSAFE") in {"1", "true", "yes"}
+        caps_env = _os_caps.environ.get("SUP_CAPS", "")
+        self.capabilities: set[str] = (
+            {c.strip() for c in caps_env.split(",") if c.strip()} if caps_env else set()
+        )
+        # HTTP defaults
+        self._http_timeout_sec: float = 10.0
+        self._http_max_bytes: int = 1_000_000
+        try:
+            self._http_pool_size: int = int(os.environ.get("SUP_HTTP_POOL_SIZE", "4"))
+        except Exception:
+            self._http_pool_size = 4
+        self._http_pool: Any = None
+        # Opt-in on-disk response cache: SUP_HTTP_CACHE=<dir> (or 1 for ~/.cache/sup/http)
+        self._http_cache_dir: str | None = os.environ.get("SUP_HTTP_CACHE") or None
+        if self._http_cache_dir in {"1", "true", "yes"}:
+            self._http_cache_dir = os.path.join(
+                os.path.expanduser("~"), ".cache", "sup", "http"
+            )
+        try:
+            self._http_cache_max_bytes: int = int(
+                float(os.environ.get("SUP_HTTP_CACHE_MB", "64")) * 1024 * 1024
+            )
+        except Exception:
+            self._http_cache_max_bytes = 64 * 1024 * 1024
+        self._http_cache: Any = None
+        # Async runtime: SUP_ASYNC_LIMIT concurrent tasks, SUP_ASYNC_TIMEOUT_MS per task
+        try:
+            self._async_limit: int = int(os.environ.get("SUP_ASYNC_LIMIT", "64"))
+        except Exception:
+            self._async_limit = 64
+        try:
+            async_ms = os.environ.get("SUP_ASYNC_TIMEOUT_MS")
+            self._async_timeout_sec: float | None = (
+                float(async_ms) / 1000.0 if async_ms else None
+            )
+        except Exception:
+            self._async_timeout_sec = None
+        # ---- Sandbox limits (env-configurable) ----
+        # SUP_LIMIT_WALL_MS, SUP_LIMIT_STEPS, SUP_LIMIT_MEM_MB, SUP_LIMIT_FD
+        try:
+            wall_ms = os.environ.get("SUP_LIMIT_WALL_MS")
+            self._limit_wall_sec: float | None = (
+                (float(wall_ms) / 1000.0) if wall_ms else None
+            )
+        except Exception:
+            self._limit_wall_sec = None
+        try:
+            steps = os.environ.get("SUP_LIMIT_STEPS")
+            self._limit_steps: int | None = int(steps) if steps else None
+        except Exception:
+            self._limit_steps = None
+        try:
+            mem_mb = os.environ.get("SUP_LIMIT_MEM_MB")
+            self._limit_mem_bytes: int | None = (
+                int(float(mem_mb) * 1024 * 1024) if mem_mb else None
+            )
+        except Exception:
+            self._limit_mem_bytes = None
+        try:
+            fdl = os.environ.get("SUP_LIMIT_FD")
+            self._limit_fd: int | None = int(fdl) if fdl else None
+        except Exception:
+            self._limit_fd = None
+        # Lazy imports: SUP_LAZY_IMPORTS=1 defers running a module until first use
+        self._lazy_imports: bool = os.environ.get("SUP_LAZY_IMPORTS") in {
+            "1",
+            "true",
+            "yes",
+        }
+        # Numeric fast paths from static type inference: SUP_TYPED=0 disables them
+        self._typed: bool = os.environ.get("SUP_TYPED", "1") not in {"0", "false", "no"}
+        # Cached calls of pure functions: SUP_MEMO=0 disables, SUP_MEMO_SIZE entries per function
+        self._memo: dict[int, Any] | None = (
+            {} if os.environ.get("SUP_MEMO", "1") not in {"0", "false", "no"} else None
+        )
+        try:
+            self._memo_size: int = max(1, int(os.environ.get("SUP_MEMO_SIZE", "1024")))
+        except ValueError:
+            self._memo_size = 1024
+        self._memo_fns: list[AST.FunctionDef] = []
+        # Opt-in cross-run results of 'define cached function': SUP_FUNC_CACHE=<dir> (or 1)
+        from .funccache import cache_dir as _func_cache_dir
+
+        self._func_cache_dir: str | None = _func_cache_dir()
+        try:
+            self._func_cache_max_bytes: int = int(
+                float(os.environ.get("SUP_FUNC_CACHE_MB", "64")) * 1024 * 1024
+            )
+        except ValueError:
+            self._func_cache_max_bytes = 64 * 1024 * 1024
+        self._func_cache: Any = None
+        self._func_digests: dict[int, str] = {}
+        # Import prefetch before execution: SUP_PREFETCH=auto (default), threads, processes or 0
+        self._prefetch: str = os.environ.get("SUP_PREFETCH", "auto")
+        # Deterministic mode
+        self._deterministic: bool = os.environ.get("SUP_DETERMINISTIC") in {
+            "1",
+            "true",
+            "yes",
+        }
+        self._seed = (
+            int(os.environ.get("SUP_SEED", "0")) if self._deterministic else None
+        )
+        if self._deterministic:
+            import random as _random
+
+            self._rng = _random.Random(self._seed or 0)
+        else:
+            self._rng = None
+        # Runtime counters
+        import time as _t
+
+        self._wall_start = _t.perf_counter()
+        self._steps = 0
+        # Memory tracking
+        self._tm = None
+        if self._limit_mem_bytes is not None:
+            try:
+                import tracemalloc as _tm
+
+                _tm.start()
+                self._tm = _tm
+            except Exception:
+                self._tm = None
+        # FD tracking
+        self._fd_open_count = 0
+        # Writer handles still open; closed when the run finishes
+        self._handles: list[Any] = []
+        # Parallel loops: workers record `collect` values here for ordered replay
+        self._collected: list[tuple[str, object]] | None = None
+        self._in_parallel_worker = False
+
+    def run(self, program: AST.Program, *, stdin: str | None = None) -> str:
+        self.io.stdin = stdin
+        # reset counters
+        import time as _t
+
+        self._wall_start = _t.perf_counter()
+        self._steps = 0
+        if not self._lazy_imports:
+            from . import loader
+
+            loader.maybe_prefetch(program, self._prefetch)
+        if self._typed:
+            from .typecheck import annotate
+
+            annotate(program)
+        if self._memo is not None:
+            memo.annotate(program)
+        try:
+            self.eval_program(program)
+        finally:
+            self._close_handles()
+            if self._async is not None:
+                self._async.shutdown()
+                self._async = None
+            if self._http_pool is not None:
+                self._http_pool.close()
+            if self._func_cache is not None:
+                self._func_cache.close()
+                self._func_cache = None
+        return "".join(self.io.outputs)
+
+    def eval_program(self, program: AST.Program) -> None:
+        for stmt in program.statements:
+            self.eval(stmt)
+
+    def eval(self, node: AST.Node) -> object | None:
+        # step & resource checks
+        self._steps += 1
+        self._check_limits()
+        # Arithmetic the type checker proved numeric skips the dispatch below
+        cls = type(node)
+        if cls is AST.Binary and node.typed and self._typed:  # type: ignore[attr-defined]
+            return self._typed_binary(node)  # type: ignore[arg-type]
+        if cls is AST.Compare and node.typed and self._typed:  # type: ignore[attr-defined]
+            return self._typed_compare(node)  # type: ignore[arg-type]
+        if isinstance(node, AST.Assignment):
+            value = self.eval(node.expr)
+            self.env[node.name.lower()] = value
+            self.last_result = value
+            return value
+        if isinstance(node, AST.Print):
+            value = self.last_result if node.expr is None else self.eval(node.expr)
+            self.io.write_output(f"{self._format_value(value)}\n")
+            return value
+        if isinstance(node, AST.Ask):
+            val = self.io.read_input()
+            self.env[node.name.lower()] = val
+            self.last_result = val
+            return val
+        if isinstance(node, AST.If):
+            cond_val = self._truthy(self.eval(node.cond) if node.cond is not None else self._compare(self.eval(node.left), node.op, self.eval(node.right)))  # type: ignore[arg-type]
+            if cond_val:
+                for s in node.body or []:
+                    self.eval(s)
+            else:
+                for s in node.else_body or []:
+                    self.eval(s)
+            return None
+        if isinstance(node, AST.While):
+            while self._truthy(self.eval(node.cond)):
+                for s in node.body:
+                    self.eval(s)
+            return None
+        if isinstance(node, AST.ForEach):
+            iterable = self.eval(node.iterable)
+            if node.parallel and not self._in_parallel_worker:
+                from . import parallel as _par
+
+                try:
+                    items = list(iterable)  # type: ignore[call-overload]
+                except Exception:
+                    raise SupRuntimeError(message="Target of for each is not iterable.")
+                workers = (
+                    int(self._num(self.eval(node.workers)))
+                    if node.workers is not None
+                    else _par.default_workers()
+                )
+                _par.run_foreach(self, node, items, workers)
+                return None
+            try:
+                # Streams are consumed lazily; everything else is snapshotted
+                iterator = (
+                    iterable.open()
+                    if isinstance(iterable, Stream)
+                    else list(iterable)  # type: ignore[arg-type,call-overload]
+                )
+            except Exception:
+                raise SupRuntimeError(message="Target of for each is not iterable.")
+            saved = self.env.get(node.var.lower())
+            try:
+                for item in iterator:
+                    self.env[node.var.lower()] = item
+                    for s in node.body:
+                        self.eval(s)
+            finally:
+                # Release stream resources (cursors, files) on normal exit or throw
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+                if saved is None:
+                    self.env.pop(node.var.lower(), None)
+                else:
+                    self.env[node.var.lower()] = saved
+            return None
+        if isinstance(node, AST.Repeat):
+            count_val = self.eval(node.count_expr)
+            try:
+                iterations = int(count_val)  # type: ignore[arg-type,call-overload]
+            except Exception:
+                raise SupRuntimeError(
+                    message="Repeat count must be a number.",
+                    line=getattr(node, "line", None),
+                )
+            for _ in range(iterations):
+                for s in node.body:
+                    self.eval(s)
+            return None
+        if isinstance(node, AST.ExprStmt):
+            value = self.eval(node.expr)
+            self.last_result = value
+            return value
+        if isinstance(node, AST.Collect):
+            value = self.eval(node.expr)
+            if self._collected is not None:
+                self._collected.append((node.target.lower(), value))
+            else:
+                self._collect(node.target.lower(), value)
+            self.last_result = value
+            return value
+        if isinstance(node, AST.TryCatch):
+            error: Exception | None = None
+            try:
+                for s in node.body:
+                    self.eval(s)
+            except Exception as e:  # catch Sup and general errors
+                error = e
+                if node.catch_body is not None:
+                    if node.catch_name:
+                        if isinstance(e, _SupThrown):
+                            self.env[node.catch_name.lower()] = e.value
+                        else:
+                            self.env[node.catch_name.lower()] = str(e)
+                    for s in node.catch_body:
+                        self.eval(s)
+                else:
+                    # no catch: rethrow after finally
+                    pass
+            finally:
+                if node.finally_body is not None:
+                    for s in node.finally_body:
+                        self.eval(s)
+                if error is not None and node.catch_body is None:
+                    raise error
+            return None
+        if isinstance(node, AST.Throw):
+            val = self.eval(node.value)
+            raise _SupThrown(val)
+        if isinstance(node, (AST.Import, AST.FromImport)):
+            # Fingerprints resolve module and imported callees by these names
+            self._func_digests.clear()
+        if isinstance(node, AST.Import):
+            if self._lazy_imports:
+                from .loader import LazyModule
+
+                lazy = LazyModule(node.module, self._import_module)
+                self.env[(node.alias or node.module).lower()] = lazy
+                return None
+            ns = self._import_module(node.module)
+            self.env[(node.alias or node.module).lower()] = ns
+            return None
+        if isinstance(node, AST.FromImport):
+            if self._lazy_imports:
+                from .loader import LazyModule, LazySymbol
+
+                lazy_mod = LazyModule(node.module, self._import_module)
+                for name, alias in node.names:
+                    self.env[(alias or name).lower()] = LazySymbol(lazy_mod, name)
+                return None
+            ns = self._import_module(node.module)
+            for name, alias in node.names:
+                if name not in ns:
+                    raise SupRuntimeError(
+                        message=f"Module '{node.module}' has no symbol '{name}'."
+                    )
+                self.env[(alias or name).lower()] = ns[name]
+            return None
+        if isinstance(node, AST.FunctionDef):
+            self.functions[node.name.lower()] = node
+            # Fingerprints cover called functions, which may have just changed
+            self._func_digests.clear()
+            return None
+        if isinstance(node, AST.Return):
+            # Signal a return using exception for simple control flow
+            raise _ReturnSignal(self.eval(node.expr) if node.expr is not None else None)
+        if isinstance(node, AST.Call):
+            return self._call_function(node)
+        # Collections and stdlib
+        if isinstance(node, AST.MakeList):
+            lst = [self.eval(it) for it in node.items]
+            self.env["list"] = lst
+            self.last_result = lst
+            return lst
+        if isinstance(node, AST.MakeMap):
+            d: dict[object, object] = {}
+            self.env["map"] = d
+            self.last_result = d
+            return d
+        if isinstance(node, AST.Push):
+            target = self.eval(node.target)
+            if not isinstance(target, list):
+                raise SupRuntimeError(message="Push target must be a list.")
+            target.append(self.eval(node.item))
+            self.last_result = target
+            return target
+        if isinstance(node, AST.Pop):
+            target = self.eval(node.target)
+            if not isinstance(target, list):
+                raise SupRuntimeError(message="Pop target must be a list.")
+            val = target.pop()
+            self.last_result = val
+            return val
+        if isinstance(node, AST.GetKey):
+            target = self.eval(node.target)
+            key = self.eval(node.key)
+            if isinstance(target, list):
+                try:
+                    idx = int(self._num(key))
+                except Exception:
+                    raise SupRuntimeError(message="List index must be a number.")
+                try:
+                    val = target[idx]
+                except Exception:
+                    raise SupRuntimeError(message="List index out of range.")
+                self.last_result = val
+                return val
+            if isinstance(target, dict):
+                val = target.get(key)  # type: ignore[call-arg]
+                self.last_result = val
+                return val
+            raise SupRuntimeError(message="Get target must be a list or map.")
+        if isinstance(node, AST.SetKey):
+            target = self.eval(node.target)
+            key = self.eval(node.key)
+            val = self.eval(node.value)
+            if not isinstance(target, dict):
+                raise SupRuntimeError(message="Set target must be a map.")
+            target[key] = val
+            self.last_result = target
+            return target
+        if isinstance(node, AST.DeleteKey):
+            target = self.eval(node.target)
+            key = self.eval(node.key)
+            if not isinstance(target, dict):
+                raise SupRuntimeError(message="Delete target must be a map.")
+            target.pop(key, None)
+            self.last_result = target
+            return target
+        if isinstance(node, AST.Length):
+            target = self.eval(node.target)
+            try:
+                length_value = len(target)  # type: ignore[arg-type]
+            except TypeError:
+                raise SupRuntimeError(
+                    message=f"Cannot take the length of {type(target).__name__}.",
+                    line=getattr(node, "line", None),
+                )
+            self.last_result = length_value
+            return length_value
+        if isinstance(node, AST.BuiltinCall):
+            return self._eval_builtin(node)
+        if isinstance(node, AST.Binary):
+            return self._binary(node, self.eval(node.left), self.eval(node.right))
+        if isinstance(node, AST.Identifier):
+            name = node.name.lower()
+            # dotted access: module.symbol
+            if "." in name:
+                mod, sym = name.split(".", 1)
+                ns = self._namespace(self.env.get(mod))
+                if ns is not None:
+                    return ns.get(sym)
+            if name in self.env:
+                return self._resolve_lazy(name)
+            # Allow implicit references to 'list' and 'map' if they were just created as last_result
+            if name in {"list", "map"} and isinstance(self.last_result, (list, dict)):
+                return self.last_result
+            raise SupRuntimeError(
+                message=f"Undefined variable '{node.name}'.",
+                line=getattr(node, "line", None),
+            )
+        if isinstance(node, AST.String):
+            return node.value
+        if isinstance(node, AST.Number):
+            return node.value
+        if isinstance(node, AST.BoolBinary):
+            if node.op == "and":
+                left = self._truthy(self.eval(node.left))
+                return left and self._truthy(self.eval(node.right))
+            if node.op == "or":
+                left = self._truthy(self.eval(node.left))
+                return left or self._truthy(self.eval(node.right))
+            raise SupRuntimeError(message=f"Unknown boolean operator {node.op}.")
+        if isinstance(node, AST.NotOp):
+            return not self._truthy(self.eval(node.expr))
+        if isinstance(node, AST.Compare):
+            return self._compare(self.eval(node.left), node.op, self.eval(node.right))
+        raise SupRuntimeError(message=f"Unsupported AST node {type(node).__name__}.")
+
+    def _binary(self, node: AST.Binary, left: object, right: object) -> object:
+        try:
+            if node.op in {"+", "-", "*"}:
+                lnum, lint = self._to_number(left)
+                rnum, rint = self._to_number(right)
+                if node.op == "+":
+                    value = lnum + rnum
+                elif node.op == "-":
+                    value = lnum - rnum
+                else:
+                    value = lnum * rnum
+                if lint and rint and float(value).is_integer():
+                    res: object = int(value)
+                else:
+                    res = float(value)
+            elif node.op == "/":
+                res = float(self._num(left)) / float(self._num(right))
+            else:
+                raise SupRuntimeError(message=f"Unknown operator {node.op}.")
+        except ZeroDivisionError:
+            raise SupRuntimeError(
+                message="Division by zero.", line=getattr(node, "line", None)
+            )
+        self.last_result = res
+        return res
+
+    def _typed_binary(self, node: AST.Binary) -> object:
+        # Operands are checked at run time too; anything unexpected takes the
+        # generic path
+        left = self.eval(node.left)
+        right = self.eval(node.right)
+        if _exact(left) and _exact(right):
+            op = node.op
+            try:
+                if op == "+":
+                    value = left + right  # type: ignore[operator]
+                elif op == "-":
+                    value = left - right  # type: ignore[operator]
+                elif op == "*":
+                    value = left * right  # type: ignore[operator]
+                else:
+                    value = left / right  # type: ignore[operator]
+            except ZeroDivisionError:
+                raise SupRuntimeError(
+                    message="Division by zero.", line=getattr(node, "line", None)
+                )
+            if _exact(value):
+                self.last_result = value
+                return value
+        return self._binary(node, left, right)
+
+    def _typed_compare(self, node: AST.Compare) -> bool:
+        left = self.eval(node.left)
+        right = self.eval(node.right)
+        if _exact(left) and _exact(right):
+            op = node.op
+            if op == "<":
+                return left < right  # type: ignore[operator]
+            if op == ">":
+                return left > right  # type: ignore[operator]
+            if op == "<=":
+                return left <= right  # type: ignore[operator]
+            if op == ">=":
+                return left >= right  # type: ignore[operator]
+        return self._compare(left, node.op, right)
+
+    def _collect(self, name: str, value: object) -> None:
+        target = self.env.get(name)
+        if not isinstance(target, list):
+            target = []
+            self.env[name] = target
+        target.append(value)
+
+    # ---- Sandbox helpers ----
+    def _check_limits(self) -> None:
+        # steps
+        if self._limit_steps is not None and self._steps > self._limit_steps:
+            raise SupRuntimeError(message="Resource limit exceeded: steps")
+        # wall time
+        if self._limit_wall_sec is not None:
+            import time as _t
+
+            if (_t.perf_counter() - self._wall_start) > self._limit_wall_sec:
+                raise SupRuntimeError(message="Resource limit exceeded: wall time")
+        # memory (tracemalloc current usage)
+        if self._limit_mem_bytes is not None and self._tm is not None:
+            try:
+                current, _peak = self._tm.get_traced_memory()
+                if current > self._limit_mem_bytes:
+                    raise SupRuntimeError(message="Resource limit exceeded: memory")
+            except Exception:
+                pass
+
+    def _reserve_fd(self, n: int = 1) -> None:
+        if self._limit_fd is None:
+            return
+        if self._fd_open_count + n > self._limit_fd:
+            raise SupRuntimeError(message="Resource limit exceeded: file descriptors")
+        self._fd_open_count += n
+
+    def _release_fd(self, n: int = 1) -> None:
+        self._fd_open_count = max(0, self._fd_open_count - n)
+
+    def _track_handle(self, handle: Any) -> Any:
+        self._handles.append(handle)
+        return handle
+
+    def _close_handles(self) -> None:
+        while self._handles:
+            try:
+                self._handles.pop().close()
+            except Exception:
+                pass
+
+    @contextmanager
+    def _safe_open(self, path: str, *args: object, **kwargs: object):
+        self._reserve_fd(1)
+        f = open(path, *args, **kwargs)  # type: ignore[arg-type]
+        try:
+            yield f
+        finally:
+            try:
+                f.close()
+            finally:
+                self._release_fd(1)
+
+    def _compare(self, left: object, op: str | None, right: object) -> bool:  # type: ignore[override]
+        if op == ">":
+            return self._num(left) > self._num(right)
+        if op == "<":
+            return self._num(left) < self._num(right)
+        if op == "==":
+            return left == right
+        if op == "!=":
+            return left != right
+        if op == ">=":
+            return self._num(left) >= self._num(right)
+        if op == "<=":
+            return self._num(left) <= self._num(right)
+        raise SupRuntimeError(message=f"Unknown relational operator {op}.")
+
+    def _truthy(self, v: object) -> bool:
+        return bool(v)
+
+    def _num(self, v: object) -> float:
+        if isinstance(v, (int, float)):
+            return float(v)
+        # attempt to parse string numbers for friendliness
+        if isinstance(v, str):
+            try:
+                return float(v)
+            except ValueError:
+                pass
+        raise SupRuntimeError(message=f"Expected a number, got {type(v).__name__}.")
+
+    def _format_value(self, v: object) -> str:
+        if isinstance(v, float):
+            return str(v)
+        return str(v)
+
+    def _to_number(self, v: object) -> tuple[float, bool]:
+        is_int = isinstance(v, int)
+        num = self._num(v)
+        return num, is_int
+
+    def _eval_builtin(self, node: AST.BuiltinCall) -> object:
+        name = node.name
+        # Filesystem / path / env / subprocess
+        if name == "env_get":
+            import os as _os
+
+            key = str(self.eval(node.args[0]))
+            out_env = _os.environ.get(key, "")
+            self.last_result = out_env
+            return out_env
+        if name == "env_set":
+            import os as _os
+
+            key = str(self.eval(node.args[0]))
+            val = str(self.eval(node.args[1]))
+            _os.environ[key] = val
+            self.last_result = val
+            return val
+        if name == "cwd":
+            import os as _os
+
+            out_cwd = _os.getcwd()
+            self.last_result = out_cwd
+            return out_cwd
+        if name == "exists":
+            import os as _os
+
+            path = str(self.eval(node.args[0]))
+            ok_exists = _os.path.exists(path)
+            self.last_result = ok_exists
+            return ok_exists
+        if name == "glob":
+            import glob as _glob
+
+            pattern = str(self.eval(node.args[0]))
+            matches = list(_glob.glob(pattern))
+            self.last_result = matches
+            return matches
+        if name == "join_path":
+            import os as _os
+
+            a = str(self.eval(node.args[0]))
+            b = str(self.eval(node.args[1]))
+            joined_path = _os.path.join(a, b)
+            self.last_result = joined_path
+            return joined_path
+        if name == "dirname":
+            import os as _os
+
+            p = str(self.eval(node.args[0]))
+            out_dirname = _os.path.dirname(p)
+            self.last_result = out_dirname
+            return out_dirname
+        if name == "basename":
+            import os as _os
+
+            p = str(self.eval(node.args[0]))
+            out_basename = _os.path.basename(p)
+            self.last_result = out_basename
+            return out_basename
+        if name == "copy_file":
+            self._require_cap("fs_write")
+            import shutil as _sh
+
+            src = str(self.eval(node.args[0]))
+            dst = str(self.eval(node.args[1]))
+            _sh.copyfile(src, dst)
+            self.last_result = True
+            return True
+        if name == "move_file":
+            self._require_cap("fs_write")
+            import shutil as _sh
+
+            src = str(self.eval(node.args[0]))
+            dst = str(self.eval(node.args[1]))
+            _sh.move(src, dst)
+            self.last_result = True
+            return True
+        if name == "remove_file":
+            self._require_cap("fs_write")
+            import os as _os
+
+            p = str(self.eval(node.args[0]))
+            try:
+                _os.remove(p)
+            except FileNotFoundError:
+                pass
+            self.last_result = True
+            return True
+        if name == "makedirs":
+            self._require_cap("fs_write")
+            import os as _os
+
+            p = str(self.eval(node.args[0]))
+            _os.makedirs(p, exist_ok=True)
+            self.last_result = True
+            return True
+        if name == "subprocess_run":
+            self._require_cap("process")
+            import subprocess as _sp
+
+            cmd = str(self.eval(node.args[0]))
+            timeout = None
+            if len(node.args) > 1:
+                try:
+                    timeout = float(self._num(self.eval(node.args[1])))
+                except Exception:
+                    timeout = None
+            cp = _sp.run(
+                cmd, shell=True, capture_output=True, text=True, timeout=timeout
+            )
+            res: dict[str, str | int] = {
+                "code": int(cp.returncode),
+                "out": cp.stdout,
+                "err": cp.stderr,
+            }
+            self.last_result = res
+            return res
+        if name == "run_commands":
+            self._require_cap("process")
+            from .procs import run_many
+
+            cmds_obj = self.eval(node.args[0])
+            if not isinstance(cmds_obj, list):
+                raise SupRuntimeError(
+                    message="run commands expects a list of commands.",
+                    line=getattr(node, "line", None),
+                )
+            opts = self.eval(node.args[1]) if len(node.args) > 1 else {}
+            if not isinstance(opts, dict):
+                raise SupRuntimeError(
+                    message="run commands options must be a map.",
+                    line=getattr(node, "line", None),
+                )
+            parallel = os.cpu_count() or 1
+            if opts.get("parallel") is not None:
+                parallel = max(1, int(self._num(opts["parallel"])))
+            per_cmd_timeout = None
+            if opts.get("timeout") is not None:
+                per_cmd_timeout = float(self._num(opts["timeout"]))
+
+            def _stream(res: dict[str, object]) -> None:
+                for key in ("out", "err"):
+                    text = str(res[key])
+                    if text:
+                        self.io.write_output(text if text.endswith("\n") else text + "\n")
+
+            cmds = [str(c) for c in cmds_obj]
+            # Each running command holds a stdout and a stderr pipe
+            fds = 2 * min(parallel, len(cmds))
+            self._reserve_fd(fds)
+            try:
+                results = run_many(
+                    cmds,
+                    parallel=parallel,
+                    timeout=per_cmd_timeout,
+                    on_result=_stream if opts.get("stream") else None,
+                )
+            finally:
+                self._release_fd(fds)
+            self.last_result = results
+            return results
+
+        # HTTP / URL / querystring
+        if name == "http_get":
+            self._require_cap("net")
+            url = str(self.eval(node.args[0]))
+            headers: dict[str, str] = {}
+            if len(node.args) > 1:
+                hdrs_obj = self.eval(node.args[1])
+                if isinstance(hdrs_obj, dict):
+                    headers = {str(k): str(v) for k, v in hdrs_obj.items()}
+            data = self._http_request("GET", url, headers=headers).text()
+            self.last_result = data
+            return data
+        if name == "http_post":
+            self._require_cap("net")
+            url = str(self.eval(node.args[0]))
+            body = str(self.eval(node.args[1]))
+            headers_post: dict[str, str] = {"Content-Type": "text/plain; charset=utf-8"}
+            if len(node.args) > 2:
+                hdrs_obj = self.eval(node.args[2])
+                if isinstance(hdrs_obj, dict):
+                    headers_post.update({str(k): str(v) for k, v in hdrs_obj.items()})
+            data = self._http_request(
+                "POST", url, body=body.encode("utf-8"), headers=headers_post
+            ).text()
+            self.last_result = data
+            return data
+        if name == "http_json":
+            self._require_cap("net")
+            import json as _json
+
+            url = str(self.eval(node.args[0]))
+            headers_json: dict[str, str] = {"Accept": "application/json"}
+            if len(node.args) > 1:
+                hdrs_obj = self.eval(node.args[1])
+                if isinstance(hdrs_obj, dict):
+                    headers_json.update({str(k): str(v) for k, v in hdrs_obj.items()})
+            text = self._http_request("GET", url, headers=headers_json).text()
+            try:
+                obj_json = _json.loads(text)
+            except ValueError as e:
+                raise SupRuntimeError(message=f"Invalid JSON from {url}: {e}")
+            self.last_result = obj_json
+            return obj_json
+        if name == "http_status":
+            self._require_cap("net")
+            url = str(self.eval(node.args[0]))
+            code = self._http_request("GET", url, check=False).status
+            self.last_result = float(code)
+            return float(code)
+        if name == "url_parse":
+            import urllib.parse as _p
+
+            u = str(self.eval(node.args[0]))
+            pr = _p.urlparse(u)
+            res_url: dict[str, str] = {
+                "scheme": pr.scheme,
+                "host": pr.netloc,
+                "path": pr.path,
+                "query": pr.query,
+                "fragment": pr.fragment,
+            }
+            self.last_result = res_url
+            return res_url
+        if name == "url_encode":
+            import urllib.parse as _p
+
+            s = str(self.eval(node.args[0]))
+            res = _p.quote(s, safe="")
+            self.last_result = res
+            return res
+        if name == "url_decode":
+            import urllib.parse as _p
+
+            s = str(self.eval(node.args[0]))
+            res = _p.unquote(s)
+            self.last_result = res
+            return res
+        if name == "querystring_encode":
+            import urllib.parse as _p
+
+            m = self.eval(node.args[0])
+            if not isinstance(m, dict):
+                raise SupRuntimeError(message="querystring encode expects a map.")
+            res = _p.urlencode({str(k): str(v) for k, v in m.items()})
+            self.last_result = res
+            return res
+        if name == "querystring_decode":
+            import urllib.parse as _p
+
+            s = str(self.eval(node.args[0]))
+            pairs = _p.parse_qsl(s, keep_blank_values=True)
+            qs_map: dict[str, str] = {}
+            for k, v in pairs:
+                qs_map[str(k)] = str(v)
+            self.last_result = qs_map
+            return qs_map
+
+        # Crypto / base64 / randomness
+        if name == "sha256":
+            import hashlib as _hh
+
+            s = str(self.eval(node.args[0]))
+            hexout = _hh.sha256(s.encode("utf-8")).hexdigest()
+            self.last_result = hexout
+            return hexout
+        if name == "sha1":
+            import hashlib as _hh
+
+            s = str(self.eval(node.args[0]))
+            hexout = _hh.sha1(s.encode("utf-8")).hexdigest()
+            self.last_result = hexout
+            return hexout
+        if name == "md5":
+            import hashlib as _hh
+
+            s = str(self.eval(node.args[0]))
+            hexout = _hh.md5(s.encode("utf-8")).hexdigest()
+            self.last_result = hexout
+            return hexout
+        if name == "hmac_sha256":
+            import hashlib as _hh
+            import hmac as _hmac
+
+            key = str(self.eval(node.args[0])).encode("utf-8")
+            msg = str(self.eval(node.args[1])).encode("utf-8")
+            hmac_hex = _hmac.new(key, msg, _hh.sha256).hexdigest()
+            self.last_result = hmac_hex
+            return hmac_hex
+        if name == "random_bytes":
+            import base64 as _b64
+            import secrets as _secrets
+
+            n = int(self._num(self.eval(node.args[0]))) if len(node.args) > 0 else 16
+            data = _secrets.token_bytes(max(1, n))
+            b64 = _b64.b64encode(data).decode("ascii")
+            self.last_result = b64
+            return b64
+        if name == "base64_encode":
+            import base64 as _b64
+
+            s_bytes = str(self.eval(node.args[0])).encode("utf-8")
+            b64 = _b64.b64encode(s_bytes).decode("ascii")
+            self.last_result = b64
+            return b64
+        if name == "base64_decode":
+            import base64 as _b64
+
+            s = str(self.eval(node.args[0]))
+            decoded = _b64.b64decode(s).decode("utf-8", "replace")
+            self.last_result = decoded
+            return decoded
+
+        # Regex
+        if name == "regex_match":
+            import re as _re
+
+            pat = str(self.eval(node.args[0]))
+            text = str(self.eval(node.args[1]))
+            ok = _re.search(pat, text) is not None
+            self.last_result = ok
+            return ok
+        if name == "regex_findall":
+            import re as _re
+
+            pat = str(self.eval(node.args[0]))
+            text = str(self.eval(node.args[1]))
+            all_matches = list(_re.findall(pat, text))
+            self.last_result = all_matches
+            return all_matches
+        if name == "regex_replace":
+            import re as _re
+
+            # Parser supplies arguments as [pattern, text, replacement]
+            pat = str(self.eval(node.args[0]))
+            text = str(self.eval(node.args[1]))
+            repl = str(self.eval(node.args[2]))
+            replaced = _re.sub(pat, repl, text)
+            self.last_result = replaced
+            return replaced
+
+        # Logging
+        if name == "set_log_level":
+            import logging as _log
+
+            if self._logger is None:
+                self._logger = _log.getLogger("sup")
+            lvl = str(self.eval(node.args[0])).upper()
+            level = getattr(_log, lvl, _log.INFO)
+            self._logger.setLevel(level)
+            self.last_result = True
+            return True
+        if name in {"log_debug", "log_info", "log_warn", "log_error"}:
+            import logging as _log
+
+            if self._logger is None:
+                self._logger = _log.getLogger("sup")
+            msg_txt = str(self.eval(node.args[0])) if len(node.args) > 0 else ""
+            if name == "log_debug":
+                self._logger.debug(msg_txt)
+            elif name == "log_info":
+                self._logger.info(msg_txt)
+            elif name == "log_warn":
+                self._logger.warning(msg_txt)
+            else:
+                self._logger.error(msg_txt)
+            self.last_result = True
+            return True
+
+        # CLI args
+        if name == "args":
+            import sys as _sys
+
+            argv_list = list(_sys.argv[1:])
+            self.last_result = argv_list
+            return argv_list
+        if name == "arg":
+            import sys as _sys
+
+            idx = int(self._num(self.eval(node.args[0])))
+            vals = list(_sys.argv[1:])
+            val = vals[idx] if 0 <= idx < len(vals) else ""
+            self.last_result = val
+            return val
+        if name == "args_map":
+            import sys as _sys
+
+            vals = list(_sys.argv[1:])
+            arg_map: dict[str, str] = {}
+            for tok in vals:
+                if tok.startswith("--") and "=" in tok:
+                    k, v = tok[2:].split("=", 1)
+                    arg_map[k] = v
+            self.last_result = arg_map
+            return arg_map
+
+        # CSV / XML / ZIP / SQLite
+        if name == "csv_read":
+            import csv as _csv
+
+            p = str(self.eval(node.args[0]))
+            rows: list[list[str]] = []
+            with open(p, newline="", encoding="utf-8") as f:
+                for row in _csv.reader(f):
+                    rows.append([str(x) for x in row])
+            self.last_result = rows
+            return rows
+        if name == "csv_write":
+            self._require_cap("fs_write")
+            import csv as _csv
+
+            p = str(self.eval(node.args[0]))
+            rows_obj = self.eval(node.args[1])
+            if not isinstance(rows_obj, list):
+                raise SupRuntimeError(message="csv write expects list of rows.")
+            with open(p, "w", newline="", encoding="utf-8") as f:
+                w = _csv.writer(f)
+                for r in rows_obj:
+                    if isinstance(r, list):
+                        w.writerow([str(x) for x in r])
+                    else:
+                        w.writerow([str(r)])
+            self.last_result = True
+            return True
+        if name == "csv_stream":
+            from .streams import CsvStream
+
+            p = str(self.eval(node.args[0]))
+            opts = self.eval(node.args[1]) if len(node.args) > 1 else {}
+            if not isinstance(opts, dict):
+                raise SupRuntimeError(message="csv stream options must be a map.")
+            cols = opts.get("columns")
+            if cols is not None and not isinstance(cols, list):
+                cols = [cols]
+            csv_stream = CsvStream(
+                p,
+                header=self._truthy(opts.get("header")),
+                columns=cols,
+                infer_types=self._truthy(opts.get("types")),
+                on_open=self._reserve_fd,
+                on_close=self._release_fd,
+            )
+            self.last_result = csv_stream
+            return csv_stream
+        if name == "csv_writer":
+            self._require_cap("fs_write")
+            from .streams import CsvWriter
+
+            p = str(self.eval(node.args[0]))
+            header_obj = self.eval(node.args[1]) if len(node.args) > 1 else None
+            if header_obj is not None and not isinstance(header_obj, list):
+                raise SupRuntimeError(message="csv writer header must be a list.")
+            self._reserve_fd(1)
+            try:
+                csv_w = CsvWriter(p, header_obj, on_close=self._release_fd)
+            except Exception:
+                self._release_fd(1)
+                raise
+            self.last_result = self._track_handle(csv_w)
+            return csv_w
+        if name == "write_row":
+            from .streams import Writer
+
+            handle = self.eval(node.args[0])
+            row_obj = self.eval(node.args[1])
+            if not isinstance(handle, Writer):
+                raise SupRuntimeError(message="write row expects a writer handle.")
+            handle.write(row_obj)
+            self.last_result = handle
+            return handle
+        if name == "close_writer":
+            from .streams import Writer
+
+            handle = self.eval(node.args[0])
+            if not isinstance(handle, Writer):
+                raise SupRuntimeError(message="close writer expects a writer handle.")
+            handle.close()
+            if handle in self._handles:
+                self._handles.remove(handle)
+            self.last_result = True
+            return True
+        if name == "xml_parse":
+            import xml.etree.ElementTree as _ET
+
+            s = str(self.eval(node.args[0]))
+            elem = _ET.fromstring(s)
+            self.last_result = elem
+            return elem
+        if name == "xml_find":
+            root = self.eval(node.args[0])
+            path = str(self.eval(node.args[1]))
+            if hasattr(root, "findall"):
+                elems = list(root.findall(path))  # type: ignore[attr-defined]
+            else:
+                elems = []
+            self.last_result = elems
+            return elems
+        if name == "xml_text":
+            el = self.eval(node.args[0])
+            text = getattr(el, "text", None)
+            txt = "" if text is None else str(text)
+            self.last_result = txt
+            return txt
+        if name == "zip_create":
+            self._require_cap("archive")
+            import zipfile as _zf
+
+            zip_path = str(self.eval(node.args[0]))
+            files = self.eval(node.args[1])
+            if not isinstance(files, list):
+                raise SupRuntimeError(message="zip create expects list of files.")
+            with _zf.ZipFile(zip_path, "w", compression=_zf.ZIP_DEFLATED) as zf:
+                for p in files:
+                    zf.write(str(p), arcname=str(p))
+            self.last_result = True
+            return True
+        if name == "zip_extract":
+            self._require_cap("archive")
+            import zipfile as _zf
+
+            zip_path = str(self.eval(node.args[0]))
+            out_dir = str(self.eval(node.args[1]))
+            with _zf.ZipFile(zip_path, "r") as zf:
+                zf.extractall(out_dir)
+            self.last_result = True
+            return True
+        if name == "sqlite_exec":
+            self._require_cap("sql")
+            import sqlite3 as _sql
+
+            db = str(self.eval(node.args[0]))
+            sql = str(self.eval(node.args[1]))
+            params = ()
+            if len(node.args) > 2:
+                plist = self.eval(node.args[2])
+                if isinstance(plist, list):
+                    params = tuple(plist)
+            con = _sql.connect(db)
+            try:
+                cur = con.cursor()
+                cur.execute(sql, params)
+                con.commit()
+                lastrowid = cur.lastrowid
+            finally:
+                con.close()
+            self.last_result = float(lastrowid if lastrowid is not None else 0)
+            return float(lastrowid if lastrowid is not None else 0)
+        if name == "sqlite_query":
+            self._require_cap("sql")
+            import sqlite3 as _sql
+
+            db = str(self.eval(node.args[0]))
+            sql = str(self.eval(node.args[1]))
+            params = ()
+            if len(node.args) > 2:
+                plist = self.eval(node.args[2])
+                if isinstance(plist, list):
+                    params = tuple(plist)
+            con = _sql.connect(db)
+            try:
+                cur = con.cursor()
+                cur.execute(sql, params)
+                rows = [
+                    [
+                        c if not isinstance(c, bytes) else c.decode("utf-8", "replace")
+                        for c in r
+                    ]
+                    for r in cur.fetchall()
+                ]
+            finally:
+                con.close()
+            self.last_result = rows
+            return rows
+        if name == "sqlite_stream":
+            self._require_cap("sql")
+            from .streams import SqliteStream
+
+            db = str(self.eval(node.args[0]))
+            sql = str(self.eval(node.args[1]))
+            params = ()
+            if len(node.args) > 2:
+                plist = self.eval(node.args[2])
+                if isinstance(plist, list):
+                    params = tuple(plist)
+            sql_stream = SqliteStream(
+                db, sql, params, on_open=self._reserve_fd, on_close=self._release_fd
+            )
+            self.last_result = sql_stream
+            return sql_stream
+
+        # Async helpers
+        if name in {"async_http_get", "async_http_post"}:
+            self._require_cap("net")
+            url = str(self.eval(node.args[0]))
+            idx_hdrs = 1
+            body_bytes: bytes | None = None
+            hdrs_async: dict[str, str] = {}
+            if name == "async_http_post":
+                body_bytes = str(self.eval(node.args[1])).encode("utf-8")
+                hdrs_async["Content-Type"] = "text/plain; charset=utf-8"
+                idx_hdrs = 2
+            if len(node.args) > idx_hdrs:
+                hdrs_obj = self.eval(node.args[idx_hdrs])
+                if isinstance(hdrs_obj, dict):
+                    hdrs_async.update({str(k): str(v) for k, v in hdrs_obj.items()})
+            method = "POST" if body_bytes is not None else "GET"
+            self._http_client()
+
+            def _task() -> str:
+                return self._http_request(
+                    method, url, body=body_bytes, headers=hdrs_async
+                ).text()
+
+            f = self._async_runtime().run_blocking(
+                _task, timeout=self._async_timeout_sec or self._http_timeout_sec
+            )
+            self.last_result = f
+            return f
+        if name == "async_read_file":
+            path = str(self.eval(node.args[0]))
+
+            def _read() -> str:
+                with open(path, encoding="utf-8") as fh:
+                    return fh.read()
+
+            f = self._async_runtime().run_blocking(
+                _read, timeout=self._async_timeout_sec
+            )
+            self.last_result = f
+            return f
+        if name == "async_write_file":
+            self._require_cap("fs_write")
+            path = str(self.eval(node.args[0]))
+            data = str(self.eval(node.args[1]))
+
+            # Counted like _safe_open, from submission until the write finishes
+            self._reserve_fd(1)
+
+            def _write() -> bool:
+                try:
+                    with open(path, "w", encoding="utf-8") as fh:
+                        fh.write(data)
+                    return True
+                finally:
+                    self._release_fd(1)
+
+            try:
+                f = self._async_runtime().run_blocking(
+                    _write, timeout=self._async_timeout_sec
+                )
+            except Exception:
+                self._release_fd(1)
+                raise
+            self.last_result = f
+            return f
+        if name == "async_subprocess_run":
+            self._require_cap("process")
+            cmd = str(self.eval(node.args[0]))
+            timeout = self._async_timeout_sec
+            if len(node.args) > 1:
+                try:
+                    timeout = float(self._num(self.eval(node.args[1])))
+                except Exception:
+                    timeout = self._async_timeout_sec
+            f = self._async_runtime().subprocess(cmd, timeout=timeout)
+            self.last_result = f
+            return f
+        if name in {"await", "await_all", "await_first"}:
+            import concurrent.futures as _fut
+
+            from .aio import wait_all, wait_first
+
+            target = self.eval(node.args[0])
+            futs = target if isinstance(target, list) else [target]
+            if not all(isinstance(x, _fut.Future) for x in futs):
+                raise SupRuntimeError(
+                    message=f"{name.replace('_', ' ')} expects async task(s).",
+                    line=getattr(node, "line", None),
+                )
+            try:
+                if name == "await_first":
+                    outv = wait_first(futs)
+                elif name == "await_all" or isinstance(target, list):
+                    outv = wait_all(futs)
+                else:
+                    outv = futs[0].result()
+            except SupRuntimeError:
+                raise
+            except Exception as e:
+                raise SupRuntimeError(message=str(e) or type(e).__name__)
+            self.last_result = outv
+            return outv
+        if name == "now":
+            import datetime as _dt
+
+            now_s = _dt.datetime.now().isoformat()
+            self.last_result = now_s
+            return now_s
+        if name == "read_file":
+            path = str(self.eval(node.args[0]))
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+            self.last_result = content
+            return content
+        if name == "write_file":
+            self._require_cap("fs_write")
+            path = str(self.eval(node.args[0]))
+            data = str(self.eval(node.args[1]))
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(data)
+            self.last_result = True
+            return True
+        if name == "json_parse":
+            import json as _json
+
+            s = str(self.eval(node.args[0]))
+            res = _json.loads(s)
+            self.last_result = res
+            return res
+        if name == "json_lines":
+            from .streams import JsonLinesStream
+
+            p = str(self.eval(node.args[0]))
+            jl_stream = JsonLinesStream(
+                p, on_open=self._reserve_fd, on_close=self._release_fd
+            )
+            self.last_result = jl_stream
+            return jl_stream
+        if name == "json_lines_writer":
+            self._require_cap("fs_write")
+            from .streams import JsonLinesWriter
+
+            p = str(self.eval(node.args[0]))
+            self._reserve_fd(1)
+            try:
+                jl_w = JsonLinesWriter(p, on_close=self._release_fd)
+            except Exception:
+                self._release_fd(1)
+                raise
+            self.last_result = self._track_handle(jl_w)
+            return jl_w
+        if name == "json_stringify":
+            import json as _json
+
+            v = self.eval(node.args[0])
+            jstr = _json.dumps(v)
+            self.last_result = jstr
+            return jstr
+        if name == "min":
+            a = self.eval(node.args[0])
+            b = self.eval(node.args[1])
+            num = min(self._num(a), self._num(b))
+            self.last_result = float(num)
+            return float(num)
+        if name == "max":
+            a = self.eval(node.args[0])
+            b = self.eval(node.args[1])
+            num = max(self._num(a), self._num(b))
+            self.last_result = float(num)
+            return float(num)
+        if name == "floor":
+            import math
+
+            a = self._num(self.eval(node.args[0]))
+            iv = math.floor(a)
+            self.last_result = float(iv)
+            return float(iv)
+        if name == "ceil":
+            import math
+
+            a = self._num(self.eval(node.args[0]))
+            iv = math.ceil(a)
+            self.last_result = float(iv)
+            return float(iv)
+        if name == "trim":
+            s = str(self.eval(node.args[0]))
+            out_str = s.strip()
+            self.last_result = out_str
+            return out_str
+        if name == "contains":
+            s = self.eval(node.args[0])
+            sub = self.eval(node.args[1])
+            if isinstance(s, list):
+                ok = any(item == sub for item in s)
+            else:
+                ok = str(sub) in str(s)
+            self.last_result = ok
+            return ok
+        if name == "join":
+            sep = str(self.eval(node.args[0]))
+            lst = self.eval(node.args[1])
+            if not isinstance(lst, list):
+                raise SupRuntimeError(message="join expects a list.")
+            joined = sep.join(str(x) for x in lst)
+            self.last_result = joined
+            return joined
+        if name == "power":
+            a = self._num(self.eval(node.args[0]))
+            b = self._num(self.eval(node.args[1]))
+            num_res = float(a) ** float(b)
+            self.last_result = num_res
+            return num_res
+        if name == "sqrt":
+            import math
+
+            a = self._num(self.eval(node.args[0]))
+            num_res = math.sqrt(float(a))
+            self.last_result = num_res
+            return num_res
+        if name == "abs":
+            a = self.eval(node.args[0])
+            if isinstance(a, (int, float)):
+                num_res = abs(a)
+            else:
+                num_res = abs(self._num(a))
+            self.last_result = float(num_res)
+            return float(num_res)
+        if name == "upper":
+            s = str(self.eval(node.args[0]))
+            out_str = s.upper()
+            self.last_result = out_str
+            return out_str
+        if name == "lower":
+            s = str(self.eval(node.args[0]))
+            out_str = s.lower()
+            self.last_result = out_str
+            return out_str
+        if name == "concat":
+            a = str(self.eval(node.args[0]))
+            b = str(self.eval(node.args[1]))
+            out_str = a + b
+            self.last_result = out_str
+            return out_str
+        raise SupRuntimeError(message=f"Unknown builtin {name}.")
+
+    def _call_function(self, node: AST.Call) -> object:
+        # module-qualified call mm.square
+        name = node.name.lower()
+        if "." in name:
+            mod, sym = name.split(".", 1)
+            ns = self._namespace(self.env.get(mod))
+            if ns is not None:
+                target = ns.get(sym)
+                if isinstance(target, AST.FunctionDef):
+                    return self._call_fn_def(target, node.args)
+                raise SupRuntimeError(
+                    message=f"Undefined function '{node.name}'.",
+                    line=getattr(node, "line", None),
+                )
+        # direct function from env via from-import
+        if name in self.env and isinstance(self._resolve_lazy(name), AST.FunctionDef):
+            return self._call_fn_def(self.env[name], node.args)  # type: ignore[arg-type]
+        if name not in self.functions:
+            raise SupRuntimeError(
+                message=f"Undefined function '{node.name}'.",
+                line=getattr(node, "line", None),
+            )
+        fn = self.functions[name]
+        if len(node.args) != len(fn.params):
+            raise SupRuntimeError(
+                message=f"Function '{fn.name}' expects {len(fn.params)} argument(s) but got {len(node.args)}."
+            )
+        # Evaluate args
+        arg_vals = [self.eval(a) for a in node.args]
+        return self._invoke(fn, arg_vals)
+
+    def _call_fn_def(self, fn: AST.FunctionDef, arg_nodes: list[AST.Node]) -> object:
+        if len(arg_nodes) != len(fn.params):
+            raise SupRuntimeError(
+                message=f"Function '{fn.name}' expects {len(fn.params)} argument(s) but got {len(arg_nodes)}."
+            )
+        arg_vals = [self.eval(a) for a in arg_nodes]
+        return self._invoke(fn, arg_vals)
+
+    def _invoke(self, fn: AST.FunctionDef, arg_vals: list[object]) -> object:
+        if not fn.memo or self._memo is None:
+            return self._run_function(fn, arg_vals)
+        key = memo.key(arg_vals)
+        cache = self._memo.get(id(fn))
+        if cache is None:
+            cache = self._memo[id(fn)] = memo.LRUCache(self._memo_size)
+            # Keep fn alive so its id is not reused by another definition
+            self._memo_fns.append(fn)
+        if key is not None:
+            entry = cache.get(key)
+            if entry is not None:
+                self.last_result = entry[1]
+                return entry[0]
+        stored_key = self._stored_key(fn, arg_vals) if fn.cached and self._func_cache_dir else None
+        if stored_key is not None:
+            entry = self._func_cache.get(stored_key)
+            if entry is not None:
+                value, self.last_result = entry
+                if key is not None and memo.cacheable(value):
+                    cache.put(key, entry)
+                return value
+        value = self._run_function(fn, arg_vals)
+        if key is not None and memo.cacheable(value):
+            cache.put(key, (value, self.last_result))
+        if stored_key is not None:
+            self._func_cache.put(stored_key, value, self.last_result)
+        return value
+
+    def _stored_key(self, fn: AST.FunctionDef, arg_vals: list[object]) -> str | None:
+        """Key of this call in the cross-run result cache, None if it cannot be stored."""
+        from .funccache import FunctionCache, fingerprint
+
+        if self._func_cache is None:
+            self._func_cache = FunctionCache(
+                self._func_cache_dir, max_bytes=self._func_cache_max_bytes  # type: ignore[arg-type]
+            )
+        digest = self._func_digests.get(id(fn))
+        if digest is None:
+            digest = fingerprint(fn, self._callee)
+            if digest is None:
+                return None
+            self._func_digests[id(fn)] = digest
+        return FunctionCache.key(digest, arg_vals)
+
+    def _callee(self, name: str) -> AST.FunctionDef | None:
+        """The function ``call name`` would run now, without loading lazy modules."""
+        from .loader import LazyModule, LazySymbol
+
+        if "." in name:
+            mod, sym = name.split(".", 1)
+            value = self.env.get(mod)
+            ns = value.peek() if isinstance(value, LazyModule) else value
+            target = ns.get(sym) if isinstance(ns, dict) else None
+            return target if isinstance(target, AST.FunctionDef) else None
+        if name in self.env:
+            value = self.env[name]
+            if isinstance(value, LazySymbol):
+                ns = value.module.peek()
+                value = ns.get(value.name) if ns is not None else None
+            if isinstance(value, AST.FunctionDef):
+                return value
+        return self.functions.get(name)
+
+    def _run_function(self, fn: AST.FunctionDef, arg_vals: list[object]) -> object:
+        # New scope
+        saved_env = self.env.copy()
+        try:
+            self.env = self.env.copy()
+            for pname, pval in zip(fn.params, arg_vals):
+                self.env[pname.lower()] = pval
+            # Execute body
+            ret_val: object | None = None
+            try:
+                for s in fn.body:
+                    self.eval(s)
+            except _ReturnSignal as r:
+                ret_val = r.value
+            self.last_result = ret_val
+            # Ensure division/float semantics are visible when printed via call in print
+            if isinstance(ret_val, (int, float)) and not isinstance(ret_val, bool):
+                return float(ret_val)
+            return ret_val
+        finally:
+            self.env = saved_env
+
+    def _import_module(self, module: str) -> dict[str, object]:
+        key = module.lower()
+        if key in self.module_cache:
+            return self.module_cache[key]
+        if key in self.loading_modules:
+            raise SupRuntimeError(
+                message=f"Circular import detected for module '{module}'."
+            )
+        from . import loader
+
+        path = loader.resolve(module)
+        if path is None:
+            raise SupRuntimeError(message=f"Cannot find module '{module}'.")
+        program = loader.load(path)
+        if self._typed:
+            from .typecheck import annotate
+
+            # The parse is shared by later runs, so its marks must not depend on
+            # other modules, which may change while this one stays cached
+            annotate(program, module=True, imports="none")
+        if self._memo is not None:
+            memo.annotate(program, module=True)
+        self.loading_modules.add(key)
+        try:
+            child = self._child_interpreter()
+            try:
+                child.eval_program(program)
+            finally:
+                self._adopt_child_state(child)
+        finally:
+            self.loading_modules.discard(key)
+        # Export top-level env and functions
+        from .loader import LazySymbol
+
+        ns: dict[str, object] = {}
+        for name, value in child.env.items():
+            # Re-exported lazy from-imports are bound now, as eager mode would have
+            ns[name] = value.resolve() if isinstance(value, LazySymbol) else value
+        for name, fn in child.functions.items():
+            ns[name] = fn
+        self.module_cache[key] = ns
+        return ns
+
+    def _namespace(self, value: object) -> dict[str, object] | None:
+        """Module namespace bound to a name, loading lazy modules on first access."""
+        from .loader import LazyModule
+
+        if isinstance(value, LazyModule):
+            return value.load()
+        return value if isinstance(value, dict) else None
+
+    def _resolve_lazy(self, name: str) -> object:
+        from .loader import LazySymbol
+
+        value = self.env[name]
+        if isinstance(value, LazySymbol):
+            value = value.resolve()
+            self.env[name] = value
+        return value
+
+    def _child_interpreter(self) -> Interpreter:
+        """A fresh module scope that shares this interpreter's configuration.
+
+        Skips ``__init__`` (environment parsing, tracemalloc start-up): limits,
+        capabilities, counters and lazily created resources are inherited, and the
+        parent stays responsible for closing them when its run ends.
+        """
+        child = object.__new__(type(self))
+        child.__dict__.update(self.__dict__)
+        child.env = {}
+        child.functions = {}
+        child.last_result = None
+        child.io = IOHooks()
+        child._collected = None
+        # Calls in the module resolve against its own functions
+        child._func_digests = {}
+        return child
+
+    def _adopt_child_state(self, child: Interpreter) -> None:
+        self._steps = child._steps
+        self._fd_open_count = child._fd_open_count
+        for attr in ("_logger", "_async", "_http_pool", "_http_cache", "_func_cache"):
+            if getattr(self, attr) is None:
+                setattr(self, attr, getattr(child, attr))
+
+    # ---- HTTP helpers ----
+    def _http_client(self) -> Any:
+        if self._http_pool is None:
+            from .httpclient import ConnectionPool
+
+            self._http_pool = ConnectionPool(max_per_host=self._http_pool_size)
+        return self._http_pool
+
+    def _async_runtime(self) -> Any:
+        if self._async is None:
+            from .aio import AsyncRuntime
+
+            self._async = AsyncRuntime(concurrency=self._async_limit)
+        return self._async
+
+    def _http_request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        check: bool = True,
+    ) -> Any:
+        """Send a request through the per-interpreter keep-alive pool.
+
+        Callers check capabilities first; GETs go through the on-disk cache when
+        SUP_HTTP_CACHE is set, so cached hits still require ``net``.
+        """
+        pool = self._http_client()
+
+        def send(hdrs: dict[str, str] | None) -> Any:
+            return pool.request(
+                method,
+                url,
+                body=body,
+                headers=hdrs,
+                timeout=self._http_timeout_sec,
+                max_bytes=self._http_max_bytes,
+            )
+
+        try:
+            if method == "GET" and self._http_cache_dir:
+                if self._http_cache is None:
+                    from .httpcache import HttpCache
+
+                    self._http_cache = HttpCache(
+                        self._http_cache_dir, max_bytes=self._http_cache_max_bytes
+                    )
+                resp = self._http_cache.request(send, url, dict(headers or {}))
+            else:
+                resp = send(headers)
+        except SupRuntimeError:
+            raise
+        except Exception as e:
+            raise SupRuntimeError(message=f"HTTP {method} {url} failed: {e}")
+        if check and resp.status >= 400:
+            raise SupRuntimeError(message=f"HTTP {resp.status} for {url}.")
+        return resp
+
+    # ---- Capability helpers ----
+    def _require_cap(self, cap: str) -> None:
+        if self._unsafe_all:
+            return
+        if cap in self.capabilities:
+            return
+        raise SupRuntimeError(
+            message=f"Operation requires capability '{cap}'. Enable via SUP_CAPS or SUP_UNSAFE."
+        )
+
+
+class _ReturnSignal(Exception):
+    def __init__(self, value: object | None) -> None:
+        self.value = value
+
+
+class _SupThrown(Exception):
+    def __init__(self, value: object) -> None:
+        self.value = value
+        super().__init__(str(value))
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from . import ast as AST
+
+# Process-wide caches shared by every interpreter (and by build/transpile tooling).
+# (module, search paths) -> last resolved file path; only a hint for ``peek``
+_resolved: dict[tuple[str, tuple[str, ...]], str] = {}
+# absolute path -> parsed module, validated against the file's mtime and size
+_compiled: dict[str, _Compiled] = {}
+_lock = threading.Lock()
+
+
+@dataclass
+class _Compiled:
+    mtime_ns: int
+    size: int
+    program: AST.Program
+
+
+@dataclass
+class LoaderStats:
+    compile_hits: int = 0
+    compile_misses: int = 0
+
+
+stats = LoaderStats()
+
+
+def search_paths() -> list[str]:
+    """``SUP_PATH`` entries followed by the current directory."""
+    paths: list[str] = []
+    env_path = os.environ.get("SUP_PATH")
+    if env_path:
+        paths.extend(env_path.split(os.pathsep))
+    paths.append(os.getcwd())
+    return paths
+
+
+def resolve(module: str, paths: list[str] | None = None) -> str | None:
+    """Path of ``<module>.sup`` on the search path, or None.
+
+    Not cached: a lookup is a few ``stat`` calls, the same as validating a cached
+    path would cost, and each interpreter resolves a module only once per run.
+    The result is remembered for ``peek``.
+    """
+    paths = search_paths() if paths is None else paths
+    name = f"{module}.sup"
+    for base in paths:
+        candidate = os.path.join(base, name)
+        if os.path.exists(candidate):
+            with _lock:
+                _resolved[(module.lower(), tuple(paths))] = candidate
+            return candidate
+    return None
+
+
+def load(path: str) -> AST.Program:
+    """Parse ``path``, reusing the previous parse while its mtime and size match.
+
+    Programs are shared between importers. The only changes allowed are
+    annotations that record the kind they were made with (``typecheck.annotate``,
+    ``memo.annotate``), so a caller asking for another kind redoes them; the
+    interpreter uses kinds that depend on the module alone. Anything else must
+    work on a copy (see ``owned``).
+    """
+    full = os.path.abspath(path)
+    st = os.stat(full)
+    with _lock:
+        entry = _compiled.get(full)
+    if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+        stats.compile_hits += 1
+        return entry.program
+    stats.compile_misses += 1
+    entry = _read_and_parse(full)
+    with _lock:
+        _compiled[full] = entry
+    return entry.program
+
+
+def owned(program: AST.Program) -> bool:
+    """Whether ``program`` is a shared parse handed out by ``load``."""
+    return any(entry.program is program for entry in list(_compiled.values()))
+
+
+def _read_and_parse(full: str) -> _Compiled:
+    from .parser import Parser
+
+    # stat before reading so a concurrent edit invalidates the entry next time
+    st = os.stat(full)
+    with open(full, encoding="utf-8") as f:
+        src = f.read()
+    return _Compiled(st.st_mtime_ns, st.st_size, Parser().parse(src))
+
+
+def imports_of(program: AST.Node) -> list[str]:
+    """Module names imported anywhere in ``program``, in source order."""
+    return [
+        node.module
+        for node in AST.walk(program)
+        if isinstance(node, (AST.Import, AST.FromImport))
+    ]
+
+
+def _current(full: str) -> AST.Program | None:
+    """The cached parse of ``full`` if it is still up to date."""
+    with _lock:
+        entry = _compiled.get(full)
+    if entry is None:
+        return None
+    try:
+        st = os.stat(full)
+    except OSError:
+        return None
+    if entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+        return entry.program
+    return None
+
+
+def peek(module: str) -> AST.Program | None:
+    """The cached, up-to-date parse of ``module``; never reads or parses files.
+
+    Does not count towards ``stats``.
+    """
+    with _lock:
+        cached = _resolved.get((module.lower(), tuple(search_paths())))
+    return _current(os.path.abspath(cached)) if cached is not None else None
+
+
+def cached_programs() -> list[tuple[str, AST.Program]]:
+    """``(path, program)`` for every parsed module in the cache.
+
+    Takes no lock, so signal handlers may call it; the copy is atomic under the GIL.
+    """
+    return [(path, entry.program) for path, entry in list(_compiled.items())]
+
+
+def prefetch(
+    program: AST.Program, *, workers: int | None = None, processes: bool = False
+) -> int:
+    """Resolve and parse every module reachable from ``program`` ahead of time.
+
+    Imports are followed transitively; each newly found module is read and
+    parsed on a pool (threads, or processes when ``processes`` is set, which
+    sidesteps the GIL for parse-heavy projects) and stored in the compiled-module
+    cache for the interpreter to pick up. Failures are ignored here: they surface
+    with the usual message when execution reaches the import. Returns the number
+    of modules parsed.
+    """
+    import concurrent.futures as _fut
+
+    if not imports_of(program):
+        return 0
+    paths = search_paths()
+    seen: set[str] = set()
+    parsed = 0
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    pool_cls = _fut.ProcessPoolExecutor if processes else _fut.ThreadPoolExecutor
+    with pool_cls(max_workers=workers) as pool:
+        futures: dict[_fut.Future, str] = {}
+
+        def schedule(program: AST.Node) -> None:
+            for module in imports_of(program):
+                key = module.lower()
+                if key in seen:
+                    continue
+                seen.add(key)
+                path = resolve(module, paths)
+                if path is None:
+                    continue
+                full = os.path.abspath(path)
+                cached = _current(full)
+                if cached is not None:
+                    schedule(cached)
+                    continue
+                stats.compile_misses += 1
+                futures[pool.submit(_read_and_parse, full)] = full
+
+        schedule(program)
+        while futures:
+            done, _ = _fut.wait(futures, return_when=_fut.FIRST_COMPLETED)
+            for f in done:
+                full = futures.pop(f)
+                try:
+                    entry = f.result()
+                except Exception:
+                    continue
+                with _lock:
+                    _compiled[full] = entry
+                parsed += 1
+                schedule(entry.program)
+    return parsed
+
+
+# "auto" prefetch only pays for its pool with several direct imports and cores to
+# spread parsing over; parsing is CPU-bound, so threads only help on slow disks.
+PREFETCH_MIN_IMPORTS = 8
+
+
+def maybe_prefetch(program: AST.Program, mode: str) -> int:
+    """Apply the ``SUP_PREFETCH`` mode: auto, threads, processes or 0/off."""
+    mode = mode.lower()
+    if mode in {"0", "off", "no", "false"}:
+        return 0
+    if mode == "auto":
+        if (os.cpu_count() or 1) < 2 or len(imports_of(program)) < PREFETCH_MIN_IMPORTS:
+            return 0
+        mode = "processes"
+    return prefetch(program, processes=mode == "processes")
+
+
+def clear_caches() -> None:
+    with _lock:
+        _resolved.clear()
+        _compiled.clear()
+    stats.__init__()  # type: ignore[misc]
+
+
+class LazyModule:
+    """Namespace bound by ``import`` in lazy mode (``SUP_LAZY_IMPORTS=1``).
+
+    The module is resolved and executed by ``load`` on first dotted access; the
+    resulting namespace is then reused.
+    """
+
+    def __init__(self, name: str, importer: Callable[[str], dict[str, object]]) -> None:
+        self.name = name
+        self._importer = importer
+        self._ns: dict[str, object] | None = None
+
+    def load(self) -> dict[str, object]:
+        if self._ns is None:
+            self._ns = self._importer(self.name)
+        return self._ns
+
+    def peek(self) -> dict[str, object] | None:
+        """The namespace if the module has already been loaded."""
+        return self._ns
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._ns is not None else "not loaded"
+        return f"<module {self.name!r} ({state})>"
+
+
+class LazySymbol:
+    """Name bound by ``from M import NAME`` in lazy mode; resolved on first use."""
+
+    def __init__(self, module: LazyModule, name: str) -> None:
+        self.module = module
+        self.name = name
+
+    def resolve(self) -> object:
+        from .errors import SupRuntimeError
+
+        ns = self.module.load()
+        if self.name not in ns:
+            raise SupRuntimeError(
+                message=f"Module '{self.module.name}' has no symbol '{self.name}'."
+            )
+        return ns[self.name]
+
+    def __repr__(self) -> str:
+        return f"<lazy {self.module.name}.{self.name}>"
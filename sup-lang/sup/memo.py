@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from . import ast as AST
+from .typecheck import TypeIssue
+
+# Builtins whose result depends only on their arguments
+_PURE_BUILTINS = frozenset(
+    {
+        "min",
+        "max",
+        "floor",
+        "ceil",
+        "abs",
+        "sqrt",
+        "power",
+        "upper",
+        "lower",
+        "trim",
+        "concat",
+        "join",
+        "contains",
+        "json_parse",
+        "json_stringify",
+        "regex_match",
+        "regex_findall",
+        "regex_replace",
+        "url_parse",
+        "url_encode",
+        "url_decode",
+        "querystring_encode",
+        "querystring_decode",
+        "sha256",
+        "sha1",
+        "md5",
+        "hmac_sha256",
+        "base64_encode",
+        "base64_decode",
+    }
+)
+# Expressions that only compute values or touch lists and maps the function built itself
+_PURE_EXPRS = (
+    AST.Binary,
+    AST.Compare,
+    AST.BoolBinary,
+    AST.NotOp,
+    AST.Number,
+    AST.String,
+    AST.Identifier,
+    AST.Call,
+    AST.BuiltinCall,
+    AST.MakeList,
+    AST.MakeMap,
+    AST.Push,
+    AST.Pop,
+    AST.GetKey,
+    AST.SetKey,
+    AST.DeleteKey,
+    AST.Length,
+    AST.Index,
+)
+# Argument and result kinds that are immutable and compare by value
+_VALUE_TYPES = frozenset({int, float, str, bool, type(None)})
+
+
+@dataclass
+class MemoStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+stats = MemoStats()
+
+
+class LRUCache:
+    """Results of one function keyed by argument values, at most ``size`` entries."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._data: OrderedDict[tuple, tuple[object, object]] = OrderedDict()
+
+    def get(self, key: tuple) -> tuple[object, object] | None:
+        entry = self._data.get(key)
+        if entry is None:
+            stats.misses += 1
+            return None
+        stats.hits += 1
+        try:
+            self._data.move_to_end(key)
+        except KeyError:  # evicted by a parallel worker meanwhile
+            pass
+        return entry
+
+    def put(self, key: tuple, entry: tuple[object, object]) -> None:
+        self._data[key] = entry
+        if len(self._data) > self.size:
+            self._data.popitem(last=False)
+            stats.evictions += 1
+
+
+def key(args: list[object]) -> tuple | None:
+    """Cache key for ``args``, or None when one of them is mutable."""
+    parts = []
+    for v in args:
+        t = type(v)
+        if t not in _VALUE_TYPES:
+            return None
+        # 1, 1.0 and True are equal in Python but print differently in sup
+        if t is float and v == 0:
+            v = str(v)
+        parts.append((t, v))
+    return tuple(parts)
+
+
+def cacheable(value: object) -> bool:
+    return type(value) in _VALUE_TYPES
+
+
+class _Impure(Exception):
+    pass
+
+
+class _Purity:
+    """Why each function may observe or change anything besides its arguments."""
+
+    def __init__(self, program: AST.Program, *, module: bool) -> None:
+        self.functions = [n for n in AST.walk(program) if isinstance(n, AST.FunctionDef)]
+        counts: dict[str, int] = {}
+        for fn in self.functions:
+            counts[fn.name.lower()] = counts.get(fn.name.lower(), 0) + 1
+        # Names that may hold an imported function at run time shadow self.functions
+        bound: set[str] = set()
+        for node in AST.walk(program):
+            if isinstance(node, AST.FromImport):
+                bound.update((alias or name).lower() for name, alias in node.names)
+            elif isinstance(node, AST.FunctionDef):
+                bound.update(p.lower() for p in node.params)
+            elif isinstance(node, (AST.Assignment, AST.Ask)):
+                bound.add(node.name.lower())
+            elif isinstance(node, AST.ForEach):
+                bound.add(node.var.lower())
+            elif isinstance(node, AST.TryCatch) and node.catch_name:
+                bound.add(node.catch_name.lower())
+        # A module's bare calls resolve to the importer's functions
+        self.callable: dict[str, AST.FunctionDef] = (
+            {}
+            if module
+            else {
+                fn.name.lower(): fn
+                for fn in self.functions
+                if counts[fn.name.lower()] == 1 and fn.name.lower() not in bound
+            }
+        )
+        self.reasons: dict[int, str] = {}
+        self.calls: dict[int, set[str]] = {}
+
+    def solve(self) -> dict[int, str]:
+        """Reasons keyed by ``id(fn)``; functions without one are pure."""
+        for fn in self.functions:
+            self.calls[id(fn)] = set()
+            try:
+                self._block(fn, fn.body, {p.lower() for p in fn.params})
+            except _Impure as e:
+                self.reasons[id(fn)] = str(e)
+        changed = True
+        while changed:
+            changed = False
+            for fn in self.functions:
+                if id(fn) in self.reasons:
+                    continue
+                for name in sorted(self.calls[id(fn)]):
+                    callee = self.callable.get(name)
+                    if callee is None or id(callee) in self.reasons:
+                        self.reasons[id(fn)] = f"calls '{name}', which is not pure"
+                        changed = True
+                        break
+        return self.reasons
+
+    def _block(self, fn: AST.FunctionDef, body: list[AST.Node] | None, defined: set[str]) -> None:
+        # Names assigned in a nested block are only trusted inside it
+        for st in body or []:
+            self._stmt(fn, st, defined)
+
+    def _stmt(self, fn: AST.FunctionDef, st: AST.Node, defined: set[str]) -> None:
+        if isinstance(st, AST.Assignment):
+            self._expr(fn, st.expr, defined)
+            defined.add(st.name.lower())
+        elif isinstance(st, AST.If):
+            for part in (st.cond, st.left, st.right):
+                if part is not None:
+                    self._expr(fn, part, defined)
+            self._block(fn, st.body, set(defined))
+            self._block(fn, st.else_body, set(defined))
+        elif isinstance(st, AST.Repeat):
+            self._expr(fn, st.count_expr, defined)
+            self._block(fn, st.body, set(defined))
+        elif isinstance(st, AST.While):
+            self._expr(fn, st.cond, defined)
+            self._block(fn, st.body, set(defined))
+        elif isinstance(st, AST.ForEach):
+            if st.parallel:
+                raise _Impure("runs a parallel loop")
+            self._expr(fn, st.iterable, defined)
+            self._block(fn, st.body, defined | {st.var.lower()})
+        elif isinstance(st, AST.TryCatch):
+            self._block(fn, st.body, set(defined))
+            catch = {st.catch_name.lower()} if st.catch_name else set()
+            self._block(fn, st.catch_body, defined | catch)
+            self._block(fn, st.finally_body, set(defined))
+        elif isinstance(st, (AST.Return, AST.ExprStmt, AST.Throw)):
+            value = st.value if isinstance(st, AST.Throw) else st.expr
+            if value is not None:
+                self._expr(fn, value, defined)
+        elif isinstance(st, AST.Print):
+            raise _Impure("prints output")
+        elif isinstance(st, AST.Ask):
+            raise _Impure("reads input")
+        elif isinstance(st, AST.FunctionDef):
+            raise _Impure(f"defines function '{st.name}'")
+        elif isinstance(st, (AST.Import, AST.FromImport)):
+            raise _Impure(f"imports module '{st.module}'")
+        elif isinstance(st, AST.Collect):
+            raise _Impure(f"collects into '{st.target}'")
+        else:
+            self._expr(fn, st, defined)
+
+    def _expr(self, fn: AST.FunctionDef, expr: AST.Node, defined: set[str]) -> None:
+        for node in AST.walk(expr):
+            if not isinstance(node, _PURE_EXPRS):
+                raise _Impure(f"uses {type(node).__name__}")
+            if isinstance(node, AST.Identifier):
+                name = node.name.lower()
+                if "." in name:
+                    raise _Impure(f"reads '{node.name}' from a module")
+                if name not in defined:
+                    raise _Impure(f"reads '{node.name}' from the caller's scope")
+            elif isinstance(node, AST.Call):
+                if "." in node.name:
+                    raise _Impure(f"calls module function '{node.name}'")
+                self.calls[id(fn)].add(node.name.lower())
+            elif isinstance(node, AST.BuiltinCall) and node.name not in _PURE_BUILTINS:
+                raise _Impure(f"calls builtin '{node.name}'")
+        # 'make list' and 'make map' also bind the names list and map
+        for node in AST.walk(expr):
+            if isinstance(node, AST.MakeList):
+                defined.add("list")
+            elif isinstance(node, AST.MakeMap):
+                defined.add("map")
+
+
+def impure_functions(program: AST.Program, *, module: bool = False) -> dict[int, str]:
+    """Why functions in ``program`` are not pure, keyed by ``id(fn)``."""
+    return _Purity(program, module=module).solve()
+
+
+def annotate(program: AST.Program, *, module: bool = False) -> None:
+    """Set ``memo`` on functions whose results may be cached per argument values.
+
+    Pure functions are cached unless defined with ``define uncached function``;
+    ``define cached function`` opts in without a proof. Already annotated
+    programs are left alone.
+    """
+    kind = "module" if module else "main"
+    if getattr(program, "_sup_memo", None) == kind:
+        return
+    reasons = impure_functions(program, module=module)
+    for node in AST.walk(program):
+        if isinstance(node, AST.FunctionDef):
+            node.memo = node.cached if node.cached is not None else id(node) not in reasons
+    program._sup_memo = kind  # type: ignore[attr-defined]
+
+
+def check(program: AST.Program) -> list[TypeIssue]:
+    """Functions defined with ``define cached function`` that are not provably pure."""
+    reasons = impure_functions(program)
+    return [
+        TypeIssue(
+            fn.line,
+            fn.column,
+            "IMPURE",
+            f"Cached function '{fn.name}' {reasons[id(fn)]}.",
+        )
+        for fn in AST.walk(program)
+        if isinstance(fn, AST.FunctionDef) and fn.cached and id(fn) in reasons
+    ]
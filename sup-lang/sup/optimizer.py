@@ -0,0 +1,764 @@
+from __future__ import annotations
+
+import copy
+import time
+from collections.abc import Callable
+from typing import TextIO
+
+from . import ast as AST
+from . import loader, typecheck
+from .typecheck import INT, Type, arith_type, is_numeric
+
+# Integer arithmetic is exact up to this magnitude; beyond it the interpreter
+# rounds every intermediate through float, so loops cannot be reassociated
+_EXACT_INT = 2**53
+# Passes in the order they run
+PASSES = ("const_fold", "licm", "strength_reduce", "closed_form")
+
+
+def optimize_ex(
+    program: AST.Program,
+    *,
+    enabled_passes: list[str] | None = None,
+    collect_timings: bool = False,
+    dump_stream: TextIO | None = None,
+) -> tuple[AST.Program, dict[str, float]]:
+    """Optimize ``program`` in place; returns it with per-pass timings in ms.
+
+    A module parse shared through ``loader.load`` is copied first and the copy
+    is returned.
+
+    ``enabled_passes`` selects passes by name (default: all of ``PASSES``); they
+    always run in ``PASSES`` order. Every pass keeps the program's output and
+    errors unchanged; only the number of evaluation steps goes down. Programs
+    that read the implicit last result (a bare ``print``) are left alone, since
+    every evaluated expression updates it. ``dump_stream`` receives the
+    optimized statements, one per line.
+    """
+    selected = list(PASSES) if enabled_passes is None else list(enabled_passes)
+    for name in selected:
+        if name not in PASSES:
+            raise ValueError(
+                f"Unknown optimizer pass '{name}' (known: {', '.join(PASSES)})."
+            )
+    if loader.owned(program):
+        program = copy.deepcopy(program)
+    timings: dict[str, float] = {}
+    if not _reads_last_result(program):
+        loops: _LoopOptimizer | None = None
+        for name in PASSES:
+            if name not in selected:
+                continue
+            t0 = time.perf_counter()
+            if name == "const_fold":
+                _fold(program)
+            else:
+                if loops is None:
+                    loops = _LoopOptimizer(program)
+                loops.run(name)
+            if collect_timings:
+                timings[name] = (time.perf_counter() - t0) * 1000
+    if dump_stream is not None:
+        for stmt in program.statements:
+            dump_stream.write(f"{stmt!r}\n")
+    return program, timings
+
+
+def optimize(program: AST.Program) -> AST.Program:
+    return optimize_ex(program)[0]
+
+
+def _reads_last_result(program: AST.Program) -> bool:
+    # `list`/`map` fall back to the last result when no such variable exists
+    bound: set[str] = set()
+    read: set[str] = set()
+    for node in AST.walk(program):
+        if isinstance(node, AST.Print) and node.expr is None:
+            return True
+        if isinstance(node, (AST.MakeList, AST.MakeMap)):
+            bound.add("list" if isinstance(node, AST.MakeList) else "map")
+        elif isinstance(node, AST.Assignment):
+            bound.add(node.name.lower())
+        elif isinstance(node, AST.Identifier):
+            read.add(node.name.lower())
+    return bool(({"list", "map"} & read) - bound)
+
+
+def _map_children(node: AST.Node, fn: Callable[[AST.Node], AST.Node]) -> None:
+    for field, value in vars(node).items():
+        if isinstance(value, AST.Node):
+            setattr(node, field, fn(value))
+        elif isinstance(value, list):
+            setattr(
+                node, field, [fn(v) if isinstance(v, AST.Node) else v for v in value]
+            )
+
+
+def _number(value: int | float, like: AST.Node) -> AST.Number:
+    node = AST.Number(value)
+    node.line, node.column = like.line, like.column
+    return node
+
+
+def _arith(op: str, left: int | float, right: int | float) -> int | float | None:
+    """``left op right`` as Interpreter._binary computes it, or None if it raises."""
+    try:
+        if op == "/":
+            return float(left) / float(right)
+        value = {"+": float.__add__, "-": float.__sub__, "*": float.__mul__}[op](
+            float(left), float(right)
+        )
+    except (ZeroDivisionError, OverflowError, KeyError):
+        return None
+    if isinstance(left, int) and isinstance(right, int) and value.is_integer():
+        return int(value)
+    return value
+
+
+# ---- const_fold ----
+def _fold(node: AST.Node) -> AST.Node:
+    """Replace arithmetic on two number literals with its result."""
+    _map_children(node, _fold)
+    if (
+        isinstance(node, AST.Binary)
+        and isinstance(node.left, AST.Number)
+        and isinstance(node.right, AST.Number)
+    ):
+        value = _arith(node.op, node.left.value, node.right.value)
+        if value is not None:
+            return _number(value, node)
+    return node
+
+
+def _assigned(node: AST.Node) -> set[str]:
+    """Names that running ``node`` may bind in the current scope."""
+    names: set[str] = set()
+    for n in AST.walk(node):
+        if isinstance(n, (AST.Assignment, AST.Ask)):
+            names.add(n.name.lower())
+        elif isinstance(n, AST.Collect):
+            names.add(n.target.lower())
+        elif isinstance(n, AST.ForEach):
+            names.add(n.var.lower())
+        elif isinstance(n, AST.TryCatch) and n.catch_name:
+            names.add(n.catch_name.lower())
+        elif isinstance(n, AST.MakeList):
+            names.add("list")
+        elif isinstance(n, AST.MakeMap):
+            names.add("map")
+        elif isinstance(n, AST.Import):
+            names.add((n.alias or n.module).lower())
+        elif isinstance(n, AST.FromImport):
+            names.update((a or m).lower() for m, a in n.names)
+    return names
+
+
+def _trip_count(loop: AST.Node) -> int | None:
+    """How many times ``loop`` runs its body, when that is known statically."""
+    if isinstance(loop, AST.Repeat) and isinstance(loop.count_expr, AST.Number):
+        return max(0, int(loop.count_expr.value))
+    if (
+        isinstance(loop, AST.ForEach)
+        and not loop.parallel
+        and isinstance(loop.iterable, AST.MakeList)
+    ):
+        return len(loop.iterable.items)
+    return None
+
+
+def _magnitude(node: AST.Node, bounds: dict[str, int]) -> int | None:
+    """Largest absolute value integer arithmetic ``node`` can have, if known."""
+    if isinstance(node, AST.Number):
+        return abs(node.value) if isinstance(node.value, int) else None
+    if isinstance(node, AST.Identifier):
+        return bounds.get(node.name.lower())
+    if isinstance(node, AST.Binary) and node.op in {"+", "-", "*"}:
+        left = _magnitude(node.left, bounds)
+        right = _magnitude(node.right, bounds)
+        if left is None or right is None:
+            return None
+        return left * right if node.op == "*" else left + right
+    return None
+
+
+def _forget(bounds: dict[str, int], stmts: list[AST.Node]) -> dict[str, int]:
+    assigned = set().union(*(_assigned(st) for st in stmts))
+    return {k: v for k, v in bounds.items() if k not in assigned}
+
+
+class _LoopOptimizer:
+    """Rewrites ``Repeat``/``While``/``ForEach`` loops using inferred types.
+
+    An expression is *quiet* when evaluating it cannot fail or have effects: it
+    only reads variables that are certainly bound when the loop starts, and its
+    arithmetic only ever sees numbers (and never divides by zero). Quiet
+    expressions can be evaluated earlier, later or fewer times than written.
+    """
+
+    def __init__(self, program: AST.Program) -> None:
+        self.program = program
+        self.types = typecheck.infer(program, imports="none")
+        self.scope_of = {id(fn): key for key, fn in self.types.functions.items()}
+        self.temp_types: dict[str, Type] = {}
+        self.names = {n.lower() for n in _assigned(program)}
+        self.function_reads: set[str] = set()
+        self.has_imports = False
+        for node in AST.walk(program):
+            if isinstance(node, AST.Identifier):
+                self.names.add(node.name.lower())
+            elif isinstance(node, AST.FunctionDef):
+                self.names.update(p.lower() for p in node.params)
+                self.function_reads.update(
+                    n.name.lower()
+                    for n in AST.walk(node)
+                    if isinstance(n, AST.Identifier)
+                )
+            elif isinstance(node, (AST.Import, AST.FromImport)):
+                self.has_imports = True
+        self._temps = 0
+        # Largest absolute value of integer variables where the current loop starts
+        self.bounds: dict[str, int] = {}
+
+    def run(self, name: str) -> None:
+        rewrite = getattr(self, "_" + name)
+        self.program.statements = self._block(
+            self.program.statements, None, set(), False, rewrite, {}
+        )
+
+    def _block(
+        self,
+        stmts: list[AST.Node],
+        scope: str | None,
+        defined: set[str],
+        in_try: bool,
+        rewrite: Callable[..., list[AST.Node]],
+        bounds: dict[str, int],
+    ) -> list[AST.Node]:
+        # Inner loops are rewritten before the loops around them
+        defined = set(defined)
+        bounds = dict(bounds)
+        out: list[AST.Node] = []
+        for st in stmts:
+            if isinstance(st, AST.FunctionDef):
+                params = {p.lower() for p in st.params}
+                st.body = self._block(
+                    st.body, self.scope_of[id(st)], params, False, rewrite, {}
+                )
+            elif isinstance(st, AST.If):
+                st.body = self._block(
+                    st.body or [], scope, defined, in_try, rewrite, bounds
+                )
+                if st.else_body is not None:
+                    st.else_body = self._block(
+                        st.else_body, scope, defined, in_try, rewrite, bounds
+                    )
+            elif isinstance(st, (AST.While, AST.Repeat)):
+                inner = self._loop_bounds(st, bounds)
+                st.body = self._block(st.body, scope, defined, in_try, rewrite, inner)
+            elif isinstance(st, AST.ForEach) and not st.parallel:
+                inner = self._loop_bounds(st, bounds)
+                body_defined = defined | {st.var.lower()}
+                st.body = self._block(
+                    st.body, scope, body_defined, in_try, rewrite, inner
+                )
+            elif isinstance(st, AST.TryCatch):
+                st.body = self._block(st.body, scope, defined, True, rewrite, bounds)
+                # A catch or finally block may start anywhere in the try body
+                unsure = _forget(bounds, st.body)
+                if st.catch_body is not None:
+                    caught = defined | (
+                        {st.catch_name.lower()} if st.catch_name else set()
+                    )
+                    st.catch_body = self._block(
+                        st.catch_body, scope, caught, True, rewrite, unsure
+                    )
+                if st.finally_body is not None:
+                    unsure = _forget(unsure, st.catch_body or [])
+                    st.finally_body = self._block(
+                        st.finally_body, scope, defined, True, rewrite, unsure
+                    )
+            if self._is_loop(st):
+                self.bounds = bounds
+                new = rewrite(st, scope, defined, in_try)
+            else:
+                new = [st]
+            for n in new:
+                if isinstance(n, (AST.Assignment, AST.Ask)):
+                    defined.add(n.name.lower())
+                bounds = self._bounds_after(n, bounds)
+            out.extend(new)
+        return out
+
+    def _bounds_after(self, st: AST.Node, bounds: dict[str, int]) -> dict[str, int]:
+        if isinstance(st, AST.Assignment):
+            out = dict(bounds)
+            m = _magnitude(st.expr, bounds)
+            if m is None:
+                out.pop(st.name.lower(), None)
+            else:
+                out[st.name.lower()] = m
+            return out
+        if isinstance(st, (AST.Repeat, AST.ForEach, AST.While)):
+            return self._loop_bounds(st, bounds)
+        return _forget(bounds, [st])
+
+    def _loop_bounds(self, loop: AST.Node, bounds: dict[str, int]) -> dict[str, int]:
+        """Bounds that hold anywhere in ``loop`` and after it.
+
+        A variable the loop only ever changes by ``add``/``subtract`` of bounded
+        steps moves at most the sum of those steps per iteration.
+        """
+        out = _forget(bounds, [loop])
+        trips = _trip_count(loop)
+        if trips is None:
+            return out
+        candidates = _assigned(loop) & bounds.keys()
+        if isinstance(loop, AST.ForEach):
+            candidates.discard(loop.var.lower())
+        changed = True
+        while changed:
+            changed = False
+            for name in sorted(candidates - out.keys()):
+                drift = self._drift(loop.body, name, out)  # type: ignore[attr-defined]
+                if drift is not None:
+                    out[name] = bounds[name] + trips * drift
+                    changed = True
+        return out
+
+    def _drift(
+        self, stmts: list[AST.Node], name: str, bounds: dict[str, int]
+    ) -> int | None:
+        """Most one run of ``stmts`` can change ``name`` by, or None if unknown."""
+        total = 0
+        for st in stmts:
+            if name not in _assigned(st):
+                continue
+            acc = self._accumulator(st)
+            step: int | None = None
+            if acc is not None and acc[0] == name and name not in self._reads(acc[1]):
+                step = _magnitude(acc[1], bounds)
+            elif isinstance(st, AST.Repeat) and _trip_count(st) is not None:
+                inner = self._drift(st.body, name, bounds)
+                if inner is not None:
+                    step = inner * (_trip_count(st) or 0)
+            if step is None:
+                return None
+            total += step
+        return total
+
+    def _fits(self, name: str, *terms: AST.Node | int | None) -> bool:
+        """True if ``name`` plus the magnitudes of ``terms`` stays within ±2**53."""
+        total = self.bounds.get(name)
+        for term in terms:
+            if total is None or term is None:
+                return False
+            m = term if isinstance(term, int) else _magnitude(term, self.bounds)
+            if m is None:
+                return False
+            total += m
+        return total is not None and total <= _EXACT_INT
+
+    @staticmethod
+    def _is_loop(st: AST.Node) -> bool:
+        if isinstance(st, AST.ForEach):
+            return not st.parallel
+        if not isinstance(st, (AST.While, AST.Repeat)):
+            return False
+        # Definitions inside a loop register functions as they run
+        return not any(isinstance(n, AST.FunctionDef) for n in AST.walk(st))
+
+    # ---- types and quiet expressions ----
+    def _type(self, node: AST.Node, scope: str | None) -> Type:
+        if isinstance(node, AST.Number):
+            return typecheck.INT if isinstance(node.value, int) else typecheck.FLOAT
+        if isinstance(node, AST.String):
+            return typecheck.STR
+        if isinstance(node, AST.Identifier):
+            name = node.name.lower()
+            if name in self.temp_types:
+                return self.temp_types[name]
+            return self.types.lookup(scope, name)
+        if isinstance(node, AST.Binary):
+            return arith_type(
+                node.op, self._type(node.left, scope), self._type(node.right, scope)
+            )
+        return typecheck.ANY
+
+    def _quiet(self, node: AST.Node, scope: str | None, defined: set[str]) -> bool:
+        if isinstance(node, (AST.Number, AST.String)):
+            return True
+        if isinstance(node, AST.Identifier):
+            return node.name.lower() in defined
+        if isinstance(node, AST.Binary):
+            if not (
+                self._quiet(node.left, scope, defined)
+                and self._quiet(node.right, scope, defined)
+            ):
+                return False
+            if node.op == "/":
+                return (
+                    is_numeric(self._type(node.left, scope))
+                    and isinstance(node.right, AST.Number)
+                    and node.right.value != 0
+                )
+            return is_numeric(self._type(node.left, scope)) and is_numeric(
+                self._type(node.right, scope)
+            )
+        return False
+
+    def _is_int(self, node: AST.Node, scope: str | None) -> bool:
+        return self._type(node, scope) == INT
+
+    @staticmethod
+    def _reads(node: AST.Node) -> set[str]:
+        return {n.name.lower() for n in AST.walk(node) if isinstance(n, AST.Identifier)}
+
+    def _temp(self) -> str:
+        while True:
+            name = f"_loop_inv{self._temps}"
+            self._temps += 1
+            if name not in self.names:
+                self.names.add(name)
+                return name
+
+    # ---- licm ----
+    def _licm(
+        self, loop: AST.Node, scope: str | None, defined: set[str], in_try: bool
+    ) -> list[AST.Node]:
+        """Hoist quiet arithmetic that reads nothing the loop assigns."""
+        assigned = _assigned(loop)
+        hoisted: list[AST.Node] = []
+
+        def hoist(node: AST.Node) -> AST.Node:
+            if (
+                isinstance(node, AST.Binary)
+                and not (self._reads(node) & assigned)
+                and self._quiet(node, scope, defined)
+            ):
+                name = self._temp()
+                self.temp_types[name] = self._type(node, scope)
+                assign = AST.Assignment(name=name, expr=node)
+                assign.line, assign.column = loop.line, loop.column
+                hoisted.append(assign)
+                ref = AST.Identifier(name)
+                ref.line, ref.column = node.line, node.column
+                return ref
+            _map_children(node, hoist)
+            return node
+
+        body: list[AST.Node] = []
+        for st in loop.body:  # type: ignore[attr-defined]
+            # Temporaries hoisted out of inner loops move out of this one whole
+            if (
+                isinstance(st, AST.Assignment)
+                and st.name in self.temp_types
+                and not (self._reads(st.expr) & assigned)
+                and self._quiet(st.expr, scope, defined)
+            ):
+                hoisted.append(st)
+            else:
+                body.append(st)
+        # Repeat counts and for-each targets are evaluated once already
+        if isinstance(loop, AST.While):
+            loop.cond = hoist(loop.cond)
+        loop.body = [hoist(st) for st in body]  # type: ignore[attr-defined]
+        return [*hoisted, loop]
+
+    def _int_var(self, name: str, scope: str | None) -> bool:
+        return self._is_int(AST.Identifier(name), scope)
+
+    # ---- strength_reduce ----
+    @staticmethod
+    def _accumulator(st: AST.Node) -> tuple[str, AST.Node, int] | None:
+        """(v, E, sign) for ``set v to add v and E`` (either order) or
+        ``subtract E from v``."""
+        if not isinstance(st, AST.Assignment) or not isinstance(st.expr, AST.Binary):
+            return None
+        name, expr = st.name.lower(), st.expr
+
+        def is_v(n: AST.Node) -> bool:
+            return isinstance(n, AST.Identifier) and n.name.lower() == name
+
+        if expr.op == "+" and is_v(expr.left):
+            return name, expr.right, 1
+        if expr.op == "+" and is_v(expr.right):
+            return name, expr.left, 1
+        if expr.op == "-" and is_v(expr.left):
+            return name, expr.right, -1
+        return None
+
+    def _unobservable(self, loop: AST.Node, name: str, in_try: bool) -> bool:
+        """True if nothing can see ``name`` while ``loop`` runs, or after it fails.
+
+        An error inside a function discards that call's variables, and one at the
+        top level ends the program, unless a try block in the same scope catches
+        it. Functions run with their caller's variables, so no function that a
+        loop calls may read ``name``.
+        """
+        if in_try:
+            return False
+        if any(isinstance(n, AST.Call) for n in AST.walk(loop)):
+            if self.has_imports or name in self.function_reads:
+                return False
+        return True
+
+    def _strength_reduce(
+        self, loop: AST.Node, scope: str | None, defined: set[str], in_try: bool
+    ) -> list[AST.Node]:
+        """Turn N additions of a loop-invariant integer into one multiplication."""
+        trips = _trip_count(loop)
+        if trips is None:
+            return [loop]
+        assigned = _assigned(loop)
+        body: list[AST.Node] = []
+        sunk: list[AST.Node] = []
+        for st in loop.body:  # type: ignore[attr-defined]
+            acc = self._accumulator(st)
+            if acc is not None and self._sinkable(
+                loop, st, acc, scope, defined, assigned, in_try
+            ):
+                name, step, sign = acc
+                if trips:
+                    total = (
+                        _number(step.value * trips, step)
+                        if isinstance(step, AST.Number)
+                        else self._scaled(step, trips)
+                    )
+                    sunk.append(self._add_to(st, name, total, "+" if sign > 0 else "-"))
+                continue
+            body.append(st)
+        loop.body = body  # type: ignore[attr-defined]
+        return [loop, *sunk]
+
+    def _sinkable(
+        self,
+        loop: AST.Node,
+        st: AST.Node,
+        acc: tuple[str, AST.Node, int],
+        scope: str | None,
+        defined: set[str],
+        assigned: set[str],
+        in_try: bool,
+    ) -> bool:
+        name, step, _sign = acc
+        if isinstance(loop, AST.ForEach) and loop.var.lower() == name:
+            return False
+        if name not in defined or not self._int_var(name, scope):
+            return False
+        if self._reads(step) & assigned or not self._quiet(step, scope, defined):
+            return False
+        if not self._is_int(step, scope):
+            return False
+        # Every partial sum, the loop's and the reduced one, must stay exact
+        trips = _trip_count(loop) or 0
+        step_bound = _magnitude(step, self.bounds)
+        if trips and (step_bound is None or not self._fits(name, step_bound * trips)):
+            return False
+        # The update must be the loop's only use of the variable
+        others = [s for s in loop.body if s is not st]  # type: ignore[attr-defined]
+        head = [loop.cond] if isinstance(loop, AST.While) else []
+        if any(name in self._reads(s) or name in _assigned(s) for s in head + others):
+            return False
+        return self._unobservable(loop, name, in_try)
+
+    @staticmethod
+    def _scaled(expr: AST.Node, factor: int) -> AST.Node:
+        node = AST.Binary(op="*", left=expr, right=_number(factor, expr))
+        node.line, node.column = expr.line, expr.column
+        return node
+
+    @staticmethod
+    def _add_to(
+        like: AST.Node, name: str, amount: AST.Node, op: str = "+"
+    ) -> AST.Assignment:
+        ref = AST.Identifier(name)
+        ref.line, ref.column = like.line, like.column
+        expr = AST.Binary(op=op, left=ref, right=amount)
+        expr.line, expr.column = like.line, like.column
+        assign = AST.Assignment(name=name, expr=expr)
+        assign.line, assign.column = like.line, like.column
+        return assign
+
+    # ---- closed_form ----
+    def _closed_form(
+        self, loop: AST.Node, scope: str | None, defined: set[str], in_try: bool
+    ) -> list[AST.Node]:
+        """Replace a side-effect-free counting loop with the values it computes.
+
+        Handles ``repeat N times`` bodies made of integer induction variables
+        (``set i to add i and C``), accumulators of affine functions of them
+        (``set total to add total and i``) and loop-invariant assignments.
+        """
+        trips = _trip_count(loop)
+        if not isinstance(loop, AST.Repeat) or trips is None:
+            return [loop]
+        body = loop.body
+        if not all(isinstance(st, AST.Assignment) for st in body):
+            return [loop]
+        names = [st.name.lower() for st in body]  # type: ignore[attr-defined]
+        if len(set(names)) != len(names):
+            return [loop]
+        assigned = set(names)
+        # Induction variables: i = i + C, with C an integer literal
+        steps: dict[str, tuple[int, int]] = {}  # name -> (step, position)
+        for pos, st in enumerate(body):
+            acc = self._accumulator(st)
+            if acc is None:
+                continue
+            name, step, sign = acc
+            if (
+                isinstance(step, AST.Number)
+                and isinstance(step.value, int)
+                and name in defined
+                and self._int_var(name, scope)
+            ):
+                steps[name] = (sign * step.value, pos)
+        accumulators: list[AST.Node] = []
+        constants: list[AST.Node] = []
+        inductions: list[AST.Node] = []
+        readers: dict[str, set[str]] = {}
+        # Values every variable the loop adds to can reach while it runs
+        reach = self._loop_bounds(loop, self.bounds)
+
+        def exact(name: str) -> bool:
+            return reach.get(name, _EXACT_INT + 1) <= _EXACT_INT
+
+        for pos, st in enumerate(body):
+            name = names[pos]
+            others = self._reads(st.expr) - {name}  # type: ignore[attr-defined]
+            for other in others & assigned:
+                readers.setdefault(other, set()).add(name)
+            if name in steps and not others & assigned:
+                step, _ = steps[name]
+                if trips and not exact(name):
+                    return [loop]
+                if trips:
+                    inductions.append(self._add_to(st, name, _number(step * trips, st)))
+                continue
+            acc = self._accumulator(st)
+            if acc is not None:
+                _name, step, sign = acc
+                total = self._series(
+                    step, sign, pos, trips, steps, scope, defined, assigned
+                )
+                if (
+                    total is None
+                    or name not in defined
+                    or not self._int_var(name, scope)
+                ):
+                    return [loop]
+                # The loop's partial sums and the closed form must both stay exact
+                if trips and not (exact(name) and self._fits(name, total or 0)):
+                    return [loop]
+                if trips and total is not False:
+                    accumulators.append(self._add_to(st, name, total))
+                continue
+            expr = st.expr  # type: ignore[attr-defined]
+            if self._reads(expr) & assigned or not self._quiet(expr, scope, defined):
+                return [loop]
+            if trips:
+                constants.append(st)
+        # Only accumulators may read induction variables; nothing else is read
+        for name, by in readers.items():
+            if name not in steps or any(r in steps for r in by):
+                return [loop]
+        return [*accumulators, *inductions, *constants]
+
+    def _series(
+        self,
+        expr: AST.Node,
+        sign: int,
+        pos: int,
+        trips: int,
+        steps: dict[str, tuple[int, int]],
+        scope: str | None,
+        defined: set[str],
+        assigned: set[str],
+    ) -> AST.Node | None | bool:
+        """Sum of ``expr`` over every iteration, as an expression evaluated after
+        the loop (induction variables still hold their values from before it).
+
+        Returns None when ``expr`` is not affine in the induction variables, and
+        False when the sum is zero.
+        """
+        linear = self._linear(expr, scope, defined, assigned, steps)
+        if linear is None:
+            return None
+        coefs, invariants, const = linear
+        coefs = {k: sign * c for k, c in coefs.items()}
+        invariants = [(sign * f, n) for f, n in invariants]
+        const *= sign
+        # sum over k < N of (i0 + step*k + [step if i is updated before pos])
+        terms: list[tuple[int, AST.Node]] = []
+        total_const = const * trips
+        for name, coef in coefs.items():
+            step, at = steps[name]
+            offset = step if at < pos else 0
+            total_const += coef * (step * trips * (trips - 1) // 2 + offset * trips)
+            ref = AST.Identifier(name)
+            ref.line, ref.column = expr.line, expr.column
+            terms.append((coef * trips, ref))
+        for factor, node in invariants:
+            terms.append((factor * trips, node))
+        out: AST.Node | None = None
+        for factor, node in terms:
+            if factor == 0:
+                continue
+            term = node if abs(factor) == 1 else self._scaled(node, abs(factor))
+            if out is None:
+                if factor < 0:
+                    term = self._scaled(node, factor)
+                out = term
+                continue
+            out = AST.Binary(op="+" if factor > 0 else "-", left=out, right=term)
+            out.line, out.column = expr.line, expr.column
+        if total_const:
+            if out is None:
+                return _number(total_const, expr)
+            out = AST.Binary(op="+", left=out, right=_number(total_const, expr))
+            out.line, out.column = expr.line, expr.column
+        return False if out is None else out
+
+    def _linear(
+        self,
+        expr: AST.Node,
+        scope: str | None,
+        defined: set[str],
+        assigned: set[str],
+        steps: dict[str, tuple[int, int]],
+    ) -> tuple[dict[str, int], list[tuple[int, AST.Node]], int] | None:
+        """``expr`` as (induction coefficients, invariant terms, constant)."""
+        if isinstance(expr, AST.Number):
+            return ({}, [], expr.value) if isinstance(expr.value, int) else None
+        if isinstance(expr, AST.Identifier) and expr.name.lower() in steps:
+            return {expr.name.lower(): 1}, [], 0
+        if isinstance(expr, AST.Binary) and expr.op in {"+", "-"}:
+            left = self._linear(expr.left, scope, defined, assigned, steps)
+            right = self._linear(expr.right, scope, defined, assigned, steps)
+            if left is None or right is None:
+                return None
+            sign = 1 if expr.op == "+" else -1
+            coefs = dict(left[0])
+            for name, c in right[0].items():
+                coefs[name] = coefs.get(name, 0) + sign * c
+            invariants = left[1] + [(sign * f, n) for f, n in right[1]]
+            return coefs, invariants, left[2] + sign * right[2]
+        if isinstance(expr, AST.Binary) and expr.op == "*":
+            for factor, other in ((expr.left, expr.right), (expr.right, expr.left)):
+                if isinstance(factor, AST.Number) and isinstance(factor.value, int):
+                    inner = self._linear(other, scope, defined, assigned, steps)
+                    if inner is None:
+                        return None
+                    n = factor.value
+                    return (
+                        {k: c * n for k, c in inner[0].items()},
+                        [(f * n, node) for f, node in inner[1]],
+                        inner[2] * n,
+                    )
+        if (
+            not self._reads(expr) & assigned
+            and self._quiet(expr, scope, defined)
+            and self._is_int(expr, scope)
+        ):
+            return {}, [(1, expr)], 0
+        return None
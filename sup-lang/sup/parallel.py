@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import os
+import pickle
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from . import ast as AST
+from .errors import SupRuntimeError
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .interpreter import Interpreter
+
+# Per-worker state installed once by the pool initializer
+_WORKER: dict[str, Any] = {}
+
+
+def free_names(
+    body: list[AST.Node],
+    resolve: Callable[[str], AST.FunctionDef | None] | None = None,
+) -> set[str]:
+    """Lower-cased variable and module names a loop body may read.
+
+    Functions run with their caller's variables, so the names read by every
+    function ``resolve`` finds for a call, transitively, are included too.
+    """
+    names: set[str] = set()
+    seen: set[int] = set()
+    todo: list[AST.Node] = list(body)
+    while todo:
+        for node in AST.walk(todo.pop()):
+            if isinstance(node, (AST.Identifier, AST.Call)):
+                names.add(node.name.lower().split(".", 1)[0])
+            if isinstance(node, AST.Call) and resolve is not None:
+                fn = resolve(node.name.lower())
+                if fn is not None and id(fn) not in seen:
+                    seen.add(id(fn))
+                    todo.extend(fn.body)
+    names.update({"list", "map", "result"})
+    return names
+
+
+def _init_worker(shared: bytes) -> None:
+    _WORKER.update(pickle.loads(shared))
+    # Every iteration unpickles its own environment, so lists and maps it
+    # mutates never reach the next iteration run by this worker
+    _WORKER["fresh"] = pickle.dumps((_WORKER.pop("env"), _WORKER.pop("last_result")))
+
+
+def _new_interpreter(state: dict[str, Any]) -> Interpreter:
+    from .interpreter import Interpreter
+
+    interp = Interpreter()
+    interp.functions = dict(state["functions"])
+    interp.capabilities = set(state["capabilities"])
+    interp._unsafe_all = state["unsafe"]
+    interp._in_parallel_worker = True
+    return interp
+
+
+def _run_iteration(item: object) -> tuple[list[str], list[tuple[str, object]], Any]:
+    """Execute one loop iteration; returns (outputs, collected values, error)."""
+    from .interpreter import _SupThrown
+
+    state = _WORKER
+    interp = state.get("interp")
+    if interp is None:
+        interp = state["interp"] = _new_interpreter(state)
+    interp.env, interp.last_result = pickle.loads(state["fresh"])
+    interp.env[state["var"]] = item
+    interp.io.outputs = []
+    interp._collected = []
+    error: Any = None
+    try:
+        for stmt in state["body"]:
+            interp.eval(stmt)
+    except _SupThrown as e:
+        error = ("thrown", e.value)
+    except SupRuntimeError as e:
+        error = ("runtime", e.message, e.line)
+    except Exception as e:
+        error = ("runtime", str(e) or type(e).__name__, None)
+    return interp.io.outputs, interp._collected, error
+
+
+def run_foreach(
+    interp: Interpreter, node: AST.ForEach, items: list[object], workers: int
+) -> None:
+    """Run ``node.body`` for each item across a process pool.
+
+    Only the names the body and the functions it calls read are shipped to
+    workers, together with all function definitions. Iterations run with copies of that environment, so
+    assignments inside the body do not leak out; values reach the caller through
+    ``collect ... into``. Outputs, collected values and the first error are
+    replayed in item order, which keeps results deterministic.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .interpreter import _SupThrown
+
+    wanted = free_names(node.body, interp._callee)
+    env: dict[str, object] = {}
+    for k in [k for k in interp.env if k in wanted]:
+        # Lazy imports cannot cross process boundaries; load them here
+        v = interp._resolve_lazy(k)
+        ns = interp._namespace(v)
+        env[k] = ns if ns is not None else v
+    state = {
+        "env": env,
+        "functions": interp.functions,
+        "body": node.body,
+        "var": node.var.lower(),
+        "last_result": interp.last_result,
+        "capabilities": sorted(interp.capabilities),
+        "unsafe": interp._unsafe_all,
+    }
+    try:
+        shared = pickle.dumps(state)
+        pickle.dumps(items)
+    except Exception as e:
+        raise SupRuntimeError(
+            message=f"Values used in a parallel loop must be plain data: {e}",
+            line=getattr(node, "line", None),
+        )
+
+    workers = max(1, min(workers, len(items)))
+    if workers == 1:
+        _WORKER.clear()
+        _init_worker(shared)
+        try:
+            results = [_run_iteration(item) for item in items]
+        finally:
+            _WORKER.clear()
+    else:
+        chunk = max(1, len(items) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(shared,)
+        ) as pool:
+            results = list(pool.map(_run_iteration, items, chunksize=chunk))
+
+    for outputs, collected, error in results:
+        interp.io.outputs.extend(outputs)
+        if error is not None:
+            if error[0] == "thrown":
+                raise _SupThrown(error[1])
+            raise SupRuntimeError(message=error[1], line=error[2])
+        for target, value in collected:
+            interp._collect(target, value)
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+_POSIX = os.name == "posix"
+# Seconds to collect output after a kill; a grandchild that left the process
+# group can keep the pipes open for as long as it runs
+_DRAIN_SECONDS = 1.0
+
+
+def run_command(cmd: str, *, timeout: float | None = None) -> dict[str, object]:
+    """Run one shell command, capturing its output.
+
+    On timeout the whole process group is killed (so children of the shell do not
+    outlive it) and whatever output was produced so far is kept. Pipes still held
+    open by a process outside the group are closed after ``_DRAIN_SECONDS``.
+    """
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        cmd,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+        start_new_session=_POSIX,
+    )
+    timed_out = False
+    try:
+        out, err = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        _kill(proc)
+        try:
+            out, err = proc.communicate(timeout=_DRAIN_SECONDS)
+        except subprocess.TimeoutExpired as e:
+            # Output read so far, undecoded; the pipes are abandoned
+            out, err = _decode(e.output), _decode(e.stderr)
+            for pipe in (proc.stdout, proc.stderr):
+                if pipe is not None:
+                    pipe.close()
+            proc.wait()
+    return {
+        "command": cmd,
+        "code": int(proc.returncode if proc.returncode is not None else -1),
+        "out": out or "",
+        "err": err or "",
+        "timed_out": timed_out,
+        "ms": int((time.perf_counter() - t0) * 1000),
+    }
+
+
+def _decode(data: bytes | str | None) -> str:
+    if isinstance(data, bytes):
+        return data.decode("utf-8", "replace")
+    return data or ""
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    try:
+        if _POSIX:
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:  # pragma: no cover - windows
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_many(
+    commands: list[str],
+    *,
+    parallel: int,
+    timeout: float | None = None,
+    on_result: Callable[[dict[str, object]], None] | None = None,
+) -> list[dict[str, object]]:
+    """Run ``commands`` with at most ``parallel`` at a time; results keep list order.
+
+    ``on_result`` is called from the caller's thread as soon as a result and every
+    result before it are available, so streamed output stays in command order.
+    """
+    if not commands:
+        return []
+    workers = max(1, min(int(parallel), len(commands)))
+    results: list[dict[str, object]] = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sup-proc") as pool:
+        futures = [pool.submit(run_command, c, timeout=timeout) for c in commands]
+        try:
+            for f in futures:
+                res = f.result()
+                results.append(res)
+                if on_result is not None:
+                    on_result(res)
+        except BaseException:
+            for f in futures:
+                f.cancel()
+            raise
+    return results
@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+import json
+import linecache
+import marshal
+import os
+import signal
+import sys
+import threading
+import time
+from types import FrameType
+from typing import Any
+
+from . import ast as AST
+from . import loader
+from .interpreter import Interpreter
+
+# (filename, line, name), the key pstats uses for functions
+FuncKey = tuple[str, int, str]
+LineKey = tuple[str, int]
+
+# (name, file, line) of one sup-level frame in a sampled stack
+SampleFrame = tuple[str, str, int]
+
+_PROGRAM = "<program>"
+_BUILTIN_FILE = "~"
+# Python frames of these methods mark positions and calls in the sup program
+_EVAL_CODE = Interpreter.eval.__code__
+_FUNCTION_CODE = Interpreter._run_function.__code__
+_IMPORT_CODE = Interpreter._import_module.__code__
+_RUN_CODE = Interpreter.run.__code__
+
+
+class Profiler:
+    """Hit counts and inclusive/exclusive times per line, function and builtin.
+
+    Times are only counted once per recursive activation for the inclusive
+    total, as ``cProfile`` does. Builtins are recorded as functions in file ``~``.
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.thread = threading.get_ident()
+        self.total = 0.0
+        # line -> [hits, inclusive, exclusive]
+        self.lines: dict[LineKey, list[Any]] = {}
+        # function -> [primitive calls, calls, exclusive, inclusive] (pstats order)
+        self.functions: dict[FuncKey, list[Any]] = {}
+        self.callers: dict[tuple[FuncKey, FuncKey], list[Any]] = {}
+        # File each function was defined in; the main file when not listed
+        self.files: dict[int, str] = {}
+        self.file = filename
+        self.current: LineKey | None = None
+        self._line_stack: list[list[Any]] = []
+        self._fn_stack: list[list[Any]] = []
+        self._active_lines: dict[LineKey, int] = {}
+        self._active_fns: dict[FuncKey, int] = {}
+        self._start = 0.0
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        self.enter_function((self.filename, 0, _PROGRAM))
+
+    def stop(self) -> None:
+        while self._line_stack:
+            self.exit_line()
+        while self._fn_stack:
+            self.exit_function()
+        self.total += time.perf_counter() - self._start
+
+    def enter_line(self, key: LineKey) -> None:
+        active = self._active_lines.get(key, 0)
+        self._active_lines[key] = active + 1
+        self._line_stack.append([key, time.perf_counter(), 0.0, active == 0])
+
+    def exit_line(self) -> None:
+        key, start, child, outermost = self._line_stack.pop()
+        elapsed = time.perf_counter() - start
+        row = self.lines.get(key)
+        if row is None:
+            row = self.lines[key] = [0, 0.0, 0.0]
+        row[0] += 1
+        row[2] += elapsed - child
+        if outermost:
+            row[1] += elapsed
+        self._active_lines[key] -= 1
+        if self._line_stack:
+            self._line_stack[-1][2] += elapsed
+
+    def enter_function(self, key: FuncKey) -> None:
+        caller = self._fn_stack[-1][0] if self._fn_stack else None
+        active = self._active_fns.get(key, 0)
+        self._active_fns[key] = active + 1
+        self._fn_stack.append([key, time.perf_counter(), 0.0, active == 0, caller])
+
+    def exit_function(self) -> None:
+        key, start, child, outermost, caller = self._fn_stack.pop()
+        elapsed = time.perf_counter() - start
+        rows = [self.functions.setdefault(key, [0, 0, 0.0, 0.0])]
+        if caller is not None:
+            rows.append(self.callers.setdefault((caller, key), [0, 0, 0.0, 0.0]))
+        for row in rows:
+            row[1] += 1
+            row[2] += elapsed - child
+            if outermost:
+                row[0] += 1
+                row[3] += elapsed
+        self._active_fns[key] -= 1
+        if self._fn_stack:
+            self._fn_stack[-1][2] += elapsed
+
+    # ---- output ----
+    def pstats_dict(self) -> dict[FuncKey, tuple[Any, ...]]:
+        """Stats in the layout ``pstats.Stats`` loads from a marshalled file."""
+        stats: dict[FuncKey, tuple[Any, ...]] = {}
+        for key, (cc, nc, tt, ct) in self.functions.items():
+            callers = {
+                caller: tuple(row)
+                for (caller, callee), row in self.callers.items()
+                if callee == key
+            }
+            stats[key] = (cc, nc, tt, ct, callers)
+        return stats
+
+    def dump_pstats(self, path: str) -> None:
+        with open(path, "wb") as f:
+            marshal.dump(self.pstats_dict(), f)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "total_ms": self.total * 1000,
+            "functions": [
+                {
+                    "name": name,
+                    "file": file,
+                    "line": line,
+                    "calls": nc,
+                    "inclusive_ms": ct * 1000,
+                    "exclusive_ms": tt * 1000,
+                }
+                for (file, line, name), (_cc, nc, tt, ct) in self._sorted_functions(builtins=False)
+            ],
+            "builtins": [
+                {"name": name[len("<builtin ") : -1], "calls": nc, "total_ms": ct * 1000}
+                for (_file, _line, name), (_cc, nc, _tt, ct) in self._sorted_functions(
+                    builtins=True
+                )
+            ],
+            "lines": [
+                {
+                    "file": file,
+                    "line": line,
+                    "hits": hits,
+                    "inclusive_ms": incl * 1000,
+                    "exclusive_ms": excl * 1000,
+                }
+                for (file, line), (hits, incl, excl) in self._sorted_lines()
+            ],
+        }
+
+    def dump_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def report(self, limit: int = 20) -> str:
+        """Functions, lines and builtins sorted by exclusive time."""
+        out = [f"Profile: {self.total * 1000:.3f} ms total"]
+        out.append("")
+        out.append(f"{'calls':>8} {'own ms':>10} {'total ms':>10}  function")
+        for (file, line, name), (_cc, nc, tt, ct) in self._sorted_functions(builtins=False)[
+            :limit
+        ]:
+            out.append(f"{nc:>8} {tt * 1000:>10.3f} {ct * 1000:>10.3f}  {name} ({file}:{line})")
+        out.append("")
+        out.append(f"{'hits':>8} {'own ms':>10} {'total ms':>10}  line")
+        for (file, line), (hits, incl, excl) in self._sorted_lines()[:limit]:
+            text = linecache.getline(file, line).strip()
+            if len(text) > 50:
+                text = text[:47] + "..."
+            out.append(f"{hits:>8} {excl * 1000:>10.3f} {incl * 1000:>10.3f}  {file}:{line}  {text}")
+        builtins = self._sorted_functions(builtins=True)[:limit]
+        if builtins:
+            out.append("")
+            out.append(f"{'calls':>8} {'total ms':>10}  builtin")
+            for (_file, _line, name), (_cc, nc, _tt, ct) in builtins:
+                out.append(f"{nc:>8} {ct * 1000:>10.3f}  {name[len('<builtin ') : -1]}")
+        return "\n".join(out) + "\n"
+
+    def _sorted_functions(self, *, builtins: bool) -> list[tuple[FuncKey, list[Any]]]:
+        rows = [
+            (key, row)
+            for key, row in self.functions.items()
+            if (key[0] == _BUILTIN_FILE) == builtins
+        ]
+        return sorted(rows, key=lambda kv: (-kv[1][2], kv[0]))
+
+    def _sorted_lines(self) -> list[tuple[LineKey, list[Any]]]:
+        return sorted(self.lines.items(), key=lambda kv: (-kv[1][2], kv[0]))
+
+
+class ProfilingInterpreter(Interpreter):
+    """An ``Interpreter`` that reports to a ``Profiler``.
+
+    Profiling lives in this subclass so that plain runs pay nothing for it.
+    Only the thread that started the run is measured.
+    """
+
+    def __init__(self, filename: str = "<sup>") -> None:
+        super().__init__()
+        self._profiler = Profiler(filename)
+
+    def run(self, program: AST.Program, *, stdin: str | None = None) -> str:
+        self._profiler.start()
+        try:
+            return super().run(program, stdin=stdin)
+        finally:
+            self._profiler.stop()
+
+    def eval(self, node: AST.Node) -> object | None:
+        prof = self._profiler
+        line = node.line
+        if line is None or threading.get_ident() != prof.thread:
+            return super().eval(node)
+        key = (prof.file, line)
+        if key == prof.current:
+            return super().eval(node)
+        previous = prof.current
+        prof.current = key
+        prof.enter_line(key)
+        try:
+            return super().eval(node)
+        finally:
+            prof.exit_line()
+            prof.current = previous
+
+    def _invoke(self, fn: AST.FunctionDef, arg_vals: list[object]) -> object:
+        prof = self._profiler
+        if threading.get_ident() != prof.thread:
+            return super()._invoke(fn, arg_vals)
+        file = prof.files.get(id(fn), prof.filename)
+        saved = prof.file, prof.current
+        prof.file, prof.current = file, None
+        prof.enter_function((file, fn.line or 0, fn.name))
+        try:
+            return super()._invoke(fn, arg_vals)
+        finally:
+            prof.exit_function()
+            prof.file, prof.current = saved
+
+    def _eval_builtin(self, node: AST.BuiltinCall) -> object:
+        prof = self._profiler
+        if threading.get_ident() != prof.thread:
+            return super()._eval_builtin(node)
+        prof.enter_function((_BUILTIN_FILE, 0, f"<builtin {node.name}>"))
+        try:
+            return super()._eval_builtin(node)
+        finally:
+            prof.exit_function()
+
+    def _import_module(self, module: str) -> dict[str, object]:
+        prof = self._profiler
+        path = loader.resolve(module)
+        if path is None or module.lower() in self.module_cache:
+            return super()._import_module(module)
+        for node in AST.walk(loader.load(path)):
+            if isinstance(node, AST.FunctionDef):
+                prof.files[id(node)] = path
+        saved = prof.file, prof.current
+        prof.file, prof.current = path, None
+        try:
+            return super()._import_module(module)
+        finally:
+            prof.file, prof.current = saved
+
+
+class Sampler:
+    """Counts the sup call stacks seen every ``interval`` seconds during a run.
+
+    Stacks are read from the interpreter's own Python frames (the node being
+    evaluated, the function being run), so the interpreter does no extra work
+    per step. ``mode="wall"`` samples from a timer thread; ``mode="cpu"`` uses
+    ``SIGPROF`` and only counts time spent on the CPU (Unix, main thread only).
+    """
+
+    def __init__(self, filename: str, *, interval: float = 0.01, mode: str = "wall") -> None:
+        if mode not in {"wall", "cpu"}:
+            raise ValueError(f"Unknown sampling mode {mode!r}")
+        self.filename = filename
+        self.interval = interval
+        self.mode = mode
+        self.samples: dict[tuple[SampleFrame, ...], int] = {}
+        self.elapsed = 0.0
+        self._files: dict[int, str] = {}
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._previous_handler: Any = None
+        self._start = 0.0
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        if self.mode == "cpu":
+            self._previous_handler = signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="sup-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self.mode == "cpu":
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        elif self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.elapsed += time.perf_counter() - self._start
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self.record(frame)
+
+    def _on_signal(self, signum: int, frame: FrameType | None) -> None:
+        if frame is not None:
+            self.record(frame)
+
+    def record(self, frame: FrameType) -> None:
+        stack = self.sup_stack(frame)
+        if stack:
+            self.samples[stack] = self.samples.get(stack, 0) + 1
+
+    def sup_stack(self, frame: FrameType | None) -> tuple[SampleFrame, ...]:
+        """The sup frames under ``frame``, outermost first; empty outside a run."""
+        stack: list[SampleFrame] = []
+        line: int | None = None
+        while frame is not None:
+            code = frame.f_code
+            if code is _EVAL_CODE:
+                # The innermost node with a line is where the sup frame stands
+                if line is None:
+                    line = getattr(frame.f_locals.get("node"), "line", None)
+            elif code is _FUNCTION_CODE:
+                fn = frame.f_locals.get("fn")
+                if fn is not None:
+                    stack.append((fn.name, self._file_of(fn), line or fn.line or 0))
+                line = None
+            elif code is _IMPORT_CODE:
+                path = frame.f_locals.get("path")
+                module = frame.f_locals.get("module")
+                if path is not None and line is not None:
+                    stack.append((f"<module {module}>", path, line))
+                line = None
+            elif code is _RUN_CODE:
+                stack.append((_PROGRAM, self.filename, line or 0))
+                return tuple(reversed(stack))
+            frame = frame.f_back
+        return ()
+
+    def _file_of(self, fn: AST.FunctionDef) -> str:
+        file = self._files.get(id(fn))
+        if file is None:
+            file = self.filename
+            for path, program in loader.cached_programs():
+                if any(node is fn for node in AST.walk(program)):
+                    file = path
+                    break
+            self._files[id(fn)] = file
+        return file
+
+    # ---- output ----
+    @property
+    def total(self) -> int:
+        return sum(self.samples.values())
+
+    def collapsed(self) -> str:
+        """One ``frame;frame;frame count`` line per stack, as flamegraph.pl reads."""
+        lines = [
+            ";".join(_frame_label(f) for f in stack) + f" {count}"
+            for stack, count in self.samples.items()
+        ]
+        return "".join(line + "\n" for line in sorted(lines))
+
+    def speedscope(self) -> dict[str, Any]:
+        """The samples as a speedscope ``sampled`` profile."""
+        frames: list[dict[str, Any]] = []
+        index: dict[SampleFrame, int] = {}
+        samples: list[list[int]] = []
+        weights: list[float] = []
+        for stack, count in sorted(self.samples.items()):
+            ids = []
+            for f in stack:
+                if f not in index:
+                    index[f] = len(frames)
+                    frames.append({"name": f"{f[0]}:{f[2]}", "file": f[1], "line": f[2]})
+                ids.append(index[f])
+            samples.append(ids)
+            weights.append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": os.path.basename(self.filename),
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "name": os.path.basename(self.filename),
+            "exporter": "sup",
+        }
+
+    def dump(self, path: str) -> None:
+        """Write speedscope JSON for a ``.json`` path, collapsed stacks otherwise."""
+        with open(path, "w", encoding="utf-8") as f:
+            if path.lower().endswith(".json"):
+                json.dump(self.speedscope(), f)
+            else:
+                f.write(self.collapsed())
+
+    def report(self, limit: int = 20) -> str:
+        """Frames by samples at the top of the stack, with samples anywhere below."""
+        own: dict[SampleFrame, int] = {}
+        total: dict[SampleFrame, int] = {}
+        for stack, count in self.samples.items():
+            own[stack[-1]] = own.get(stack[-1], 0) + count
+            for f in set(stack):
+                total[f] = total.get(f, 0) + count
+        out = [
+            f"Sampled {self.total} stacks every {self.interval * 1000:g} ms "
+            f"({self.mode} time) over {self.elapsed * 1000:.3f} ms",
+            "",
+            f"{'own':>8} {'total':>8}  frame",
+        ]
+        for f, count in sorted(own.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]:
+            out.append(f"{count:>8} {total[f]:>8}  {_frame_label(f)}")
+        return "\n".join(out) + "\n"
+
+
+def _frame_label(frame: SampleFrame) -> str:
+    name, file, line = frame
+    return f"{name} ({os.path.basename(file)}:{line})"
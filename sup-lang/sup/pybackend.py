@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import hashlib
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import io
+import marshal
+import os
+import sys
+import tempfile
+from collections.abc import Callable
+from dataclasses import dataclass
+from types import CodeType
+
+from . import loader, sup_rt, tooling
+from . import ast as AST
+from .errors import SupError, SupRuntimeError
+
+_SUFFIX = ".supc"
+# Compiled programs import sup modules from this package, so a sup ``json`` or
+# ``os`` never resolves to (or hides) the Python module of the same name
+MODULE_PACKAGE = "_sup_mod"
+
+
+@dataclass
+class CodeCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+
+stats = CodeCacheStats()
+
+
+def cache_dir() -> str | None:
+    """Code-object cache directory: ``SUP_PY_CACHE``, or ~/.cache/sup/py; 0 disables."""
+    value = os.environ.get("SUP_PY_CACHE")
+    if value is not None and value.lower() in {"0", "off", "no", "false"}:
+        return None
+    return value or os.path.join(os.path.expanduser("~"), ".cache", "sup", "py")
+
+
+def emitter_tag() -> str:
+    """Identifies the code generator; outputs built by another one are stale."""
+    # Generated code also depends on the type annotations and the runtime helpers
+    return tooling.source_tag(["transpiler.py", "typecheck.py", "sup_rt.py"])
+
+
+def _cache_key(source: str, filename: str, exports: bool, variant: str) -> str:
+    h = hashlib.sha256()
+    # The code object embeds the filename, and generated code changes with the
+    # Python version, the sup version and the emitter itself
+    for part in (
+        importlib.util.MAGIC_NUMBER.hex(),
+        emitter_tag(),
+        filename,
+        "exports" if exports else "main",
+        variant,
+    ):
+        h.update(part.encode("utf-8") + b"\0")
+    h.update(source.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _read_cached(path: str) -> CodeType | None:
+    try:
+        with open(path, "rb") as f:
+            code = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return code if isinstance(code, CodeType) else None
+
+
+def _write_cached(directory: str, path: str, code: CodeType) -> None:
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            marshal.dump(code, f)
+        os.replace(tmp, path)
+    except OSError:
+        # A read-only or full cache directory only costs the next run a compile
+        pass
+
+
+def compile_source(
+    source: str,
+    filename: str,
+    *,
+    exports: bool = False,
+    transform: Callable[[AST.Program], AST.Program] | None = None,
+    variant: str = "",
+) -> CodeType:
+    """Parse, transpile and compile ``source``, reusing the on-disk code cache.
+
+    Entries are keyed by a hash of the source and everything that affects the
+    generated code; ``variant`` must identify ``transform`` (e.g. optimizer passes).
+    """
+    from .parser import Parser
+    from .transpiler import compile_program
+
+    directory = cache_dir()
+    path = None
+    if directory is not None:
+        key = _cache_key(source, filename, exports, variant)
+        path = os.path.join(directory, key + _SUFFIX)
+        code = _read_cached(path)
+        if code is not None:
+            stats.hits += 1
+            return code
+    stats.misses += 1
+    program = Parser().parse(source)
+    if transform is not None:
+        program = transform(program)
+    code = compile_program(program, filename, exports=exports, package=MODULE_PACKAGE)
+    if directory is not None and path is not None:
+        _write_cached(directory, path, code)
+    return code
+
+
+class _SupImporter(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Imports ``<module>.sup`` files on the sup search path as ``_sup_mod.<module>``."""
+
+    def __init__(self) -> None:
+        self.paths = loader.search_paths()
+        self.modules: list[str] = []
+        self.filenames: set[str] = set()
+
+    def find_spec(self, fullname, path=None, target=None):  # type: ignore[override]
+        if fullname == MODULE_PACKAGE:
+            return importlib.machinery.ModuleSpec(fullname, self, is_package=True)
+        package, _, module = fullname.partition(".")
+        if package != MODULE_PACKAGE or "." in module:
+            return None
+        found = loader.resolve(module, self.paths)
+        if found is None:
+            raise SupRuntimeError(message=f"Cannot find module '{module}'.")
+        return importlib.util.spec_from_file_location(
+            fullname, os.path.abspath(found), loader=self
+        )
+
+    def create_module(self, spec):  # type: ignore[override]
+        return None
+
+    def exec_module(self, module) -> None:  # type: ignore[override]
+        if module.__name__ == MODULE_PACKAGE:
+            self.modules.append(MODULE_PACKAGE)
+            return
+        origin = module.__spec__.origin
+        with open(origin, encoding="utf-8") as f:
+            source = f.read()
+        code = compile_source(source, origin, exports=True)
+        self.modules.append(module.__name__)
+        self.filenames.add(origin)
+        exec(code, module.__dict__)
+
+
+def run_code(code: CodeType, *, stdin: str | None = None) -> None:
+    """Execute a compiled sup program, writing its output to ``sys.stdout``.
+
+    Imports of sup modules are served from the search path for the duration of
+    the run. Python exceptions are re-raised as ``SupError`` carrying the line of
+    the innermost sup statement involved.
+    """
+    importer = _SupImporter()
+    importer.filenames.add(code.co_filename)
+    sys.meta_path.insert(0, importer)
+    old_stdin = sys.stdin
+    if stdin is not None:
+        sys.stdin = io.StringIO(stdin)
+    try:
+        exec(code, {"__name__": "__sup_main__"})
+    except SupError as e:
+        if e.line is None:
+            e.line = _sup_line(e, importer.filenames)
+        raise
+    except Exception as e:
+        raise _to_sup_error(e, importer.filenames) from e
+    finally:
+        # Drops the runtime interpreter even if only module functions created it
+        sup_rt.shutdown()
+        sys.stdin = old_stdin
+        sys.meta_path.remove(importer)
+        # Like a fresh interpreter, the next run executes its imports again
+        for name in importer.modules:
+            sys.modules.pop(name, None)
+
+
+def run_source(
+    source: str,
+    filename: str = "<sup>",
+    *,
+    stdin: str | None = None,
+    transform: Callable[[AST.Program], AST.Program] | None = None,
+    variant: str = "",
+) -> None:
+    code = compile_source(source, filename, transform=transform, variant=variant)
+    run_code(code, stdin=stdin)
+
+
+def run_file(
+    path: str,
+    *,
+    stdin: str | None = None,
+    transform: Callable[[AST.Program], AST.Program] | None = None,
+    variant: str = "",
+) -> None:
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    run_source(
+        source, os.path.abspath(path), stdin=stdin, transform=transform, variant=variant
+    )
+
+
+def _sup_line(e: BaseException, filenames: set[str]) -> int | None:
+    line = None
+    tb = e.__traceback__
+    while tb is not None:
+        if tb.tb_frame.f_code.co_filename in filenames:
+            line = tb.tb_lineno
+        tb = tb.tb_next
+    return line
+
+
+def _to_sup_error(e: Exception, filenames: set[str]) -> SupRuntimeError:
+    from .interpreter import _SupThrown
+
+    line = _sup_line(e, filenames)
+    if isinstance(e, _SupThrown):
+        message = str(e.value)
+    elif isinstance(e, ZeroDivisionError):
+        message = "Division by zero."
+    elif isinstance(e, NameError) and e.name:
+        message = f"Undefined name '{e.name}'."
+    elif isinstance(e, RecursionError):
+        message = "Maximum recursion depth exceeded."
+    else:
+        message = str(e) or type(e).__name__
+    return SupRuntimeError(message=message, line=line)
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from .errors import SupRuntimeError
+
+
+class Stream(ABC):
+    """A lazily produced sequence that ``for each`` consumes without materializing.
+
+    ``open()`` returns a generator; the interpreter closes it when the loop ends or
+    throws, so subclasses release their resources in a ``finally`` block.
+    """
+
+    def __init__(
+        self,
+        *,
+        on_open: Callable[[], None] | None = None,
+        on_close: Callable[[], None] | None = None,
+    ) -> None:
+        self._on_open = on_open
+        self._on_close = on_close
+
+    @abstractmethod
+    def open(self) -> Iterator[object]: ...
+
+    def __iter__(self) -> Iterator[object]:
+        return self.open()
+
+    def _acquire(self) -> None:
+        if self._on_open is not None:
+            self._on_open()
+
+    def _release(self) -> None:
+        if self._on_close is not None:
+            self._on_close()
+
+
+class SqliteStream(Stream):
+    batch_size = 500
+
+    def __init__(
+        self,
+        db: str,
+        sql: str,
+        params: tuple[Any, ...] = (),
+        *,
+        batch_size: int | None = None,
+        on_open: Callable[[], None] | None = None,
+        on_close: Callable[[], None] | None = None,
+    ) -> None:
+        super().__init__(on_open=on_open, on_close=on_close)
+        self.db = db
+        self.sql = sql
+        self.params = params
+        if batch_size is not None:
+            self.batch_size = max(1, int(batch_size))
+        self._count: int | None = None
+
+    def open(self) -> Iterator[object]:
+        import sqlite3 as _sql
+
+        self._acquire()
+        con = _sql.connect(self.db)
+        try:
+            cur = con.cursor()
+            try:
+                cur.execute(self.sql, self.params)
+                while True:
+                    batch = cur.fetchmany(self.batch_size)
+                    if not batch:
+                        break
+                    for r in batch:
+                        yield [
+                            c if not isinstance(c, bytes) else c.decode("utf-8", "replace")
+                            for c in r
+                        ]
+            finally:
+                cur.close()
+        finally:
+            con.close()
+            self._release()
+
+    def __len__(self) -> int:
+        # Only computed when a script asks for `length of`; the rows are never fetched.
+        if self._count is None:
+            import sqlite3 as _sql
+
+            inner = self.sql.strip().rstrip(";")
+            con = _sql.connect(self.db)
+            try:
+                row = con.execute(
+                    f"SELECT COUNT(*) FROM ({inner})", self.params
+                ).fetchone()
+            finally:
+                con.close()
+            self._count = int(row[0]) if row else 0
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"<sqlite stream {self.sql!r}>"
+
+
+_INT_RE = re.compile(r"[-+]?\d+")
+_FLOAT_RE = re.compile(r"[-+]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?")
+
+
+def infer_cell(text: str) -> object:
+    """Best-effort numeric typing for CSV cells; anything else stays a string."""
+    s = text.strip()
+    if _INT_RE.fullmatch(s):
+        return int(s)
+    if _FLOAT_RE.fullmatch(s):
+        return float(s)
+    return text
+
+
+class CsvStream(Stream):
+    def __init__(
+        self,
+        path: str,
+        *,
+        header: bool = False,
+        columns: list[object] | None = None,
+        infer_types: bool = False,
+        on_open: Callable[[], None] | None = None,
+        on_close: Callable[[], None] | None = None,
+    ) -> None:
+        super().__init__(on_open=on_open, on_close=on_close)
+        self.path = path
+        self.header = header
+        self.columns = columns
+        self.infer_types = infer_types
+
+    def _projection(self, names: list[str] | None) -> list[int] | None:
+        if not self.columns:
+            return None
+        idx: list[int] = []
+        for col in self.columns:
+            if isinstance(col, str) and names is not None:
+                if col not in names:
+                    raise SupRuntimeError(
+                        message=f"CSV column '{col}' not found in {self.path}."
+                    )
+                idx.append(names.index(col))
+            else:
+                try:
+                    idx.append(int(col))  # type: ignore[call-overload]
+                except Exception:
+                    raise SupRuntimeError(message=f"Invalid CSV column {col!r}.")
+        return idx
+
+    def open(self) -> Iterator[object]:
+        import csv as _csv
+
+        self._acquire()
+        try:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                reader = _csv.reader(f)
+                names: list[str] | None = None
+                if self.header:
+                    names = next(reader, [])
+                proj = self._projection(names)
+                conv = infer_cell if self.infer_types else str
+                if names is not None:
+                    keys = names if proj is None else [names[i] for i in proj]
+                for row in reader:
+                    if proj is not None:
+                        row = [row[i] if i < len(row) else "" for i in proj]
+                    cells = [conv(x) for x in row]
+                    if names is not None:
+                        yield dict(zip(keys, cells))
+                    else:
+                        yield cells
+        finally:
+            self._release()
+
+    def __len__(self) -> int:
+        # Rows are counted without converting cells, once per `length of`
+        import csv as _csv
+
+        self._acquire()
+        try:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                count = sum(1 for _ in _csv.reader(f))
+        finally:
+            self._release()
+        return max(0, count - 1) if self.header else count
+
+    def __repr__(self) -> str:
+        return f"<csv stream {self.path!r}>"
+
+
+class JsonLinesStream(Stream):
+    def __init__(
+        self,
+        path: str,
+        *,
+        on_open: Callable[[], None] | None = None,
+        on_close: Callable[[], None] | None = None,
+    ) -> None:
+        super().__init__(on_open=on_open, on_close=on_close)
+        self.path = path
+
+    def open(self) -> Iterator[object]:
+        import json as _json
+
+        self._acquire()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line_no, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield _json.loads(line)
+                    except ValueError as e:
+                        raise SupRuntimeError(
+                            message=f"Invalid JSON on line {line_no} of {self.path}: {e}"
+                        )
+        finally:
+            self._release()
+
+    def __len__(self) -> int:
+        # Blank lines are skipped when iterating, so they are not counted
+        self._acquire()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return sum(1 for line in f if line.strip())
+        finally:
+            self._release()
+
+    def __repr__(self) -> str:
+        return f"<json lines {self.path!r}>"
+
+
+class Writer(ABC):
+    """An incremental output handle; rows are appended as the script produces them."""
+
+    def __init__(self, path: str, *, on_close: Callable[[], None] | None = None) -> None:
+        self.path = path
+        self.closed = False
+        self._on_close = on_close
+
+    @abstractmethod
+    def write(self, row: object) -> None: ...
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._close()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+
+    @abstractmethod
+    def _close(self) -> None: ...
+
+    def _check_open(self) -> None:
+        if self.closed:
+            raise SupRuntimeError(message=f"Writer for {self.path} is closed.")
+
+
+class CsvWriter(Writer):
+    def __init__(
+        self,
+        path: str,
+        header: list[object] | None = None,
+        *,
+        on_close: Callable[[], None] | None = None,
+    ) -> None:
+        import csv as _csv
+
+        super().__init__(path, on_close=on_close)
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = _csv.writer(self._file)
+        self.header: list[str] | None = None
+        if header:
+            self._write_header([str(h) for h in header])
+
+    def _write_header(self, names: list[str]) -> None:
+        self.header = names
+        self._writer.writerow(names)
+
+    def write(self, row: object) -> None:
+        self._check_open()
+        if isinstance(row, dict):
+            if self.header is None:
+                self._write_header([str(k) for k in row.keys()])
+            self._writer.writerow(
+                ["" if row.get(h) is None else str(row.get(h)) for h in self.header]  # type: ignore[union-attr]
+            )
+        elif isinstance(row, list):
+            self._writer.writerow([str(x) for x in row])
+        else:
+            self._writer.writerow([str(row)])
+
+    def _close(self) -> None:
+        self._file.close()
+
+    def __repr__(self) -> str:
+        return f"<csv writer {self.path!r}>"
+
+
+class JsonLinesWriter(Writer):
+    buffer_size = 1 << 16
+
+    def __init__(self, path: str, *, on_close: Callable[[], None] | None = None) -> None:
+        super().__init__(path, on_close=on_close)
+        self._file = open(path, "w", encoding="utf-8", buffering=self.buffer_size)
+
+    def write(self, row: object) -> None:
+        import json as _json
+
+        self._check_open()
+        try:
+            self._file.write(_json.dumps(row) + "\n")
+        except TypeError as e:
+            raise SupRuntimeError(message=f"Cannot write JSON line: {e}")
+
+    def _close(self) -> None:
+        self._file.close()
+
+    def __repr__(self) -> str:
+        return f"<json lines writer {self.path!r}>"
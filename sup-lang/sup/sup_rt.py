@@ -0,0 +1,206 @@
+# Runtime support imported by Python code transpiled from sup.
+#
+# Builtins without an inline translation are emitted as ``call(name, *args)`` and
+# run by an Interpreter created for each run on already evaluated values, so results,
+# error messages, capability checks (SUP_CAPS / SUP_UNSAFE) and resource limits
+# are exactly the interpreter's. The other helpers mirror its collection and
+# error semantics where plain Python would differ.
+from __future__ import annotations
+
+import sys
+from math import sqrt  # noqa: F401 - used by transpiled code
+
+from . import ast as AST
+from .errors import SupRuntimeError
+from .interpreter import Interpreter, IOHooks, _SupThrown
+
+_interp: Interpreter | None = None
+# Programs and modules currently between enter() and shutdown()
+_depth = 0
+# (builtin, arity) -> BuiltinCall whose arguments read the slots below
+_nodes: dict[tuple[str, int], AST.BuiltinCall] = {}
+_SLOT = "__rt_arg{}"
+
+
+class _StdoutHooks(IOHooks):
+    """Builtin output goes straight to ``sys.stdout``, like transpiled prints."""
+
+    def write_output(self, text: str) -> None:
+        sys.stdout.write(text)
+
+
+def interpreter() -> Interpreter:
+    global _interp
+    if _interp is None:
+        _interp = Interpreter()
+        _interp.io = _StdoutHooks()
+    return _interp
+
+
+def call(name: str, *args: object) -> object:
+    """Evaluate builtin ``name`` on ``args`` exactly as the interpreter would."""
+    interp = interpreter()
+    key = (name, len(args))
+    node = _nodes.get(key)
+    if node is None:
+        node = AST.BuiltinCall(
+            name=name,
+            args=[AST.Identifier(name=_SLOT.format(i)) for i in range(len(args))],
+        )
+        _nodes[key] = node
+    env = interp.env
+    for i, value in enumerate(args):
+        env[_SLOT.format(i)] = value
+    try:
+        return interp._eval_builtin(node)
+    finally:
+        for i in range(len(args)):
+            env.pop(_SLOT.format(i), None)
+
+
+def enter() -> None:
+    """Mark the start of a program or module body; pairs with ``shutdown``."""
+    global _depth
+    _depth += 1
+
+
+def shutdown() -> None:
+    """Close writers, the async runtime and pooled connections opened by builtins.
+
+    Only the outermost body does this; it also drops the interpreter so the next
+    run starts from the current SUP_CAPS, limits and counters.
+    """
+    global _depth, _interp
+    _depth = max(0, _depth - 1)
+    interp = _interp
+    if _depth or interp is None:
+        return
+    _interp = None
+    interp._close_handles()
+    if interp._async is not None:
+        interp._async.shutdown()
+        interp._async = None
+    if interp._http_pool is not None:
+        interp._http_pool.close()
+        interp._http_pool = None
+
+
+# ---- numbers ----
+def num(v: object) -> float:
+    if isinstance(v, (int, float)):
+        return float(v)
+    if isinstance(v, str):
+        try:
+            return float(v)
+        except ValueError:
+            pass
+    raise SupRuntimeError(message=f"Expected a number, got {type(v).__name__}.")
+
+
+def _arith(a: object, b: object) -> tuple[float, float, bool]:
+    return num(a), num(b), isinstance(a, int) and isinstance(b, int)
+
+
+# Arithmetic the type checker could not prove numeric; same coercions as the
+# interpreter (numeric strings are accepted, ints stay ints)
+def add(a: object, b: object) -> float:
+    x, y, ints = _arith(a, b)
+    value = x + y
+    return int(value) if ints and value.is_integer() else value
+
+
+def sub(a: object, b: object) -> float:
+    x, y, ints = _arith(a, b)
+    value = x - y
+    return int(value) if ints and value.is_integer() else value
+
+
+def mul(a: object, b: object) -> float:
+    x, y, ints = _arith(a, b)
+    value = x * y
+    return int(value) if ints and value.is_integer() else value
+
+
+def div(a: object, b: object) -> float:
+    x, y = num(a), num(b)
+    if y == 0:
+        raise SupRuntimeError(message="Division by zero.")
+    return x / y
+
+
+def lt(a: object, b: object) -> bool:
+    return num(a) < num(b)
+
+
+def gt(a: object, b: object) -> bool:
+    return num(a) > num(b)
+
+
+def le(a: object, b: object) -> bool:
+    return num(a) <= num(b)
+
+
+def ge(a: object, b: object) -> bool:
+    return num(a) >= num(b)
+
+
+# ---- collections ----
+def get(target: object, key: object) -> object:
+    if isinstance(target, list):
+        try:
+            idx = int(num(key))
+        except Exception:
+            raise SupRuntimeError(message="List index must be a number.")
+        try:
+            return target[idx]
+        except Exception:
+            raise SupRuntimeError(message="List index out of range.")
+    if isinstance(target, dict):
+        return target.get(key)
+    raise SupRuntimeError(message="Get target must be a list or map.")
+
+
+def set_key(target: object, key: object, value: object) -> object:
+    if not isinstance(target, dict):
+        raise SupRuntimeError(message="Set target must be a map.")
+    target[key] = value
+    return target
+
+
+def delete_key(target: object, key: object) -> object:
+    if not isinstance(target, dict):
+        raise SupRuntimeError(message="Delete target must be a map.")
+    target.pop(key, None)
+    return target
+
+
+def push(target: object, item: object) -> object:
+    if not isinstance(target, list):
+        raise SupRuntimeError(message="Push target must be a list.")
+    target.append(item)
+    return target
+
+
+def pop(target: object) -> object:
+    if not isinstance(target, list):
+        raise SupRuntimeError(message="Pop target must be a list.")
+    return target.pop()
+
+
+def collect(existing: object, value: object) -> list[object]:
+    """Append for ``collect ... into``; a missing or non-list target starts a new list."""
+    if not isinstance(existing, list):
+        existing = []
+    existing.append(value)
+    return existing
+
+
+# ---- errors ----
+Thrown = _SupThrown
+
+
+def caught(e: BaseException) -> object:
+    """Value bound by ``catch name``: the thrown value, or the error message."""
+    if isinstance(e, _SupThrown):
+        return e.value
+    return str(e)
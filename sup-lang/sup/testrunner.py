@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from . import tooling
+
+
+@dataclass
+class TestResult:
+    __test__ = False  # not a pytest test class
+
+    path: str
+    passed: bool
+    ms: float
+    message: str = ""
+    output: str = ""
+    cached: bool = False
+    # (module, path, sha256) of every module the test imports, transitively
+    deps: list[tuple[str, str, str]] = field(default_factory=list)
+    # (path, sha256 or "" if missing) of data files declared with ``note test: data``
+    inputs: list[tuple[str, str]] = field(default_factory=list)
+    # False for tests marked ``note test: no-cache``
+    cacheable: bool = True
+
+
+def _directives(source: str, path: str) -> tuple[bool, list[str]]:
+    """Whether a test may be cached, and the data files it declares.
+
+    ``note test: no-cache`` opts a test out of the result cache (e.g. it reads
+    stdin or the network); ``note test: data <file>`` adds a file, relative to
+    the test, to its cache key.
+    """
+    cacheable = True
+    data: list[str] = []
+    base = os.path.dirname(os.path.abspath(path))
+    for line in source.splitlines():
+        words = line.strip().split(None, 2)
+        if len(words) < 3 or words[0].lower() != "note" or words[1].lower() != "test:":
+            continue
+        directive, _, arg = words[2].partition(" ")
+        if directive.lower() == "no-cache":
+            cacheable = False
+        elif directive.lower() == "data" and arg.strip():
+            data.append(os.path.join(base, arg.strip()))
+    return cacheable, data
+
+
+def _input_hash(path: str) -> str:
+    try:
+        return tooling.sha256_file(path)
+    except OSError:
+        return ""
+
+
+def run_test(path: str) -> TestResult:
+    """Run one test file in a fresh interpreter; any error fails it."""
+    from .interpreter import Interpreter
+
+    t0 = time.perf_counter()
+    program = None
+    cacheable = True
+    inputs: list[tuple[str, str]] = []
+    interp = Interpreter()
+    try:
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        cacheable, data = _directives(source, path)
+        # Hashed before the run, so a test that rewrites its data is not cached
+        inputs = [(p, _input_hash(p)) for p in data]
+        program = tooling.parser().parse(source)
+        interp.run(program)
+        passed, message = True, ""
+    except Exception as e:
+        passed, message = False, str(e) or type(e).__name__
+    ms = (time.perf_counter() - t0) * 1000
+    deps = tooling.dependencies(program) if program is not None else []
+    if any(_input_hash(p) != sha for p, sha in inputs):
+        cacheable = False
+    return TestResult(
+        path,
+        passed,
+        ms,
+        message,
+        "".join(interp.io.outputs),
+        deps=deps,
+        inputs=inputs,
+        cacheable=cacheable,
+    )
+
+
+class ResultCache:
+    """Passing results keyed by test content and the content of its imports.
+
+    A test is skipped while its own file, every module it imported when it last
+    passed, the data files it declares, and the runtime (sup version, package
+    modules, lexicon, ``SUP_*`` settings) are unchanged. Other inputs (files it
+    does not declare, stdin, the network) are not tracked.
+    Failures and tests marked ``note test: no-cache`` are never cached.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._hashes: dict[str, str | None] = {}
+        data = tooling.load_json(path)
+        self.env = self._env_key()
+        if data.get("env") != self.env:
+            data = {}
+        self.entries: dict[str, dict[str, Any]] = data.get("tests", {})
+
+    @staticmethod
+    def _env_key() -> str:
+        # Any module of the package or the lexicon can change what a test does
+        settings = sorted((k, v) for k, v in os.environ.items() if k.startswith("SUP_"))
+        return json.dumps([tooling.source_tag(), tooling.lexicon_hash(), settings])
+
+    def _hash(self, path: str) -> str | None:
+        if path not in self._hashes:
+            try:
+                self._hashes[path] = tooling.sha256_file(path)
+            except OSError:
+                self._hashes[path] = None
+        return self._hashes[path]
+
+    def lookup(self, path: str) -> TestResult | None:
+        key = os.path.abspath(path)
+        entry = self.entries.get(key)
+        if entry is None or entry.get("sha256") != self._hash(key):
+            return None
+        if not tooling.dependencies_unchanged(entry.get("deps", []), self._hash):
+            return None
+        for data_path, sha in entry.get("inputs", []):
+            if (self._hash(data_path) or "") != sha:
+                return None
+        return TestResult(path, True, float(entry.get("ms", 0.0)), cached=True)
+
+    def store(self, result: TestResult) -> None:
+        key = os.path.abspath(result.path)
+        if not result.passed or not result.cacheable:
+            self.entries.pop(key, None)
+            return
+        sha = self._hash(key)
+        if sha is None:
+            return
+        self.entries[key] = {
+            "sha256": sha,
+            "ms": round(result.ms, 3),
+            "deps": [list(d) for d in result.deps],
+            "inputs": [list(i) for i in result.inputs],
+        }
+
+    def save(self) -> None:
+        tooling.save_json(self.path, {"env": self.env, "tests": self.entries})
+
+
+def default_cache_path(tests_dir: str) -> str:
+    """Per-directory result cache under ``SUP_TEST_CACHE`` or ~/.cache/sup/tests."""
+    return tooling.cache_path("SUP_TEST_CACHE", "tests", [tests_dir])
+
+
+def run_tests(
+    paths: list[str],
+    *,
+    jobs: int = 1,
+    cache: ResultCache | None = None,
+    on_result: Callable[[TestResult], None] | None = None,
+) -> list[TestResult]:
+    """Run ``paths`` on up to ``jobs`` processes; results keep ``paths`` order.
+
+    Tests with a cached passing result are not run. ``on_result`` is called as
+    each result becomes available in order.
+    """
+    results: list[TestResult | None] = [None] * len(paths)
+    todo: list[int] = []
+    for i, path in enumerate(paths):
+        hit = cache.lookup(path) if cache is not None else None
+        if hit is not None:
+            results[i] = hit
+        else:
+            todo.append(i)
+
+    def finished(i: int, result: TestResult) -> None:
+        results[i] = result
+        if cache is not None:
+            cache.store(result)
+
+    jobs = max(1, min(jobs, len(todo)))
+    if jobs == 1:
+        ran = (run_test(paths[i]) for i in todo)
+        pool = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        # Small chunks keep slow tests from piling up behind one worker
+        chunk = max(1, min(16, len(todo) // (jobs * 8)))
+        ran = pool.map(run_test, [paths[i] for i in todo], chunksize=chunk)
+    try:
+        reported = 0
+        for i, result in zip(todo, ran):
+            finished(i, result)
+            while reported < len(results) and results[reported] is not None:
+                if on_result is not None:
+                    on_result(results[reported])  # type: ignore[arg-type]
+                reported += 1
+        if on_result is not None:
+            for result in results[reported:]:
+                on_result(result)  # type: ignore[arg-type]
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if cache is not None:
+            cache.save()
+    return results  # type: ignore[return-value]
+
+
+def json_report(results: list[TestResult], seconds: float) -> str:
+    tests = []
+    for r in results:
+        item = asdict(r)
+        for key in ("deps", "inputs", "cacheable"):
+            item.pop(key)
+        tests.append(item)
+    return json.dumps(
+        {
+            "summary": {
+                "total": len(results),
+                "passed": sum(r.passed for r in results),
+                "failed": sum(not r.passed for r in results),
+                "cached": sum(r.cached for r in results),
+                "seconds": round(seconds, 3),
+            },
+            "tests": tests,
+        },
+        indent=2,
+    )
+
+
+def junit_report(results: list[TestResult], seconds: float) -> str:
+    from xml.etree import ElementTree as ET
+
+    suite = ET.Element(
+        "testsuite",
+        name="sup",
+        tests=str(len(results)),
+        failures=str(sum(not r.passed for r in results)),
+        errors="0",
+        skipped="0",
+        time=f"{seconds:.3f}",
+    )
+    for r in results:
+        case = ET.SubElement(
+            suite, "testcase", classname="sup", name=r.path, time=f"{r.ms / 1000:.3f}"
+        )
+        if r.cached:
+            props = ET.SubElement(case, "properties")
+            ET.SubElement(props, "property", name="cached", value="true")
+        if not r.passed:
+            failure = ET.SubElement(case, "failure", message=r.message)
+            failure.text = r.output
+    return ET.tostring(suite, encoding="unicode", xml_declaration=True)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from collections.abc import Callable
+from typing import Any
+
+from . import __version__
+
+# Worker-local parser; the lexicon is loaded once per process
+_PARSER: Any = None
+
+
+def parser() -> Any:
+    """This process's shared Parser, created on first use."""
+    global _PARSER
+    if _PARSER is None:
+        from .parser import Parser
+
+        _PARSER = Parser()
+    return _PARSER
+
+
+def discover(paths: list[str]) -> list[str]:
+    """``.sup`` files named in ``paths`` or found under directories among them."""
+    found: list[str] = []
+    for path in paths:
+        if not os.path.isdir(path):
+            found.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for fn in sorted(files):
+                if fn.lower().endswith(".sup"):
+                    found.append(os.path.join(root, fn))
+    return found
+
+
+def lexicon_hash() -> str:
+    """Hash of the lexicon the parser will load (``SUP_LEXICON`` or the default)."""
+    path = os.environ.get(
+        "SUP_LEXICON", os.path.join(os.path.dirname(__file__), "lexicon", "english.json")
+    )
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def sha256_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def dependencies(program: Any) -> list[tuple[str, str, str]]:
+    """(module, path, sha256) of every module ``program`` imports, transitively.
+
+    Modules not on the search path are listed with an empty path and hash.
+    """
+    from . import loader
+
+    deps: list[tuple[str, str, str]] = []
+    seen: set[str] = set()
+    pending = list(loader.imports_of(program))
+    while pending:
+        module = pending.pop()
+        if module.lower() in seen:
+            continue
+        seen.add(module.lower())
+        path = loader.resolve(module)
+        if path is None:
+            deps.append((module, "", ""))
+            continue
+        path = os.path.abspath(path)
+        try:
+            deps.append((module, path, sha256_file(path)))
+            pending.extend(loader.imports_of(loader.load(path)))
+        except Exception:
+            # Unreadable or unparsable modules are reported where they are used
+            continue
+    return sorted(deps)
+
+
+def dependencies_unchanged(
+    deps: list[Any], file_hash: Callable[[str], str | None]
+) -> bool:
+    """Whether every module in ``deps`` still resolves to a file with the same hash."""
+    from . import loader
+
+    for module, dep_path, sha in deps:
+        found = loader.resolve(module)
+        if not dep_path:
+            if found is not None:
+                return False
+        elif found is None or os.path.abspath(found) != dep_path:
+            return False
+        elif file_hash(dep_path) != sha:
+            return False
+    return True
+
+
+def source_tag(names: list[str] | None = None) -> str:
+    """sup version plus mtime and size of the named package modules (default: all)."""
+    here = os.path.dirname(__file__)
+    if names is None:
+        names = sorted(fn for fn in os.listdir(here) if fn.endswith(".py"))
+    parts = [__version__]
+    for name in names:
+        try:
+            st = os.stat(os.path.join(here, name))
+            parts.append(f"{name}:{st.st_mtime_ns}:{st.st_size}")
+        except OSError:
+            parts.append(f"{name}:-")
+    return "|".join(parts)
+
+
+def cache_path(env_var: str, kind: str, paths: list[str]) -> str:
+    """Cache file for ``paths`` under ``$env_var`` or ~/.cache/sup/<kind>."""
+    base = os.environ.get(env_var) or os.path.join(os.path.expanduser("~"), ".cache", "sup", kind)
+    key = "\0".join(sorted(os.path.abspath(p) for p in paths))
+    return os.path.join(base, hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + ".json")
+
+
+def load_json(path: str) -> dict[str, Any]:
+    """Contents of a JSON cache file, or an empty dict if it is missing or corrupt."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_json(path: str, data: object) -> None:
+    """Replace ``path`` with ``data`` atomically; a cache that cannot be written is skipped."""
+    directory = os.path.dirname(path) or "."
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+        except OSError:
+            os.remove(tmp)
+            raise
+    except OSError:
+        pass
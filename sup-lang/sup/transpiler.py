@@ -0,0 +1,659 @@
+from __future__ import annotations
+
+import ast as py
+from types import CodeType
+
+from . import ast as AST
+
+_HEADER = "# Transpiled from sup\n"
+
+
+def to_python_module(program: AST.Program, *, exports: bool = False) -> py.Module:
+    """Python ``ast.Module`` for ``program``; statements carry sup line numbers."""
+    return _PythonEmitter(exports=exports).emit_module(program)
+
+
+def compile_program(
+    program: AST.Program,
+    filename: str = "<sup>",
+    *,
+    exports: bool = False,
+    package: str | None = None,
+) -> CodeType:
+    """Compile ``program`` straight to a code object, without a source round trip.
+
+    Line numbers in tracebacks refer to ``filename`` (the .sup file). With
+    ``package``, sup imports load ``<package>.<module>`` instead of ``<module>``.
+    """
+    module = _PythonEmitter(exports=exports, package=package).emit_module(program)
+    return compile(module, filename, "exec")
+
+
+def to_python(program: AST.Program, *, exports: bool = False) -> str:
+    emitter = _PythonEmitter(exports=exports)
+    return emitter.emit_program(program)
+
+
+def to_python_with_map(
+    program: AST.Program, *, exports: bool = False
+) -> tuple[str, list[int | None], list[int | None]]:
+    emitter = _PythonEmitter(exports=exports)
+    module = emitter.emit_module(program)
+    code = _HEADER + py.unparse(module) + "\n"
+    src_lines, src_cols = emitter.line_map(module, code)
+    return code, src_lines, src_cols
+
+
+def _bound_names(statements: list[AST.Node]) -> set[str]:
+    """Names a list of statements (and nested blocks) may assign."""
+    names: set[str] = set()
+    for stmt in statements:
+        for node in AST.walk(stmt):
+            if isinstance(node, (AST.Assignment, AST.Ask)):
+                names.add(node.name)
+            elif isinstance(node, AST.Collect):
+                names.add(node.target)
+            elif isinstance(node, AST.TryCatch) and node.catch_name:
+                names.add(node.catch_name)
+            elif isinstance(node, AST.ForEach):
+                names.add(node.var)
+            elif isinstance(node, AST.MakeList):
+                names.add("list")
+            elif isinstance(node, AST.MakeMap):
+                names.add("map")
+    return names
+
+
+def _function_reads(functions: list[AST.FunctionDef]) -> set[str]:
+    """Free names function bodies read; in Python these resolve to module globals."""
+    names: set[str] = set()
+    for fn in functions:
+        for stmt in fn.body:
+            for node in AST.walk(stmt):
+                if isinstance(node, AST.Identifier):
+                    names.add(node.name.split(".", 1)[0])
+                elif isinstance(node, AST.Collect):
+                    names.add(node.target)
+        names.difference_update(fn.params)
+    return names
+
+
+# ---- small ast constructors ----
+def _name(id_: str, ctx: py.expr_context | None = None) -> py.expr:
+    ctx = ctx or py.Load()
+    if "." not in id_:
+        return py.Name(id=id_, ctx=ctx)
+    # Dotted sup names (module.symbol) become attribute access
+    head, *rest = id_.split(".")
+    expr: py.expr = py.Name(id=head, ctx=py.Load())
+    for i, part in enumerate(rest):
+        expr = py.Attribute(
+            value=expr, attr=part, ctx=ctx if i == len(rest) - 1 else py.Load()
+        )
+    return expr
+
+
+def _const(value: object) -> py.expr:
+    # Negative numbers unparse as `-n`, which parses back as a unary minus
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value < 0:
+        return py.UnaryOp(op=py.USub(), operand=py.Constant(value=-value))
+    return py.Constant(value=value)
+
+
+def _call(func: py.expr, *args: py.expr) -> py.Call:
+    return py.Call(func=func, args=list(args), keywords=[])
+
+
+def _in_exact_range(value: py.expr) -> py.expr:
+    """``-2**53 <= value <= 2**53``."""
+    return py.Compare(
+        left=_const(-_EXACT_INT),
+        ops=[py.LtE(), py.LtE()],
+        comparators=[value, _const(_EXACT_INT)],
+    )
+
+
+def _walrus(target: str, value: py.expr) -> py.NamedExpr:
+    return py.NamedExpr(target=py.Name(id=target, ctx=py.Store()), value=value)
+
+
+def _assign(target: str, value: py.expr) -> py.Assign:
+    return py.Assign(targets=[_name(target, py.Store())], value=value)
+
+
+def _method(obj: py.expr, name: str, *args: py.expr) -> py.Call:
+    return _call(py.Attribute(value=obj, attr=name, ctx=py.Load()), *args)
+
+
+def _args(names: list[str]) -> py.arguments:
+    return py.arguments(
+        posonlyargs=[],
+        args=[py.arg(arg=n) for n in names],
+        vararg=None,
+        kwonlyargs=[],
+        kw_defaults=[],
+        kwarg=None,
+        defaults=[],
+    )
+
+
+def _def(name: str, params: list[str], body: list[py.stmt]) -> py.FunctionDef:
+    return py.FunctionDef(
+        name=name, args=_args(params), body=body, decorator_list=[], returns=None
+    )
+
+
+_BINOPS: dict[str, type[py.operator]] = {
+    "+": py.Add,
+    "-": py.Sub,
+    "*": py.Mult,
+    "/": py.Div,
+}
+# Typed arithmetic is exact for ints in this range (see interpreter._EXACT_INT)
+_EXACT_INT = 2**53
+# sup_rt helpers for operations whose operands may need coercing to numbers
+_RT_BINOPS = {"+": "add", "-": "sub", "*": "mul", "/": "div"}
+_RT_CMPOPS = {"<": "lt", ">": "gt", "<=": "le", ">=": "ge"}
+_CMPOPS: dict[str, type[py.cmpop]] = {
+    "==": py.Eq,
+    "!=": py.NotEq,
+    "<": py.Lt,
+    ">": py.Gt,
+    "<=": py.LtE,
+    ">=": py.GtE,
+}
+
+
+class _PythonEmitter:
+    """Builds a Python ``ast.Module`` from a sup program.
+
+    Every generated statement gets the line of the sup statement it came from,
+    so code objects compiled from the module report sup line numbers.
+    """
+
+    def __init__(
+        self,
+        *,
+        exports: bool = False,
+        fast_locals: bool = True,
+        package: str | None = None,
+    ) -> None:
+        # exports: top-level names stay module globals so importers can read them
+        self.exports = exports
+        # package: sup modules are imported from it, away from Python's own modules
+        self.package = package
+        # fast_locals: keep main-program variables local to __main__ unless a
+        # function reads them, and drop last_result stores nobody reads
+        self.fast_locals = fast_locals
+        self.keep_last_result = True
+        self.main_locals: set[str] = set()
+        self.in_function = 0
+        # Set once emitted code needs the sup_rt runtime support module
+        self.uses_rt = False
+        # id(python stmt) -> (sup line, sup column), for sourcemaps
+        self.positions: dict[int, tuple[int, int]] = {}
+        self._line = 1
+        self._col = 0
+        # Counter for temporaries of guarded typed arithmetic
+        self._temps = 0
+
+    @property
+    def rt(self) -> py.expr:
+        self.uses_rt = True
+        return py.Name(id="_rt", ctx=py.Load())
+
+    def _rt_call(self, name: str, *args: py.expr) -> py.Call:
+        return _call(py.Attribute(value=self.rt, attr=name, ctx=py.Load()), *args)
+
+    def _exact_operands(
+        self, k: int, left: py.expr, right: py.expr
+    ) -> list[tuple[py.expr, py.expr]]:
+        """``(first use, later uses)`` of each operand of a guarded operation.
+
+        Operands go through temporaries so the fallback does not evaluate them
+        again; small literals need neither a temporary nor a range check, and are
+        returned as the same node twice.
+        """
+        operands: list[tuple[py.expr, py.expr]] = []
+        for name, node in ((f"__a{k}", left), (f"__b{k}", right)):
+            lit = node.operand if isinstance(node, py.UnaryOp) else node
+            value = lit.value if isinstance(lit, py.Constant) else None
+            if type(value) in (int, float) and abs(value) <= _EXACT_INT:  # type: ignore[arg-type]
+                operands.append((node, node))
+            else:
+                operands.append((_walrus(name, node), _name(name)))
+        return operands
+
+    def _exact_binop(
+        self, sym: str, op: type[py.operator], left: py.expr, right: py.expr
+    ) -> py.expr:
+        """``left op right`` while operands and result stay within ±2**53.
+
+        Like Interpreter._typed_binary, anything outside that range is recomputed
+        by the generic (float-based) arithmetic in sup_rt.
+        """
+        k = self._temps
+        self._temps += 1
+        operands = self._exact_operands(k, left, right)
+        result = f"__v{k}"
+        computed = py.BinOp(left=operands[0][0], op=op(), right=operands[1][0])
+        checks = [_in_exact_range(_walrus(result, computed))]
+        checks += [_in_exact_range(later) for first, later in operands if first is not later]
+        guard = checks[0] if len(checks) == 1 else py.BoolOp(op=py.And(), values=checks)
+        fallback = self._rt_call(_RT_BINOPS[sym], operands[0][1], operands[1][1])
+        return py.IfExp(test=guard, body=_name(result), orelse=fallback)
+
+    def _exact_compare(
+        self, sym: str, cmp: type[py.cmpop], left: py.expr, right: py.expr
+    ) -> py.expr:
+        """``left cmp right`` while both operands stay within ±2**53.
+
+        Like Interpreter._typed_compare, other operands are compared by sup_rt,
+        as floats.
+        """
+        k = self._temps
+        self._temps += 1
+        operands = self._exact_operands(k, left, right)
+        # Checking the first uses binds the temporaries; ``&`` rather than ``and``
+        # so the second is bound even when the first check fails
+        checks = [_in_exact_range(first) for first, later in operands if first is not later]
+        if not checks:
+            return py.Compare(left=left, ops=[cmp()], comparators=[right])
+        guard = checks[0]
+        if len(checks) == 2:
+            guard = py.BinOp(left=checks[0], op=py.BitAnd(), right=checks[1])
+        body = py.Compare(left=operands[0][1], ops=[cmp()], comparators=[operands[1][1]])
+        fallback = self._rt_call(_RT_CMPOPS[sym], operands[0][1], operands[1][1])
+        return py.IfExp(test=guard, body=body, orelse=fallback)
+
+    # ---- program ----
+    def emit_program(self, program: AST.Program) -> str:
+        return _HEADER + py.unparse(self.emit_module(program)) + "\n"
+
+    def emit_module(self, program: AST.Program) -> py.Module:
+        from .typecheck import annotate
+
+        # Generated code is cached per source file, so other modules' types
+        # must not decide which operations skip number coercion
+        annotate(program, module=self.exports, imports="none")
+        functions = [st for st in program.statements if isinstance(st, AST.FunctionDef)]
+        main_stmts = [st for st in program.statements if not isinstance(st, AST.FunctionDef)]
+        # Only bare `print` reads last_result; without one every store is dead
+        self.keep_last_result = not self.fast_locals or any(
+            isinstance(n, AST.Print) and n.expr is None for n in AST.walk(program)
+        )
+        if self.fast_locals:
+            bound = _bound_names(main_stmts)
+            if self.exports:
+                global_names = bound
+            else:
+                global_names = bound & _function_reads(functions)
+            self.main_locals = bound - global_names
+        else:
+            global_names = _bound_names(program.statements) - {
+                n.var for n in AST.walk(program) if isinstance(n, AST.ForEach)
+            }
+
+        body: list[py.stmt] = [self._fmt_helper(), _assign("last_result", _const(None))]
+        for fn in functions:
+            body.append(self.emit_function(fn))
+
+        main_body: list[py.stmt] = []
+        if global_names:
+            main_body.append(py.Global(names=sorted(global_names)))
+        code = self.emit_block(main_stmts, allow_empty=True)
+        if self.uses_rt:
+            # Release writers, async tasks and pooled connections like Interpreter.run
+            shutdown = py.Expr(value=self._rt_call("shutdown"))
+            code = [
+                py.Expr(value=self._rt_call("enter")),
+                py.Try(body=code or [py.Pass()], handlers=[], orelse=[], finalbody=[shutdown]),
+            ]
+        main_body.extend(code)
+        body.append(_def("__main__", [], main_body or [py.Pass()]))
+        # Like a sup module, the body runs when the file is executed or imported
+        body.append(py.Expr(value=_call(py.Name(id="__main__", ctx=py.Load()))))
+        if self.uses_rt:
+            body.insert(
+                0,
+                py.ImportFrom(module="sup", names=[py.alias(name="sup_rt", asname="_rt")], level=0),
+            )
+        module = py.Module(body=body, type_ignores=[])
+        for stmt in module.body:
+            _locate(stmt, 1, 0)
+        return module
+
+    def _fmt_helper(self) -> py.FunctionDef:
+        # Function results are floats for numbers, like the interpreter
+        v = py.Name(id="v", ctx=py.Load())
+        is_num = py.BoolOp(
+            op=py.And(),
+            values=[
+                _call(
+                    py.Name(id="isinstance", ctx=py.Load()),
+                    v,
+                    py.Tuple(
+                        elts=[py.Name(id="int", ctx=py.Load()), py.Name(id="float", ctx=py.Load())],
+                        ctx=py.Load(),
+                    ),
+                ),
+                py.UnaryOp(
+                    op=py.Not(),
+                    operand=_call(py.Name(id="isinstance", ctx=py.Load()), v, py.Name(id="bool", ctx=py.Load())),
+                ),
+            ],
+        )
+        ret = py.IfExp(test=is_num, body=_call(py.Name(id="float", ctx=py.Load()), v), orelse=v)
+        return _def("_fmt", ["v"], [py.Return(value=ret)])
+
+    def emit_function(self, fn: AST.FunctionDef) -> py.FunctionDef:
+        self._line = getattr(fn, "line", None) or self._line
+        self._col = getattr(fn, "column", None) or 0
+        line, col = self._line, self._col
+        body: list[py.stmt] = []
+        if self.keep_last_result:
+            body.append(py.Global(names=["last_result"]))
+        self.in_function += 1
+        body.extend(self.emit_block(fn.body, allow_empty=True))
+        self.in_function -= 1
+        node = _def(fn.name, list(fn.params), body or [py.Pass()])
+        self._mark(node, line, col)
+        return node
+
+    def emit_block(self, body: list[AST.Node], *, allow_empty: bool = False) -> list[py.stmt]:
+        out: list[py.stmt] = []
+        for s in body:
+            out.extend(self.emit_stmt(s))
+        if not out and not allow_empty:
+            out.append(py.Pass())
+        return out
+
+    def _mark(self, stmt: py.stmt, line: int, col: int) -> None:
+        self.positions[id(stmt)] = (line, col)
+        # sup columns are 1-based, Python col_offset is 0-based
+        _locate(stmt, line, max(0, col - 1))
+
+    # ---- statements ----
+    def emit_stmt(self, node: AST.Node) -> list[py.stmt]:
+        outer = (self._line, self._col)
+        self._line = getattr(node, "line", None) or self._line
+        self._col = getattr(node, "column", None) or 0
+        line, col = self._line, self._col
+        try:
+            stmts = self._emit_stmt(node)
+        finally:
+            self._line, self._col = outer
+        for stmt in stmts:
+            self._mark(stmt, line, col)
+        return stmts
+
+    def _emit_stmt(self, node: AST.Node) -> list[py.stmt]:
+        if isinstance(node, AST.Assignment):
+            return [_assign(node.name, self.emit_expr(node.expr))] + self._store_last(
+                _name(node.name), pure=True
+            )
+        if isinstance(node, AST.Print):
+            value = _name("last_result") if node.expr is None else self.emit_expr(node.expr)
+            return [py.Expr(value=_call(_name("print"), value))]
+        if isinstance(node, AST.If):
+            cond = node.cond if node.cond is not None else AST.Compare(op=node.op, left=node.left, right=node.right)  # type: ignore[arg-type]
+            return [
+                py.If(
+                    test=self.emit_expr(cond),
+                    body=self.emit_block(node.body or []),
+                    orelse=self.emit_block(node.else_body) if node.else_body is not None else [],
+                )
+            ]
+        if isinstance(node, AST.While):
+            return [py.While(test=self.emit_expr(node.cond), body=self.emit_block(node.body), orelse=[])]
+        if isinstance(node, AST.ForEach):
+            # Parallel loops run serially here; output and collected values match
+            return [
+                py.For(
+                    target=_name(node.var, py.Store()),
+                    iter=self.emit_expr(node.iterable),
+                    body=self.emit_block(node.body),
+                    orelse=[],
+                )
+            ]
+        if isinstance(node, AST.Repeat):
+            count = _call(_name("int"), self.emit_expr(node.count_expr))
+            return [
+                py.For(
+                    target=_name("_", py.Store()),
+                    iter=_call(_name("range"), count),
+                    body=self.emit_block(node.body),
+                    orelse=[],
+                )
+            ]
+        if isinstance(node, AST.Ask):
+            return [_assign(node.name, _call(_name("input")))] + self._store_last(
+                _name(node.name), pure=True
+            )
+        if isinstance(node, AST.Collect):
+            local = self.in_function or node.target in self.main_locals
+            scope = _call(_name("locals" if local else "globals"))
+            existing = _method(scope, "get", _const(node.target))
+            last = py.Subscript(value=_name(node.target), slice=_const(-1), ctx=py.Load())
+            return [
+                _assign(node.target, self._rt_call("collect", existing, self.emit_expr(node.expr)))
+            ] + self._store_last(last, pure=True)
+        if isinstance(node, AST.ExprStmt):
+            return self._store_last(self.emit_expr(node.expr))
+        if isinstance(node, AST.Return):
+            if node.expr is None:
+                return [py.Return(value=_const(None))]
+            return [py.Return(value=_call(_name("_fmt"), self.emit_expr(node.expr)))]
+        if isinstance(node, AST.FunctionDef):
+            # already emitted at module level
+            return []
+        if isinstance(node, AST.TryCatch):
+            body = self.emit_block(node.body)
+            handlers: list[py.excepthandler] = []
+            if node.catch_body is not None:
+                catch: list[py.stmt] = []
+                if node.catch_name:
+                    # Bind the thrown value (or message) like the interpreter does
+                    catch.append(_assign(node.catch_name, self._rt_call("caught", _name("_e"))))
+                catch.extend(self.emit_block(node.catch_body, allow_empty=bool(catch)))
+                handlers.append(
+                    py.ExceptHandler(
+                        type=_name("Exception"),
+                        name="_e" if node.catch_name else None,
+                        body=catch,
+                    )
+                )
+            final = self.emit_block(node.finally_body) if node.finally_body is not None else []
+            if not handlers and not final:
+                return body
+            return [py.Try(body=body, handlers=handlers, orelse=[], finalbody=final)]
+        if isinstance(node, AST.Throw):
+            return [py.Raise(exc=self._rt_call("Thrown", self.emit_expr(node.value)), cause=None)]
+        if isinstance(node, AST.Import):
+            if self.package is None:
+                return [py.Import(names=[py.alias(name=node.module, asname=node.alias)])]
+            name = f"{self.package}.{node.module}"
+            return [py.Import(names=[py.alias(name=name, asname=node.alias or node.module)])]
+        if isinstance(node, AST.FromImport):
+            module = node.module
+            if self.package is not None:
+                module = f"{self.package}.{module}"
+            return [
+                py.ImportFrom(
+                    module=module,
+                    names=[py.alias(name=n, asname=a) for n, a in node.names],
+                    level=0,
+                )
+            ]
+        # Expression statements (push, set ... in map, builtins) update last_result
+        return self._store_last(self.emit_expr(node))
+
+    def _store_last(self, value: py.expr, *, pure: bool = False) -> list[py.stmt]:
+        """``last_result = value``; when no store is read, keep only side effects."""
+        if self.keep_last_result:
+            return [_assign("last_result", value)]
+        if pure:
+            return []
+        return [py.Expr(value=value)]
+
+    # ---- expressions ----
+    def emit_expr(self, node: AST.Node) -> py.expr:
+        if isinstance(node, (AST.Number, AST.String)):
+            return _const(node.value)
+        if isinstance(node, AST.Identifier):
+            return _name(node.name)
+        if isinstance(node, AST.Binary):
+            op = _BINOPS.get(node.op)
+            if op is None:
+                raise NotImplementedError(f"Unsupported operator {node.op}")
+            left, right = self.emit_expr(node.left), self.emit_expr(node.right)
+            if not node.typed:
+                return self._rt_call(_RT_BINOPS[node.op], left, right)
+            return self._exact_binop(node.op, op, left, right)
+        if isinstance(node, AST.Call):
+            return _call(_name(node.name), *(self.emit_expr(a) for a in node.args))
+        if isinstance(node, AST.MakeList):
+            # `make list` also binds `list` (and `make map` binds `map`)
+            items = py.List(elts=[self.emit_expr(it) for it in node.items], ctx=py.Load())
+            return py.NamedExpr(target=py.Name(id="list", ctx=py.Store()), value=items)
+        if isinstance(node, AST.MakeMap):
+            return py.NamedExpr(target=py.Name(id="map", ctx=py.Store()), value=py.Dict(keys=[], values=[]))
+        if isinstance(node, AST.Push):
+            return self._rt_call("push", self.emit_expr(node.target), self.emit_expr(node.item))
+        if isinstance(node, AST.Pop):
+            return self._rt_call("pop", self.emit_expr(node.target))
+        if isinstance(node, AST.GetKey):
+            return self._rt_call("get", self.emit_expr(node.target), self.emit_expr(node.key))
+        if isinstance(node, AST.SetKey):
+            return self._rt_call(
+                "set_key",
+                self.emit_expr(node.target),
+                self.emit_expr(node.key),
+                self.emit_expr(node.value),
+            )
+        if isinstance(node, AST.DeleteKey):
+            return self._rt_call("delete_key", self.emit_expr(node.target), self.emit_expr(node.key))
+        if isinstance(node, AST.Length):
+            return _call(_name("len"), self.emit_expr(node.target))
+        if isinstance(node, AST.BoolBinary):
+            op: py.boolop = py.And() if node.op == "and" else py.Or()
+            return py.BoolOp(op=op, values=[self.emit_expr(node.left), self.emit_expr(node.right)])
+        if isinstance(node, AST.NotOp):
+            return py.UnaryOp(op=py.Not(), operand=self.emit_expr(node.expr))
+        if isinstance(node, AST.Compare):
+            cmp = _CMPOPS.get(node.op)
+            if cmp is None:
+                raise NotImplementedError(f"Unsupported comparison {node.op}")
+            left, right = self.emit_expr(node.left), self.emit_expr(node.right)
+            if node.op not in _RT_CMPOPS:
+                return py.Compare(left=left, ops=[cmp()], comparators=[right])
+            if not node.typed:
+                return self._rt_call(_RT_CMPOPS[node.op], left, right)
+            return self._exact_compare(node.op, cmp, left, right)
+        if isinstance(node, AST.BuiltinCall):
+            arg_vals = [self.emit_expr(a) for a in node.args]
+            inline = self._inline_builtin(node.name, arg_vals)
+            if inline is not None:
+                return inline
+            return self._rt_call("call", _const(node.name), *arg_vals)
+        raise NotImplementedError(f"Unsupported expression {type(node).__name__}")
+
+    def _inline_builtin(self, name: str, args: list[py.expr]) -> py.expr | None:
+        """Plain Python for hot builtins; same results as the interpreter."""
+        if name == "power":
+            return py.BinOp(
+                left=self._rt_call("num", args[0]), op=py.Pow(), right=self._rt_call("num", args[1])
+            )
+        if name == "sqrt":
+            return self._rt_call("sqrt", self._rt_call("num", args[0]))
+        if name == "abs":
+            return _call(_name("float"), _call(_name("abs"), self._rt_call("num", args[0])))
+        if name in {"upper", "lower"}:
+            return _method(_call(_name("str"), args[0]), name)
+        if name == "concat":
+            return py.BinOp(
+                left=_call(_name("str"), args[0]), op=py.Add(), right=_call(_name("str"), args[1])
+            )
+        return None
+
+    # ---- sourcemaps ----
+    def line_map(
+        self, module: py.Module, code: str
+    ) -> tuple[list[int | None], list[int | None]]:
+        """Sup line/column for each line of ``code`` (the unparsed ``module``)."""
+        n = code.count("\n")
+        lines: list[int | None] = [None] * n
+        cols: list[int | None] = [None] * n
+        reparsed = py.parse(code)
+        # ast.walk is breadth-first, so inner statements override their parents
+        for orig, new in zip(py.walk(module), py.walk(reparsed)):
+            if type(orig) is not type(new):
+                break
+            pos = self.positions.get(id(orig))
+            if pos is None or not isinstance(new, py.stmt):
+                continue
+            end = new.end_lineno or new.lineno
+            for ln in range(new.lineno, end + 1):
+                if 0 < ln <= n:
+                    lines[ln - 1] = pos[0]
+                    cols[ln - 1] = pos[1]
+        return lines, cols
+
+
+def _locate(node: py.AST, line: int, col: int) -> None:
+    """Give ``node`` and any children still lacking a position ``line``/``col``."""
+    for child in py.walk(node):
+        if "lineno" in child._attributes and getattr(child, "lineno", None) is None:
+            child.lineno = line  # type: ignore[attr-defined]
+            child.col_offset = col  # type: ignore[attr-defined]
+            child.end_lineno = line  # type: ignore[attr-defined]
+            child.end_col_offset = col  # type: ignore[attr-defined]
+
+
+_VLQ_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+
+def _to_vlq_signed(value: int) -> int:
+    return (value << 1) ^ (value >> 31)
+
+
+def _encode_vlq(value: int) -> str:
+    vlq = _to_vlq_signed(value)
+    out = ""
+    while True:
+        digit = vlq & 31
+        vlq >>= 5
+        if vlq:
+            digit |= 32
+        out += _VLQ_CHARS[digit]
+        if not vlq:
+            break
+    return out
+
+
+def build_sourcemap_mappings(
+    gen_src_lines: list[int | None], gen_src_cols: list[int | None]
+) -> str:
+    # Standard V3: each segment = [generatedColumn, sourceIndex, originalLine, originalColumn]
+    mappings: list[str] = []
+    last_gen_col = 0
+    last_src_idx = 0
+    last_orig_line = 0
+    last_orig_col = 0
+    for src_line, src_col in zip(gen_src_lines, gen_src_cols):
+        if src_line is None:
+            mappings.append("")
+            last_gen_col = 0
+            continue
+        seg = (
+            f"{_encode_vlq(0 - last_gen_col)}"  # reset to start of line
+            f"{_encode_vlq(0 - last_src_idx)}"  # single source
+            f"{_encode_vlq(max(0, (src_line - 1) - last_orig_line))}"
+            f"{_encode_vlq(max(0, (src_col or 0) - last_orig_col))}"
+        )
+        mappings.append(seg)
+        last_gen_col = 0
+        last_src_idx = 0
+        last_orig_line = src_line - 1
+        last_orig_col = src_col or 0
+    return ";".join(mappings)
@@ -0,0 +1,471 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from . import ast as AST
+
+# A type is the set of runtime kinds a value may have. The empty set means
+# "nothing known yet" while solving; ANY is the top element.
+Type = frozenset
+EMPTY: Type = frozenset()
+ANY: Type = frozenset({"any"})
+INT: Type = frozenset({"int"})
+FLOAT: Type = frozenset({"float"})
+NUMBER: Type = INT | FLOAT
+STR: Type = frozenset({"str"})
+BOOL: Type = frozenset({"bool"})
+LIST: Type = frozenset({"list"})
+MAP: Type = frozenset({"map"})
+NONE: Type = frozenset({"none"})
+FUNCTION: Type = frozenset({"function"})
+MODULE: Type = frozenset({"module"})
+
+# Kinds that never coerce to a number
+_NOT_NUMBERS = frozenset({"list", "map", "none", "function", "module"})
+# Kinds that keep '+', '-' and '*' results integral (booleans count as ints)
+_INTEGRAL = frozenset({"int", "bool"})
+
+# Result types of builtins whose implementation always returns one kind
+_BUILTIN_TYPES: dict[str, Type] = {
+    "min": FLOAT,
+    "max": FLOAT,
+    "floor": FLOAT,
+    "ceil": FLOAT,
+    "abs": FLOAT,
+    "sqrt": FLOAT,
+    "upper": STR,
+    "lower": STR,
+    "trim": STR,
+    "concat": STR,
+    "join": STR,
+    "now": STR,
+    "read_file": STR,
+    "json_stringify": STR,
+    "contains": BOOL,
+}
+
+
+@dataclass
+class TypeIssue:
+    line: int | None
+    column: int | None
+    code: str
+    message: str
+
+
+def join(a: Type, b: Type) -> Type:
+    if "any" in a or "any" in b:
+        return ANY
+    return a | b
+
+
+def is_numeric(t: Type) -> bool:
+    """True when every value of type ``t`` is an int or a float."""
+    return bool(t) and t <= NUMBER
+
+
+def arith_type(op: str, left: Type, right: Type) -> Type:
+    # Operands are coerced to numbers; the result is an int only when both
+    # operands are integral (see Interpreter._to_number)
+    if not left or not right:
+        return EMPTY
+    if op == "/":
+        return FLOAT
+    out: set[str] = set()
+    if left & (_INTEGRAL | ANY) and right & (_INTEGRAL | ANY):
+        out.add("int")
+    if left - _INTEGRAL or right - _INTEGRAL:
+        out.add("float")
+    return frozenset(out)
+
+
+def _returned(t: Type) -> Type:
+    # Calls hand back numbers as floats
+    if "int" in t:
+        return (t - INT) | FLOAT
+    return t
+
+
+def _describe(t: Type) -> str:
+    names = {"list": "a list", "map": "a map", "none": "nothing", "function": "a function", "module": "a module"}
+    return " or ".join(names.get(k, k) for k in sorted(t))
+
+
+@dataclass
+class ModuleTypes:
+    """What importers can know about a module: its globals and function results."""
+
+    names: dict[str, Type] = field(default_factory=dict)
+    returns: dict[str, Type] = field(default_factory=dict)
+
+
+# id(program) -> (program, types); programs come from the loader's parse cache
+_module_cache: dict[int, tuple[AST.Program, ModuleTypes]] = {}
+
+
+class _Inference:
+    """Flow-insensitive type inference over one program, solved to a fixpoint.
+
+    Each scope (the main program, and every function) maps names to the union of
+    everything assigned to them. Parameters take the union of their arguments at
+    every call site. Functions run with a copy of their caller's variables, so a
+    name a function reads without assigning it takes its type from every scope of
+    the program; in an imported module the callers are unknown and such names
+    are ANY. ``Binary``/``Compare`` nodes whose operands are always numbers are
+    marked ``typed``.
+    """
+
+    def __init__(
+        self, program: AST.Program, *, module: bool, imports: str, active: set[str]
+    ) -> None:
+        self.program = program
+        self.module = module
+        self.imports = imports
+        self.active = active
+        defs = [n for n in AST.walk(program) if isinstance(n, AST.FunctionDef)]
+        names = [fn.name.lower() for fn in defs]
+        # Scope key -> definition. A name defined twice gets one scope per
+        # definition, and calls to it are not followed
+        self.functions: dict[str, AST.FunctionDef] = {}
+        self.redefined = {n for n in names if names.count(n) > 1}
+        for i, fn in enumerate(defs):
+            key = names[i] if names[i] not in self.redefined else f"{names[i]}#{i}"
+            self.functions[key] = fn
+        self.scopes: dict[str | None, dict[str, Type]] = {None: {}}
+        self.params: dict[str, list[Type]] = {}
+        self.returns: dict[str, Type] = {}
+        for key, fn in self.functions.items():
+            self.scopes[key] = {}
+            # Module functions are called from code this program cannot see
+            unknown_callers = module or key not in names
+            self.params[key] = [ANY if unknown_callers else EMPTY] * len(fn.params)
+            self.returns[key] = EMPTY
+        self.imported_names: set[str] = set()
+        for node in AST.walk(program):
+            if isinstance(node, AST.FromImport):
+                self.imported_names.update((a or n).lower() for n, a in node.names)
+        self.modules: dict[str, ModuleTypes | None] = {}
+        self.changed = False
+        self.final = False
+        self.issues: list[TypeIssue] = []
+        self._line: int | None = None
+
+    # ---- solving ----
+    def solve(self) -> None:
+        for _ in range(100):
+            self.changed = False
+            self._pass()
+            if not self.changed:
+                break
+        # One more pass with everything known: annotate nodes and report issues
+        self.final = True
+        self._pass()
+
+    def _pass(self) -> None:
+        self.block(self.program.statements, None)
+        for name, fn in self.functions.items():
+            self.block(fn.body, name)
+            if not fn.body or not isinstance(fn.body[-1], AST.Return):
+                self._set_return(name, NONE)
+
+    def _bind(self, scope: str | None, name: str, t: Type) -> None:
+        names = self.scopes[scope]
+        old = names.get(name, EMPTY)
+        new = join(old, t)
+        if new != old:
+            names[name] = new
+            self.changed = True
+
+    def _set_return(self, fn: str, t: Type) -> None:
+        new = join(self.returns[fn], _returned(t))
+        if new != self.returns[fn]:
+            self.returns[fn] = new
+            self.changed = True
+
+    def _free(self, name: str) -> Type:
+        if self.module:
+            return ANY
+        t = EMPTY
+        found = False
+        for scope, names in self.scopes.items():
+            if name in names:
+                t = join(t, names[name])
+                found = True
+            if scope is not None:
+                fn = self.functions[scope]
+                for i, p in enumerate(fn.params):
+                    if p.lower() == name:
+                        t = join(t, self.params[scope][i])
+                        found = True
+        return t if found else ANY
+
+    def lookup(self, scope: str | None, name: str) -> Type:
+        name = name.lower()
+        if "." in name:
+            mod, sym = name.split(".", 1)
+            info = self.modules.get(mod)
+            return info.names.get(sym, ANY) if info is not None else ANY
+        if scope is None:
+            return self.scopes[None].get(name, ANY)
+        t = self.scopes[scope].get(name, EMPTY)
+        fn = self.functions[scope]
+        for i, p in enumerate(fn.params):
+            if p.lower() == name:
+                return join(t, self.params[scope][i])
+        return join(t, self._free(name))
+
+    def _issue(self, node: AST.Node, code: str, message: str) -> None:
+        if self.final:
+            line = getattr(node, "line", None) or self._line
+            self.issues.append(TypeIssue(line, getattr(node, "column", None), code, message))
+
+    # ---- statements ----
+    def block(self, body: list[AST.Node] | None, scope: str | None) -> None:
+        for stmt in body or []:
+            outer = self._line
+            self._line = getattr(stmt, "line", None) or outer
+            self.stmt(stmt, scope)
+            self._line = outer
+
+    def stmt(self, node: AST.Node, scope: str | None) -> None:
+        if isinstance(node, AST.Assignment):
+            self._bind(scope, node.name.lower(), self.expr(node.expr, scope))
+        elif isinstance(node, AST.Print):
+            if node.expr is not None:
+                self.expr(node.expr, scope)
+        elif isinstance(node, AST.Ask):
+            self._bind(scope, node.name.lower(), STR)
+        elif isinstance(node, AST.If):
+            if node.cond is not None:
+                self.expr(node.cond, scope)
+            else:
+                for side in (node.left, node.right):
+                    if side is not None:
+                        self.expr(side, scope)
+            self.block(node.body, scope)
+            self.block(node.else_body, scope)
+        elif isinstance(node, AST.While):
+            self.expr(node.cond, scope)
+            self.block(node.body, scope)
+        elif isinstance(node, AST.Repeat):
+            self.expr(node.count_expr, scope)
+            self.block(node.body, scope)
+        elif isinstance(node, AST.ForEach):
+            self.expr(node.iterable, scope)
+            item = ANY
+            if isinstance(node.iterable, AST.MakeList) and node.iterable.items:
+                item = EMPTY
+                for it in node.iterable.items:
+                    item = join(item, self.expr(it, scope))
+            self._bind(scope, node.var.lower(), item)
+            if node.workers is not None:
+                self.expr(node.workers, scope)
+            self.block(node.body, scope)
+        elif isinstance(node, AST.Collect):
+            self.expr(node.expr, scope)
+            self._bind(scope, node.target.lower(), LIST)
+        elif isinstance(node, AST.ExprStmt):
+            self.expr(node.expr, scope)
+        elif isinstance(node, AST.Return):
+            t = self.expr(node.expr, scope) if node.expr is not None else NONE
+            if scope is not None:
+                self._set_return(scope, t)
+        elif isinstance(node, AST.FunctionDef):
+            pass  # bodies are solved in their own scope
+        elif isinstance(node, AST.TryCatch):
+            self.block(node.body, scope)
+            if node.catch_name:
+                self._bind(scope, node.catch_name.lower(), ANY)
+            self.block(node.catch_body, scope)
+            self.block(node.finally_body, scope)
+        elif isinstance(node, AST.Throw):
+            self.expr(node.value, scope)
+        elif isinstance(node, AST.Import):
+            alias = (node.alias or node.module).lower()
+            self.modules[alias] = self._module_types(node.module)
+            self._bind(scope, alias, MODULE)
+        elif isinstance(node, AST.FromImport):
+            info = self._module_types(node.module)
+            for name, alias in node.names:
+                if info is None:
+                    t = ANY
+                elif name.lower() in info.returns:
+                    t = FUNCTION
+                else:
+                    t = info.names.get(name.lower(), ANY)
+                self._bind(scope, (alias or name).lower(), t)
+        else:
+            self.expr(node, scope)
+
+    # ---- expressions ----
+    def expr(self, node: AST.Node, scope: str | None) -> Type:
+        if isinstance(node, AST.Number):
+            return INT if isinstance(node.value, int) else FLOAT
+        if isinstance(node, AST.String):
+            return STR
+        if isinstance(node, AST.Identifier):
+            return self.lookup(scope, node.name)
+        if isinstance(node, AST.Binary):
+            left = self.expr(node.left, scope)
+            right = self.expr(node.right, scope)
+            node.typed = is_numeric(left) and is_numeric(right)
+            self._check_number(node.left, left, "arithmetic")
+            self._check_number(node.right, right, "arithmetic")
+            return arith_type(node.op, left, right)
+        if isinstance(node, AST.Compare):
+            left = self.expr(node.left, scope)
+            right = self.expr(node.right, scope)
+            node.typed = is_numeric(left) and is_numeric(right)
+            if node.op not in {"==", "!="}:
+                self._check_number(node.left, left, "a comparison")
+                self._check_number(node.right, right, "a comparison")
+            return BOOL
+        if isinstance(node, (AST.BoolBinary, AST.NotOp)):
+            for child in AST.iter_child_nodes(node):
+                self.expr(child, scope)
+            return BOOL
+        if isinstance(node, AST.Call):
+            return self._call(node, scope)
+        if isinstance(node, AST.BuiltinCall):
+            for arg in node.args:
+                self.expr(arg, scope)
+            return _BUILTIN_TYPES.get(node.name, ANY)
+        if isinstance(node, AST.MakeList):
+            for it in node.items:
+                self.expr(it, scope)
+            self._bind(scope, "list", LIST)
+            return LIST
+        if isinstance(node, AST.MakeMap):
+            self._bind(scope, "map", MAP)
+            return MAP
+        if isinstance(node, AST.Push):
+            self.expr(node.item, scope)
+            self._check_kind(node, self.expr(node.target, scope), "list", "Push target must be a list.")
+            return LIST
+        if isinstance(node, AST.Pop):
+            self._check_kind(node, self.expr(node.target, scope), "list", "Pop target must be a list.")
+            return ANY
+        if isinstance(node, (AST.SetKey, AST.DeleteKey)):
+            for child in AST.iter_child_nodes(node):
+                if child is not node.target:
+                    self.expr(child, scope)
+            verb = "Set" if isinstance(node, AST.SetKey) else "Delete"
+            self._check_kind(node, self.expr(node.target, scope), "map", f"{verb} target must be a map.")
+            return MAP
+        if isinstance(node, AST.Length):
+            self.expr(node.target, scope)
+            return INT
+        for child in AST.iter_child_nodes(node):
+            self.expr(child, scope)
+        return ANY
+
+    def _call(self, node: AST.Call, scope: str | None) -> Type:
+        args = [self.expr(a, scope) for a in node.args]
+        name = node.name.lower()
+        if "." in name:
+            mod, sym = name.split(".", 1)
+            info = self.modules.get(mod)
+            return info.returns.get(sym, ANY) if info is not None else ANY
+        # from-imported functions shadow local ones, like in the interpreter.
+        # A module function calls whatever its importer defines under that name
+        if name in self.imported_names or name in self.redefined:
+            return ANY
+        if self.module and scope is not None:
+            return ANY
+        fn = self.functions.get(name)
+        if fn is None:
+            if not any(name in names for names in self.scopes.values()):
+                self._issue(node, "UNDEFINED", f"Undefined function '{node.name}'.")
+            return ANY
+        if len(args) != len(fn.params):
+            self._issue(
+                node,
+                "ARITY",
+                f"Function '{fn.name}' expects {len(fn.params)} argument(s) but got {len(args)}.",
+            )
+            return ANY
+        params = self.params[name]
+        for i, t in enumerate(args):
+            new = join(params[i], t)
+            if new != params[i]:
+                params[i] = new
+                self.changed = True
+        return self.returns[name]
+
+    def _check_number(self, node: AST.Node, t: Type, where: str) -> None:
+        if not self.final:
+            return
+        if isinstance(node, AST.String):
+            try:
+                float(node.value)
+            except ValueError:
+                self._issue(node, "TYPE", f"'{node.value}' is not a number.")
+        elif t and t <= _NOT_NUMBERS:
+            self._issue(node, "TYPE", f"Cannot use {_describe(t)} in {where}.")
+
+    def _check_kind(self, node: AST.Node, t: Type, kind: str, message: str) -> None:
+        if self.final and t and "any" not in t and kind not in t:
+            self._issue(node, "TYPE", message)
+
+    # ---- imports ----
+    def _module_types(self, module: str) -> ModuleTypes | None:
+        from . import loader
+
+        key = module.lower()
+        if self.imports == "none" or key in self.active:
+            return None
+        if self.imports == "cached":
+            program = loader.peek(module)
+        else:
+            path = loader.resolve(module)
+            try:
+                program = loader.load(path) if path is not None else None
+            except Exception:
+                program = None
+        if program is None:
+            return None
+        cached = _module_cache.get(id(program))
+        if cached is not None and cached[0] is program:
+            return cached[1]
+        inf = _Inference(program, module=True, imports=self.imports, active=self.active | {key})
+        inf.solve()
+        program._sup_typed = f"module:{self.imports}"  # type: ignore[attr-defined]
+        info = ModuleTypes(
+            names=dict(inf.scopes[None]),
+            returns={n: t for n, t in inf.returns.items() if "#" not in n},
+        )
+        _module_cache[id(program)] = (program, info)
+        return info
+
+
+def infer(program: AST.Program, *, module: bool = False, imports: str = "load") -> _Inference:
+    """Solve types for ``program``.
+
+    ``imports`` says where imported modules' types come from: "load" parses them
+    through the loader, "cached" only uses modules the loader has already parsed,
+    and "none" treats every imported name as unknown.
+    """
+    if imports not in {"load", "cached", "none"}:
+        raise ValueError(f"Unknown imports mode {imports!r}")
+    inf = _Inference(program, module=module, imports=imports, active=set())
+    inf.solve()
+    return inf
+
+
+def annotate(program: AST.Program, *, module: bool = False, imports: str = "cached") -> None:
+    """Mark arithmetic and comparisons whose operands are always numbers.
+
+    ``module`` analyses the program as an imported module, whose functions may
+    run in any importer's scope. With ``imports="none"`` the marks stay valid
+    when other modules change. Already annotated programs are left alone.
+    """
+    kind = f"{'module' if module else 'main'}:{imports}"
+    if getattr(program, "_sup_typed", None) == kind:
+        return
+    infer(program, module=module, imports=imports)
+    program._sup_typed = kind  # type: ignore[attr-defined]
+
+
+def check(program: AST.Program, *, imports: str = "load") -> list[TypeIssue]:
+    """Type errors that would stop ``program`` whenever the code runs."""
+    return infer(program, imports=imports).issues
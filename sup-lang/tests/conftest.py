@@ -0,0 +1,68 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Header and body go out in separate writes; avoid Nagle + delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):  # keep test output quiet
+        pass
+
+    def _send(self, code, body, ctype="text/plain", extra=None):
+        data = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (extra or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        srv = self.server
+        srv.hits[self.path] = srv.hits.get(self.path, 0) + 1
+        srv.peers.add(self.client_address)
+        route = srv.routes.get(self.path)
+        if route is not None:
+            return route(self)
+        if self.path == "/json":
+            return self._send(200, json.dumps({"ok": True, "n": 3}), "application/json")
+        if self.path == "/missing":
+            return self._send(404, "nope")
+        if self.path == "/redirect":
+            return self._send(302, "", extra={"Location": "/hello"})
+        return self._send(200, "hello")
+
+    def do_POST(self):
+        srv = self.server
+        srv.peers.add(self.client_address)
+        n = int(self.headers.get("Content-Length", "0"))
+        body = self.rfile.read(n).decode("utf-8")
+        return self._send(200, "echo:" + body)
+
+
+@pytest.fixture
+def http_server():
+    """A local keep-alive HTTP server standing in for remote APIs.
+
+    ``server.hits`` counts GETs per path, ``server.peers`` records client sockets and
+    ``server.routes`` lets a test install custom handlers keyed by path.
+    """
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.daemon_threads = True
+    srv.hits = {}
+    srv.peers = set()
+    srv.routes = {}
+    srv.base = f"http://127.0.0.1:{srv.server_address[1]}"
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    try:
+        yield srv
+    finally:
+        srv.shutdown()
+        srv.server_close()
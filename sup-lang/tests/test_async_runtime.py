@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from sup.aio import AsyncRuntime
+from sup.cli import run_source
+from sup.errors import SupRuntimeError
+
+
+def _slow(delay, body):
+    def handler(req):
+        time.sleep(delay)
+        req._send(200, body)
+
+    return handler
+
+
+def test_await_all_fans_out_concurrently(http_server, monkeypatch):
+    monkeypatch.setenv("SUP_CAPS", "net")
+    http_server.routes["/slow"] = _slow(0.2, "done")
+    code = f"""
+sup
+  make list
+  set tasks to list
+  repeat 20 times
+    set t to async http get of "{http_server.base}/slow"
+    push t to tasks
+  end repeat
+  set results to await all of tasks
+  print length of results
+  print get 19 from results
+bye
+""".strip()
+    t0 = time.perf_counter()
+    out = run_source(code)
+    assert out.splitlines() == ["20", "done"]
+    # Serially this would take 4s
+    assert time.perf_counter() - t0 < 2.0
+
+
+def test_await_first_and_timeouts(http_server, monkeypatch):
+    monkeypatch.setenv("SUP_CAPS", "net,process")
+    http_server.routes["/slow"] = _slow(0.5, "slow")
+    code = f"""
+sup
+  set a to async http get of "{http_server.base}/slow"
+  set b to async run command of "echo quick"
+  set first to await first of make list of a, b
+  set out to get "out" from first
+  print trim of out
+bye
+""".strip()
+    assert run_source(code).splitlines() == ["quick"]
+
+    monkeypatch.setenv("SUP_ASYNC_TIMEOUT_MS", "100")
+    code_timeout = f"""
+sup
+  set a to async http get of "{http_server.base}/slow"
+  print await a
+bye
+""".strip()
+    with pytest.raises(SupRuntimeError) as ei:
+        run_source(code_timeout)
+    assert "timed out" in str(ei.value)
+
+
+def test_async_builtins_respect_capabilities(http_server, monkeypatch):
+    monkeypatch.delenv("SUP_CAPS", raising=False)
+    monkeypatch.delenv("SUP_UNSAFE", raising=False)
+    code = f"""
+sup
+  set a to async http get of "{http_server.base}/hello"
+bye
+""".strip()
+    with pytest.raises(SupRuntimeError):
+        run_source(code)
+    assert http_server.hits == {}
+
+
+def test_timed_out_blocking_work_keeps_its_slot_until_it_returns():
+    rt = AsyncRuntime(concurrency=1)
+    release = threading.Event()
+    started = []
+    try:
+        slow = rt.run_blocking(release.wait, timeout=0.05)
+        with pytest.raises(SupRuntimeError):
+            slow.result(5)
+
+        async def record():
+            started.append(1)
+
+        nxt = rt.submit(record, timeout=5)
+        time.sleep(0.1)
+        assert started == []
+        release.set()
+        nxt.result(5)
+        assert started == [1]
+    finally:
+        release.set()
+        rt.shutdown()
+
+
+def test_shutdown_finishes_tasks_nobody_awaited():
+    rt = AsyncRuntime()
+    done = []
+
+    async def later():
+        await asyncio.sleep(0.1)
+        done.append(1)
+
+    rt.submit(later)
+    rt.shutdown()
+    assert done == [1]
+    assert rt._loop.is_closed()
+
+
+def test_async_write_counts_against_the_fd_limit(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUP_CAPS", "fs_write")
+    monkeypatch.setenv("SUP_LIMIT_FD", "0")
+    target = tmp_path / "out.txt"
+    code = f"""
+sup
+  set t to async write file of "{target}" and "x"
+bye
+""".strip()
+    with pytest.raises(SupRuntimeError) as ei:
+        run_source(code)
+    assert "file descriptors" in str(ei.value)
+    assert not target.exists()
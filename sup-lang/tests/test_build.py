@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import sys
+import zipfile
+
+import pytest
+from sup.build import MANIFEST_FILE, build_project, bundle
+
+LIB = "sup\n  define function called f with x\n    return add x and {n}\n  end function\nbye\n"
+
+
+def write_project(tmp_path, n=1):
+    src = tmp_path / "src"
+    src.mkdir(exist_ok=True)
+    (src / "lib.sup").write_text(LIB.format(n=n), encoding="utf-8")
+    (src / "util.sup").write_text("sup\n  set base to 10\nbye\n", encoding="utf-8")
+    (src / "main.sup").write_text(
+        "sup\n  import lib\n  import util\n  print call lib.f with util.base\nbye\n",
+        encoding="utf-8",
+    )
+    return src
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_output(out):
+    # Generated modules import the sup runtime
+    env = dict(os.environ, PYTHONPATH=REPO)
+    res = subprocess.run(
+        [sys.executable, "run.py"], cwd=out, env=env, capture_output=True, text=True, check=True
+    )
+    return res.stdout
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_rebuild_touches_only_changed_modules(tmp_path, monkeypatch, jobs):
+    src = write_project(tmp_path)
+    monkeypatch.setenv("SUP_PATH", str(src))
+    out = tmp_path / "out"
+    stats = build_project(str(src / "main.sup"), str(out), jobs=jobs)
+    assert stats.rebuilt == ["lib", "main", "util"]
+    assert run_output(out) == "11.0\n"
+
+    stats = build_project(str(src / "main.sup"), str(out), jobs=jobs)
+    assert (stats.rebuilt, stats.unchanged) == ([], ["lib", "main", "util"])
+
+    write_project(tmp_path, n=5)
+    stats = build_project(str(src / "main.sup"), str(out), jobs=jobs)
+    assert stats.rebuilt == ["lib"]
+    assert run_output(out) == "15.0\n"
+
+
+def test_unreachable_module_outputs_are_removed(tmp_path, monkeypatch):
+    src = write_project(tmp_path)
+    monkeypatch.setenv("SUP_PATH", str(src))
+    out = tmp_path / "out"
+    build_project(str(src / "main.sup"), str(out), jobs=1)
+    (src / "main.sup").write_text(
+        "sup\n  import lib\n  print call lib.f with 1\nbye\n", encoding="utf-8"
+    )
+    stats = build_project(str(src / "main.sup"), str(out), jobs=1)
+    assert (stats.rebuilt, stats.removed) == (["main"], ["util"])
+    assert not (out / "util.py").exists()
+    assert run_output(out) == "2.0\n"
+
+
+def test_bundle_runs_without_sources(tmp_path, monkeypatch):
+    src = write_project(tmp_path)
+    monkeypatch.setenv("SUP_PATH", str(src))
+    monkeypatch.setenv("SUP_PY_CACHE", "0")
+    out = tmp_path / "out"
+    build_project(str(src / "main.sup"), str(out), jobs=1)
+    app = tmp_path / "app.pyz"
+    manifest = bundle(str(out), str(app))
+    assert manifest["entry"] == "main"
+    assert sorted(manifest["modules"]) == ["lib", "main", "util"]
+    with zipfile.ZipFile(app) as zf:
+        names = zf.namelist()
+        assert json.loads(zf.read(MANIFEST_FILE)) == manifest
+    assert "sup/sup_rt.pyc" in names
+    assert not [n for n in names if n.endswith(".py")]
+
+    env = {k: v for k, v in os.environ.items() if k not in {"PYTHONPATH", "SUP_PATH"}}
+    res = subprocess.run(
+        [sys.executable, str(app)], cwd=tmp_path, env=env, capture_output=True, text=True
+    )
+    assert res.stdout == "11.0\n", res.stderr
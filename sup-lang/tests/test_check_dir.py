@@ -0,0 +1,61 @@
+import json
+
+from sup import checker, tooling
+from sup.cli import main
+
+
+def make_tree(tmp_path, monkeypatch):
+    root = tmp_path / "proj"
+    (root / "sub").mkdir(parents=True)
+    (root / "ok.sup").write_text("sup\n  print 1\nbye\n", encoding="utf-8")
+    (root / "sub" / "bad.sup").write_text("sup\n  set x to\nbye\n", encoding="utf-8")
+    (root / "notes.txt").write_text("ignored", encoding="utf-8")
+    monkeypatch.setenv("SUP_CHECK_CACHE", str(tmp_path / "cache"))
+    return root
+
+
+def test_check_directory_json(tmp_path, monkeypatch, capsys):
+    root = make_tree(tmp_path, monkeypatch)
+    assert main(["check", str(root), "-j", "2", "--format", "json"]) == 1
+    report = json.loads(capsys.readouterr().out)
+    assert report["files"] == 2
+    [diag] = report["diagnostics"]
+    assert (diag["path"], diag["line"], diag["code"]) == (str(root / "sub" / "bad.sup"), 2, "SYNTAX")
+
+
+def test_cache_reuses_results_by_content(tmp_path, monkeypatch):
+    root = make_tree(tmp_path, monkeypatch)
+    files = tooling.discover([str(root)])
+
+    def run():
+        cache = checker.CheckCache(checker.default_cache_path([str(root)]))
+        diags = checker.check_files(files, cache=cache)
+        return [d.code for d in diags], (cache.hits, cache.misses)
+
+    assert run() == (["SYNTAX"], (0, 2))
+    assert run() == (["SYNTAX"], (2, 0))
+    (root / "sub" / "bad.sup").write_text("sup\n  set x to 1\nbye\n", encoding="utf-8")
+    assert run() == ([], (1, 1))
+
+
+def test_check_follows_imports_and_recaches_when_they_change(tmp_path, monkeypatch):
+    libs = tmp_path / "libs"
+    libs.mkdir()
+    lib = libs / "lib.sup"
+    lib.write_text("sup\n  make list of 1, 2\n  set items to list\nbye\n", encoding="utf-8")
+    main_file = tmp_path / "main.sup"
+    main_file.write_text(
+        "sup\n  from lib import items\n  print add items and 1\nbye\n", encoding="utf-8"
+    )
+    monkeypatch.setenv("SUP_PATH", str(libs))
+    monkeypatch.setenv("SUP_CHECK_CACHE", str(tmp_path / "cache"))
+
+    def run():
+        cache = checker.CheckCache(checker.default_cache_path([str(main_file)]))
+        diags = checker.check_files([str(main_file)], cache=cache)
+        return [(d.line, d.code) for d in diags], (cache.hits, cache.misses)
+
+    assert run() == ([(3, "TYPE")], (0, 1))
+    assert run() == ([(3, "TYPE")], (1, 0))
+    lib.write_text("sup\n  set items to 3\nbye\n", encoding="utf-8")
+    assert run() == ([], (0, 1))
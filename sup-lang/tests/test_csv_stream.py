@@ -0,0 +1,66 @@
+import os
+import tempfile
+
+from sup.cli import run_source
+
+
+def test_csv_stream_header_projection_and_types():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.csv").replace("\\", "/")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write("id,name,score\n1,ann,2.5\n2,bob,4\n")
+        code = f"""
+sup
+  make map
+  set "header" to 1 in map
+  set "types" to 1 in map
+  set "columns" to make list of "name", "score" in map
+  set opts to map
+  set total to 0
+  for each row in csv stream of "{path}" and opts
+    print row
+    set s to get "score" from row
+    set total to add total and s
+  end for
+  print total
+  print length of csv stream of "{path}" and opts
+  print length of csv stream of "{path}"
+  for each row in csv stream of "{path}"
+    print row
+  end for
+bye
+""".strip()
+        out = run_source(code)
+        assert out.splitlines() == [
+            "{'name': 'ann', 'score': 2.5}",
+            "{'name': 'bob', 'score': 4}",
+            "6.5",
+            "2",
+            "3",
+            "['id', 'name', 'score']",
+            "['1', 'ann', '2.5']",
+            "['2', 'bob', '4']",
+        ]
+
+
+def test_csv_writer_appends_rows_incrementally(monkeypatch):
+    monkeypatch.setenv("SUP_CAPS", "fs_write")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.csv").replace("\\", "/")
+        code = f"""
+sup
+  set w to csv writer of "{path}" and make list of "n", "sq"
+  make list of 1, 2, 3
+  for each n in list
+    write row of w and make list of n, n
+  end for
+  make map
+  set "sq" to 16 in map
+  set "n" to 4 in map
+  write row of w and map
+  close writer of w
+bye
+""".strip()
+        run_source(code)
+        with open(path, encoding="utf-8") as f:
+            assert f.read().splitlines() == ["n,sq", "1,1", "2,2", "3,3", "4,16"]
@@ -0,0 +1,132 @@
+import os
+import tempfile
+
+import pytest
+from sup.cli import run_source
+from sup.errors import SupRuntimeError
+from sup.httpcache import HttpCache
+from sup.httpclient import ConnectionPool
+
+
+def _route(body, **headers):
+    def handler(req):
+        inm = req.headers.get("If-None-Match")
+        if inm and inm == headers.get("ETag"):
+            req.server.not_modified = getattr(req.server, "not_modified", 0) + 1
+            req.send_response(304)
+            req.send_header("Content-Length", "0")
+            for k, v in headers.items():
+                req.send_header(k, v)
+            req.end_headers()
+            return
+        req._send(200, body, extra=headers)
+
+    return handler
+
+
+def test_fresh_response_served_from_disk_across_runs(http_server, monkeypatch):
+    http_server.routes["/fresh"] = _route("v1", **{"Cache-Control": "max-age=60"})
+    with tempfile.TemporaryDirectory() as tmp:
+        monkeypatch.setenv("SUP_CAPS", "net")
+        monkeypatch.setenv("SUP_HTTP_CACHE", tmp)
+        code = f"""
+sup
+  print http get of "{http_server.base}/fresh"
+bye
+""".strip()
+        assert run_source(code) == "v1\n"
+        assert run_source(code) == "v1\n"
+        assert http_server.hits["/fresh"] == 1
+        # The capability model still applies to cache hits
+        monkeypatch.delenv("SUP_CAPS")
+        with pytest.raises(SupRuntimeError):
+            run_source(code)
+
+
+def test_stale_entry_revalidates_with_etag(http_server, monkeypatch):
+    http_server.routes["/etag"] = _route(
+        "payload", **{"Cache-Control": "no-cache", "ETag": '"abc"'}
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        monkeypatch.setenv("SUP_CAPS", "net")
+        monkeypatch.setenv("SUP_HTTP_CACHE", tmp)
+        code = f"""
+sup
+  print http get of "{http_server.base}/etag"
+  print http get of "{http_server.base}/etag"
+bye
+""".strip()
+        assert run_source(code).splitlines() == ["payload", "payload"]
+        assert http_server.hits["/etag"] == 2
+        assert http_server.not_modified == 1
+
+
+def test_cache_is_size_bounded_lru(http_server):
+    for i in range(4):
+        http_server.routes[f"/r{i}"] = _route("x" * 400, **{"Cache-Control": "max-age=60"})
+    pool = ConnectionPool()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HttpCache(tmp, max_bytes=2000)
+
+        def get(path):
+            url = http_server.base + path
+            return cache.request(lambda h: pool.request("GET", url, headers=h), url, {})
+
+        for i in range(4):
+            get(f"/r{i}")
+        total = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+        assert total <= 2000
+        # The most recent entry survives and is served without network I/O
+        assert get("/r3").from_cache
+        assert not get("/r0").from_cache
+    pool.close()
+
+
+def test_truncated_bodies_are_not_stored_and_304_keeps_entity_headers(http_server):
+    http_server.routes["/big"] = _route("x" * 50, **{"Cache-Control": "max-age=60"})
+    http_server.routes["/etag"] = _route("payload", **{"ETag": '"abc"'})
+    pool = ConnectionPool()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HttpCache(tmp)
+
+        def get(path, max_bytes=1000):
+            url = http_server.base + path
+            return cache.request(
+                lambda h: pool.request("GET", url, headers=h, max_bytes=max_bytes), url, {}
+            )
+
+        assert get("/big", max_bytes=10).truncated
+        assert get("/big").body == b"x" * 50
+        assert http_server.hits["/big"] == 2
+        get("/etag")
+        resp = get("/etag")
+        assert resp.from_cache and resp.body == b"payload"
+        assert resp.headers["content-length"] == "7"
+
+
+def test_entries_are_single_files_counted_incrementally(http_server, monkeypatch):
+    fresh = {"Cache-Control": "max-age=60"}
+    for i in range(3):
+        http_server.routes[f"/s{i}"] = _route("x" * 10, **fresh)
+    http_server.routes["/vary"] = _route("v", **fresh, Vary="*")
+    pool = ConnectionPool()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HttpCache(tmp)
+        scans = []
+        entries = cache._entries
+        monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+
+        def get(path):
+            url = http_server.base + path
+            return cache.request(lambda h: pool.request("GET", url, headers=h), url, {})
+
+        for i in range(3):
+            get(f"/s{i}")
+        # Only the first store counts the directory
+        assert len(scans) == 1
+        assert sorted(f.rsplit(".", 1)[1] for f in os.listdir(tmp)) == ["entry"] * 3
+        assert get("/s1").from_cache
+        get("/vary")
+        assert not get("/vary").from_cache
+        assert http_server.hits["/vary"] == 2
+    pool.close()
@@ -0,0 +1,98 @@
+import pytest
+from sup.cli import run_source
+from sup.errors import SupRuntimeError
+from sup.httpclient import ConnectionPool
+
+
+def test_http_builtins_reuse_one_connection(http_server, monkeypatch):
+    monkeypatch.setenv("SUP_CAPS", "net")
+    base = http_server.base
+    code = f"""
+sup
+  repeat 5 times
+    set body to http get of "{base}/hello"
+  end repeat
+  print body
+  set obj to http json of "{base}/json"
+  print get "n" from obj
+  print http post of "{base}/post" and "ping"
+  print http status of "{base}/missing"
+  print http get of "{base}/redirect"
+bye
+""".strip()
+    out = run_source(code)
+    assert out.splitlines() == ["hello", "3", "echo:ping", "404.0", "hello"]
+    # Every request above shares a single keep-alive socket
+    assert len(http_server.peers) == 1
+
+
+def test_http_error_status_raises(http_server, monkeypatch):
+    monkeypatch.setenv("SUP_CAPS", "net")
+    code = f"""
+sup
+  print http get of "{http_server.base}/missing"
+bye
+""".strip()
+    with pytest.raises(SupRuntimeError) as ei:
+        run_source(code)
+    assert "404" in str(ei.value)
+
+
+def test_http_requires_net_capability(http_server, monkeypatch):
+    monkeypatch.delenv("SUP_CAPS", raising=False)
+    monkeypatch.delenv("SUP_UNSAFE", raising=False)
+    code = f"""
+sup
+  print http get of "{http_server.base}/hello"
+bye
+""".strip()
+    with pytest.raises(SupRuntimeError):
+        run_source(code)
+    assert http_server.hits == {}
+
+
+def test_redirects_drop_credentials_across_origins(http_server):
+    seen = {}
+
+    def record(handler):
+        seen[handler.path] = handler.headers.get("Authorization")
+        handler._send(200, "ok")
+
+    port = http_server.server_address[1]
+    http_server.routes["/same"] = lambda h: h._send(302, "", extra={"Location": "/landing"})
+    http_server.routes["/cross"] = lambda h: h._send(
+        302, "", extra={"Location": f"http://localhost:{port}/elsewhere"}
+    )
+    http_server.routes["/landing"] = record
+    http_server.routes["/elsewhere"] = record
+    pool = ConnectionPool()
+    auth = {"Authorization": "Bearer secret"}
+    assert pool.request("GET", f"{http_server.base}/same", headers=auth).body == b"ok"
+    assert pool.request("GET", f"{http_server.base}/cross", headers=auth).body == b"ok"
+    assert seen == {"/landing": "Bearer secret", "/elsewhere": None}
+
+
+def test_plain_http_goes_through_the_proxy(http_server, monkeypatch):
+    monkeypatch.setenv("http_proxy", http_server.base)
+    monkeypatch.delenv("no_proxy", raising=False)
+    monkeypatch.delenv("NO_PROXY", raising=False)
+    resp = ConnectionPool().request("GET", "http://api.example.invalid/hello")
+    assert resp.body == b"hello"
+    assert http_server.hits == {"http://api.example.invalid/hello": 1}
+
+
+def test_only_idempotent_requests_retry_on_a_dropped_socket(http_server):
+    def drop_after(handler):
+        # No "Connection: close": the client only learns on its next request
+        handler._send(200, "bye")
+        handler.close_connection = True
+
+    http_server.routes["/drop"] = drop_after
+    pool = ConnectionPool()
+    base = http_server.base
+    assert pool.request("GET", f"{base}/drop").body == b"bye"
+    assert pool.request("GET", f"{base}/hello").body == b"hello"
+    pool.request("GET", f"{base}/drop")
+    with pytest.raises(SupRuntimeError) as info:
+        pool.request("POST", f"{base}/post", body=b"ping")
+    assert "not retried" in info.value.message
@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+import pytest
+from sup.cli import run_source
+from sup.errors import SupRuntimeError
+
+
+def test_json_lines_round_trip(monkeypatch):
+    monkeypatch.setenv("SUP_CAPS", "fs_write")
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "in.jsonl").replace("\\", "/")
+        dst = os.path.join(tmp, "out.jsonl").replace("\\", "/")
+        with open(src, "w", encoding="utf-8") as f:
+            f.write('{"user": "ann", "n": 2}\n\n{"user": "bob", "n": 5}\n')
+        code = f"""
+sup
+  set w to json lines writer of "{dst}"
+  for each record in json lines of "{src}"
+    set n to get "n" from record
+    set "n" to multiply n and 10 in record
+    write row of w and record
+  end for
+  close writer of w
+  print length of json lines of "{src}"
+bye
+""".strip()
+        assert run_source(code) == "2\n"
+        with open(dst, encoding="utf-8") as f:
+            assert f.read().splitlines() == [
+                '{"user": "ann", "n": 20}',
+                '{"user": "bob", "n": 50}',
+            ]
+
+
+def test_json_lines_reports_bad_line():
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "bad.jsonl").replace("\\", "/")
+        with open(src, "w", encoding="utf-8") as f:
+            f.write('{"ok": 1}\n{"broken": \n')
+        code = f"""
+sup
+  for each record in json lines of "{src}"
+    print record
+  end for
+bye
+""".strip()
+        with pytest.raises(SupRuntimeError) as ei:
+            run_source(code)
+        assert "line 2" in str(ei.value)
+
+
+def test_length_of_a_number_is_a_sup_error():
+    with pytest.raises(SupRuntimeError) as ei:
+        run_source("sup\n  set x to 5\n  print length of x\nbye\n")
+    assert ei.value.line == 3
@@ -0,0 +1,59 @@
+import pytest
+from sup.cli import run_source
+from sup.errors import SupRuntimeError
+
+
+def write(path, src):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(src)
+
+
+@pytest.fixture
+def lazy(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUP_PATH", str(tmp_path))
+    monkeypatch.setenv("SUP_LAZY_IMPORTS", "1")
+    return tmp_path
+
+
+def test_module_runs_on_first_access_only(lazy):
+    # Running 'broken' would fail, so it must never execute
+    write(lazy / "broken.sup", "sup\n  throw \"should not run\"\nbye\n")
+    write(
+        lazy / "mathlib.sup",
+        "sup\n  set pi to 3.14\n  define function called square with x\n"
+        "    return multiply x and x\n  end function\nbye\n",
+    )
+    code = """
+sup
+  import broken
+  import mathlib
+  from mathlib import square as sq
+  print mathlib.pi
+  print call mathlib.square with 3
+  print call sq with 4
+bye
+""".strip()
+    assert run_source(code).splitlines() == ["3.14", "9.0", "16.0"]
+
+
+def test_lazy_from_import_reports_missing_symbol_on_use(lazy):
+    write(lazy / "m.sup", "sup\n  set a to 1\nbye\n")
+    code = "sup\n  from m import nope\n  print \"bound\"\n  print nope\nbye"
+    with pytest.raises(SupRuntimeError) as ei:
+        run_source(code)
+    assert "no symbol 'nope'" in str(ei.value)
+
+
+def test_lazy_cycles_are_still_detected(lazy):
+    write(lazy / "a.sup", "sup\n  import b\n  set x to b.y\nbye\n")
+    write(lazy / "b.sup", "sup\n  import a\n  set y to a.x\nbye\n")
+    with pytest.raises(SupRuntimeError) as ei:
+        run_source("sup\n  import a\n  print a.x\nbye")
+    assert "Circular import" in str(ei.value)
+
+
+def test_from_imported_names_are_exported_resolved(lazy):
+    write(lazy / "b.sup", "sup\n  set k to 7\nbye\n")
+    write(lazy / "a.sup", "sup\n  from b import k\nbye\n")
+    code = "sup\n  import a\n  from a import k as kk\n  print a.k\n  print kk\nbye"
+    assert run_source(code).splitlines() == ["7", "7"]
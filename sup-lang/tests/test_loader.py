@@ -0,0 +1,104 @@
+import os
+
+import pytest
+from sup import ast as AST
+from sup import loader
+from sup.cli import run_source
+from sup.interpreter import Interpreter
+from sup.optimizer import optimize
+from sup.parser import Parser
+
+
+def write(path, src):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(src)
+
+
+def test_deep_import_chain_uses_child_contexts(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUP_PATH", str(tmp_path))
+    write(tmp_path / "m0.sup", "sup\n  set v to 1\nbye\n")
+    for i in range(1, 20):
+        write(
+            tmp_path / f"m{i}.sup",
+            f"sup\n  import m{i - 1}\n  set v to add m{i - 1}.v and 1\nbye\n",
+        )
+    inits = []
+    orig = Interpreter.__init__
+
+    def counting_init(self):
+        inits.append(1)
+        orig(self)
+
+    monkeypatch.setattr(Interpreter, "__init__", counting_init)
+    out = run_source("sup\n  import m19\n  print m19.v\nbye")
+    assert out.strip() == "20"
+    # Only the top-level interpreter runs the full constructor
+    assert len(inits) == 1
+
+
+def test_compiled_module_cache_tracks_mtime_and_size(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUP_PATH", str(tmp_path))
+    monkeypatch.setenv("SUP_PREFETCH", "0")
+    loader.clear_caches()
+    mod = tmp_path / "cfg.sup"
+    write(mod, "sup\n  set name to \"a\"\nbye\n")
+    code = "sup\n  import cfg\n  print cfg.name\nbye"
+    assert run_source(code).strip() == "a"
+    assert run_source(code).strip() == "a"
+    assert loader.stats.compile_misses == 1
+    assert loader.stats.compile_hits == 1
+
+    write(mod, "sup\n  set name to \"bb\"\nbye\n")
+    st = os.stat(mod)
+    os.utime(mod, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert run_source(code).strip() == "bb"
+    assert loader.stats.compile_misses == 2
+
+
+def test_resolution_cache_drops_deleted_paths(tmp_path, monkeypatch):
+    first = tmp_path / "a"
+    second = tmp_path / "b"
+    first.mkdir()
+    second.mkdir()
+    monkeypatch.setenv("SUP_PATH", os.pathsep.join([str(first), str(second)]))
+    write(first / "dup.sup", "sup\n  set where to \"first\"\nbye\n")
+    write(second / "dup.sup", "sup\n  set where to \"second\"\nbye\n")
+    code = "sup\n  import dup\n  print dup.where\nbye"
+    assert run_source(code).strip() == "first"
+    os.remove(first / "dup.sup")
+    assert run_source(code).strip() == "second"
+    # A module created later in an earlier search path shadows the cached one
+    write(first / "dup.sup", "sup\n  set where to \"first again\"\nbye\n")
+    assert run_source(code).strip() == "first again"
+
+
+def test_optimizer_copies_shared_module_parses(tmp_path):
+    loader.clear_caches()
+    mod = tmp_path / "consts.sup"
+    write(mod, "sup\n  set x to add 2 and 3\nbye\n")
+    shared = loader.load(str(mod))
+    optimized = optimize(shared)
+    assert optimized is not shared
+    assert isinstance(optimized.statements[0].expr, AST.Number)
+    assert isinstance(loader.load(str(mod)).statements[0].expr, AST.Binary)
+
+
+@pytest.mark.parametrize("mode", ["threads", "processes"])
+def test_prefetch_parses_reachable_modules_before_execution(tmp_path, monkeypatch, mode):
+    monkeypatch.setenv("SUP_PATH", str(tmp_path))
+    monkeypatch.setenv("SUP_PREFETCH", mode)
+    loader.clear_caches()
+    write(tmp_path / "leaf.sup", "sup\n  set v to 2\nbye\n")
+    write(
+        tmp_path / "mid.sup",
+        "sup\n  define function called f\n    import leaf\n    return leaf.v\n"
+        "  end function\nbye\n",
+    )
+    write(tmp_path / "other.sup", "sup\n  import leaf\nbye\n")
+    program = Parser().parse("sup\n  import mid\n  import other\n  import missing\nbye")
+    assert loader.prefetch(program, processes=mode == "processes") == 3
+    assert loader.stats.compile_misses == 3
+    # Everything reachable is cached, so executing parses nothing new
+    code = "sup\n  import mid\n  import other\n  print call mid.f\nbye"
+    assert run_source(code).strip() == "2.0"
+    assert loader.stats.compile_misses == 3
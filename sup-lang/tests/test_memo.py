@@ -0,0 +1,138 @@
+from sup import ast as AST
+from sup import memo
+from sup.funccache import FunctionCache
+from sup.interpreter import Interpreter
+from sup.parser import Parser
+
+FIB = """
+sup
+  define function called fib with n
+    if n is less than 2 then
+      return n
+    end if
+    set a to call fib with subtract 1 from n
+    set b to call fib with subtract 2 from n
+    return add a and b
+  end function
+  print call fib with 30
+bye
+"""
+
+
+def functions(source):
+    program = Parser().parse(source)
+    memo.annotate(program)
+    return {n.name: n.memo for n in AST.walk(program) if isinstance(n, AST.FunctionDef)}
+
+
+def test_pure_functions_are_cached():
+    memo.stats.__init__()
+    assert Interpreter().run(Parser().parse(FIB)) == "832040.0\n"
+    # One miss per distinct argument; every other call is a hit
+    assert memo.stats.misses == 31
+    assert memo.stats.hits == 28
+
+
+def test_purity_analysis():
+    marks = functions(
+        "sup\n"
+        "  define function called double with x\n    return multiply x and 2\n  end function\n"
+        "  define function called quad with x\n    return call double with call double with x\n"
+        "  end function\n"
+        "  define function called loud with x\n    print x\n    return x\n  end function\n"
+        "  define function called scaled with x\n    return multiply x and k\n  end function\n"
+        "  define function called relay with x\n    return call loud with x\n  end function\n"
+        "  define function called clock\n    return now\n  end function\n"
+        "  define uncached function called half with x\n    return divide x by 2\n"
+        "  end function\n"
+        "  define cached function called lookup with x\n    return get x from table\n"
+        "  end function\n"
+        "bye\n"
+    )
+    assert marks == {
+        "double": True,
+        "quad": True,
+        "loud": False,
+        "scaled": False,
+        "relay": False,
+        "clock": False,
+        "half": False,
+        "lookup": True,
+    }
+    issues = memo.check(
+        Parser().parse(
+            "sup\n  define cached function called f\n    ask for x\n    return x\n"
+            "  end function\nbye\n"
+        )
+    )
+    assert [(i.line, i.code) for i in issues] == [(2, "IMPURE")]
+
+
+def test_lru_is_bounded(monkeypatch):
+    monkeypatch.setenv("SUP_MEMO_SIZE", "2")
+    memo.stats.__init__()
+    source = (
+        "sup\n  define function called inc with x\n    return add x and 1\n  end function\n"
+        "  for each v in make list of 1, 2, 3, 1, \"1\", 1.0\n    print call inc with v\n"
+        "  end for\nbye\n"
+    )
+    assert Interpreter().run(Parser().parse(source)) == "2.0\n3.0\n4.0\n2.0\n2.0\n2.0\n"
+    assert (memo.stats.hits, memo.stats.misses, memo.stats.evictions) == (0, 6, 4)
+
+
+def test_cached_functions_persist_across_runs(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUP_FUNC_CACHE", str(tmp_path))
+    source = (
+        "sup\n  define cached function called parse with s\n    print \"parsing\"\n"
+        "    return make list of s, 2\n  end function\n"
+        "  print call parse with \"a\"\n  print call parse with \"a\"\nbye\n"
+    )
+    first = Interpreter().run(Parser().parse(source))
+    assert first == "parsing\n['a', 2]\n['a', 2]\n"
+    # A new run with the same function reads both results from disk
+    assert Interpreter().run(Parser().parse(source)) == "['a', 2]\n['a', 2]\n"
+    # Changing the function's code changes its key
+    changed = source.replace("of s, 2", "of s, 3")
+    assert Interpreter().run(Parser().parse(changed)).startswith("parsing\n")
+
+
+def test_stored_results_track_module_callees(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUP_FUNC_CACHE", str(tmp_path / "cache"))
+    monkeypatch.setenv("SUP_PATH", str(tmp_path))
+    source = (
+        "sup\n  import lib\n  from lib import h\n"
+        "  define cached function called f with x\n    print \"computing\"\n"
+        "    set a to call lib.g with x\n    set b to call h with x\n"
+        "    return add a and b\n  end function\n  print call f with 1\nbye\n"
+    )
+    module = (
+        "sup\n  define function called g with x\n    return add x and {g}\n  end function\n"
+        "  define function called h with x\n    return add x and {h}\n  end function\nbye\n"
+    )
+
+    def run(g, h):
+        (tmp_path / "lib.sup").write_text(module.format(g=g, h=h), encoding="utf-8")
+        return Interpreter().run(Parser().parse(source))
+
+    assert run(10, 0) == "computing\n12.0\n"
+    assert run(10, 0) == "12.0\n"
+    # Editing either imported function changes the stored key
+    assert run(20, 0) == "computing\n22.0\n"
+    assert run(20, 5) == "computing\n27.0\n"
+    # A callee that cannot be resolved yet makes the result unstorable
+    guarded = source.replace(
+        "    return add a and b\n",
+        "    if x is greater than 100 then\n      set b to call later with x\n    end if\n"
+        "    return add a and b\n",
+    )
+    assert Interpreter().run(Parser().parse(guarded)) == "computing\n27.0\n"
+    assert Interpreter().run(Parser().parse(guarded)) == "computing\n27.0\n"
+
+
+def test_function_cache_is_size_bounded(tmp_path):
+    cache = FunctionCache(str(tmp_path), max_bytes=1000)
+    for i in range(200):
+        cache.put(f"k{i}", "x" * 40, None)
+    total = cache._db.execute("SELECT SUM(size) FROM results").fetchone()[0]
+    assert total <= 1000
+    assert cache.get("k199") is not None and cache.get("k0") is None
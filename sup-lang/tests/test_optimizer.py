@@ -0,0 +1,94 @@
+import pytest
+from sup import ast as AST
+from sup.interpreter import Interpreter
+from sup.optimizer import PASSES, optimize_ex
+from sup.parser import Parser
+
+PROGRAMS = {
+    "invariant": (
+        "sup\n  set k to 4\n  set s to 0\n  set i to 0\n"
+        "  while i is less than 10\n    set s to add s and multiply k and 3\n"
+        "    print s\n    set i to add i and 1\n  end while\nbye\n"
+    ),
+    "accumulator": (
+        "sup\n  set acc to 0\n  set k to 2\n  repeat 5 times\n    print \"tick\"\n"
+        "    set acc to add acc and k\n    set acc2 to 1\n  end repeat\n  print acc\nbye\n"
+    ),
+    "series": (
+        "sup\n  set total to 0\n  set i to 5\n  repeat 10 times\n"
+        "    set total to add total and multiply i and 2\n    set i to subtract 3 from i\n"
+        "    set last to 7\n  end repeat\n  print total\n  print i\n  print last\nbye\n"
+    ),
+    "nested": (
+        "sup\n  set a to 3\n  set s to 0\n  repeat 4 times\n    repeat 5 times\n"
+        "      set s to add s and multiply a and 2\n    end repeat\n  end repeat\n  print s\nbye\n"
+    ),
+    # Left alone: sums that leave the exact integer range, floats, coerced strings,
+    # reads from a called function, a catch
+    "near_2_53": (
+        "sup\n  set y to 9007199254740990\n  repeat 10 times\n"
+        "    set y to add y and 3\n  end repeat\n  print y\n"
+        "  set z to 9007199254740990\n  repeat 10 times\n    print \"tick\"\n"
+        "    set z to add z and 3\n  end repeat\n  print z\n"
+        "  set i to 9007199254740000\n  set t to 0\n  repeat 10 times\n"
+        "    set t to add t and i\n    set i to add i and 1\n  end repeat\n"
+        "  print t\nbye\n"
+    ),
+    "float": "sup\n  set a to 0.1\n  repeat 10 times\n    set a to add a and 0.1\n  end repeat\n  print a\nbye\n",
+    "string": "sup\n  set a to \"1\"\n  repeat 3 times\n    set a to add a and 2\n  end repeat\n  print a\nbye\n",
+    "called": (
+        "sup\n  define function called peek with z\n    print acc\n    return z\n  end function\n"
+        "  set acc to 0\n  repeat 3 times\n    set acc to add acc and 2\n    call peek with 1\n"
+        "  end repeat\nbye\n"
+    ),
+    "caught": (
+        "sup\n  set acc to 0\n  try\n    repeat 3 times\n      set acc to add acc and 2\n"
+        "      throw \"x\"\n    end repeat\n  catch e\n    print acc\n  end try\nbye\n"
+    ),
+    "undefined": "sup\n  repeat 3 times\n    set acc to add acc and 2\n  end repeat\nbye\n",
+}
+
+
+def run(program):
+    try:
+        return Interpreter().run(program)
+    except Exception as e:
+        return f"error: {e}"
+
+
+def loops(program):
+    return [n for n in AST.walk(program) if isinstance(n, (AST.Repeat, AST.While))]
+
+
+@pytest.mark.parametrize("passes", [[p] for p in PASSES] + [None])
+@pytest.mark.parametrize("name", sorted(PROGRAMS))
+def test_passes_match_interpreter(name, passes):
+    source = PROGRAMS[name]
+    program, _ = optimize_ex(Parser().parse(source), enabled_passes=passes)
+    assert run(program) == run(Parser().parse(source))
+
+
+def test_counting_loops_collapse():
+    for name in ("series", "nested"):
+        program, _ = optimize_ex(Parser().parse(PROGRAMS[name]))
+        assert loops(program) == []
+    program, _ = optimize_ex(Parser().parse(PROGRAMS["accumulator"]))
+    [loop] = loops(program)
+    assert [type(st) for st in loop.body] == [AST.Print, AST.Assignment]
+    assert loop.body[1].name == "acc2"
+
+
+def test_invariant_is_hoisted():
+    program, _ = optimize_ex(Parser().parse(PROGRAMS["invariant"]), enabled_passes=["licm"])
+    [loop] = loops(program)
+    assert not any(
+        isinstance(n, AST.Binary) and n.op == "*" for st in loop.body for n in AST.walk(st)
+    )
+
+
+def test_bare_print_disables_optimization():
+    source = "sup\n  repeat 3 times\n    set x to add 1 and 1\n  end repeat\n  print the result\nbye\n"
+    program, _ = optimize_ex(Parser().parse(source))
+    assert len(loops(program)) == 1
+    with pytest.raises(ValueError):
+        optimize_ex(Parser().parse(source), enabled_passes=["inline"])
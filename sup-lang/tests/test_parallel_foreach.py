@@ -0,0 +1,102 @@
+import pytest
+from sup.cli import run_source
+from sup.errors import SupRuntimeError
+
+FIB = """
+  define function called fib with n
+    if n is less than 2
+      return n
+    end if
+    set a to call fib with subtract 1 from n
+    set b to call fib with subtract 2 from n
+    return add a and b
+  end function
+"""
+
+
+def test_parallel_foreach_collects_in_order():
+    code = f"""
+sup
+{FIB}
+  set offset to 100
+  make list of 10, 3, 12, 1, 7
+  for each n in list in parallel with 3 workers
+    print n
+    set f to call fib with n
+    collect add f and offset into results
+  end for
+  print results
+bye
+""".strip()
+    serial = code.replace(" in parallel with 3 workers", "")
+    out = run_source(code)
+    assert out == run_source(serial)
+    assert out.splitlines()[-1] == "[155.0, 102.0, 244.0, 101.0, 113.0]"
+
+
+def test_parallel_foreach_reports_first_error_in_order():
+    code = """
+sup
+  make list of 1, 2, 3, 4
+  for each n in list in parallel with 2 workers
+    print n
+    if n is greater than 2
+      throw concat of "bad " and n
+    end if
+  end for
+bye
+""".strip()
+    with pytest.raises(Exception) as ei:
+        run_source(code)
+    assert str(ei.value) == "bad 3"
+
+
+def test_parallel_values_must_be_plain_data(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUP_CAPS", "fs_write")
+    out_path = (tmp_path / "out.jsonl").as_posix()
+    code = f"""
+sup
+  set w to json lines writer of "{out_path}"
+  make list of 1, 2
+  for each n in list in parallel with 2 workers
+    write row of w and n
+  end for
+bye
+""".strip()
+    with pytest.raises(SupRuntimeError) as ei:
+        run_source(code)
+    assert "plain data" in str(ei.value)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4])
+def test_parallel_iterations_do_not_share_mutations(workers):
+    code = f"""
+sup
+  make list of 0
+  set acc to list
+  make list of 1, 2, 3, 4, 5, 6, 7, 8
+  for each n in list in parallel with {workers} workers
+    push n to acc
+    print length of acc
+  end for
+  print length of acc
+bye
+""".strip()
+    assert run_source(code) == "2\n" * 8 + "1\n"
+
+
+def test_parallel_body_sees_globals_read_by_called_functions():
+    code = """
+sup
+  define function called scale with x
+    return multiply x and factor
+  end function
+  set factor to 3
+  set collect to 0
+  for each x in make list of 1, 2, 3 in parallel with 2 workers
+    collect call scale with x into out
+  end for
+  print out
+bye
+""".strip()
+    assert run_source(code) == "[3.0, 6.0, 9.0]\n"
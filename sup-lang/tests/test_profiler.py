@@ -0,0 +1,73 @@
+import json
+import pstats
+import sys
+
+from sup.cli import main
+from sup.interpreter import Interpreter
+from sup.parser import Parser
+from sup.profiler import ProfilingInterpreter, Sampler
+
+PROGRAM = """sup
+  define function called twice with x
+    return multiply x and 2
+  end function
+  set total to 0
+  repeat 3 times
+    set total to add total and call twice with 5
+  end repeat
+  print upper of "ok"
+  print total
+bye
+"""
+
+
+def test_counts_lines_functions_and_builtins(monkeypatch):
+    monkeypatch.setenv("SUP_MEMO", "0")
+    interp = ProfilingInterpreter("prog.sup")
+    assert interp.run(Parser().parse(PROGRAM)) == "OK\n30.0\n"
+    prof = interp._profiler
+    assert prof.lines[("prog.sup", 7)][0] == 3
+    assert prof.lines[("prog.sup", 3)][0] == 3
+    calls, _own, total = prof.functions[("prog.sup", 2, "twice")][1:]
+    assert calls == 3 and total <= prof.functions[("prog.sup", 0, "<program>")][3]
+    assert prof.functions[("~", 0, "<builtin upper>")][1] == 1
+
+
+def test_profile_exports(tmp_path, capsys):
+    src = tmp_path / "prog.sup"
+    src.write_text(PROGRAM, encoding="utf-8")
+    assert main([str(src), "--profile-out", str(tmp_path / "out.prof")]) == 0
+    out = capsys.readouterr()
+    assert out.out == "OK\n30.0\n"
+    assert "twice" in out.err and "upper" in out.err
+    stats = pstats.Stats(str(tmp_path / "out.prof")).stats
+    assert any(name == "twice" for _file, _line, name in stats)
+    assert main([str(src), "--profile-out", str(tmp_path / "out.json")]) == 0
+    data = json.loads((tmp_path / "out.json").read_text(encoding="utf-8"))
+    assert [f["name"] for f in data["builtins"]] == ["upper"]
+    assert {"hits", "inclusive_ms", "exclusive_ms"} <= set(data["lines"][0])
+
+
+def test_sampler_reads_sup_stacks():
+    sampler = Sampler("prog.sup")
+
+    class Probe(Interpreter):
+        # Take a sample whenever a builtin runs instead of on a timer
+        def _eval_builtin(self, node):
+            sampler.record(sys._getframe())
+            return super()._eval_builtin(node)
+
+    assert Probe().run(Parser().parse(PROGRAM)) == "OK\n30.0\n"
+    assert sampler.samples == {(("<program>", "prog.sup", 9),): 1}
+    source = (
+        "sup\n  define function called shout with s\n    return upper of s\n  end function\n"
+        "  print call shout with \"hi\"\nbye\n"
+    )
+    Probe().run(Parser().parse(source))
+    stack = (("<program>", "prog.sup", 5), ("shout", "prog.sup", 3))
+    assert sampler.samples[stack] == 1
+    assert "<program> (prog.sup:5);shout (prog.sup:3) 1\n" in sampler.collapsed()
+    profile = sampler.speedscope()
+    names = [f["name"] for f in profile["shared"]["frames"]]
+    assert names == ["<program>:5", "shout:3", "<program>:9"]
+    assert profile["profiles"][0]["samples"] == [[0, 1], [2]]
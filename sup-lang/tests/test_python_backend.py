@@ -0,0 +1,104 @@
+import pytest
+from sup import pybackend
+from sup.cli import run_source
+from sup.errors import SupRuntimeError
+
+PROGRAM = """
+sup
+  define function called twice with x
+    return multiply x and 2
+  end function
+  set total to 0
+  for each n in make list of 1, 2, 3
+    set total to add total and call twice with n
+  end for
+  print total
+bye
+"""
+
+
+@pytest.fixture(autouse=True)
+def code_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUP_PY_CACHE", str(tmp_path / "cache"))
+    pybackend.stats.__init__()
+
+
+def test_python_backend_matches_interpreter():
+    assert run_source(PROGRAM, backend="python") == run_source(PROGRAM)
+
+
+def test_code_objects_are_cached_by_source():
+    pybackend.compile_source(PROGRAM, "prog.sup")
+    pybackend.compile_source(PROGRAM, "prog.sup")
+    assert (pybackend.stats.hits, pybackend.stats.misses) == (1, 1)
+    pybackend.compile_source(PROGRAM.replace("2", "3"), "prog.sup")
+    assert pybackend.stats.misses == 2
+
+
+def test_errors_report_sup_lines():
+    code = "sup\n  set xs to make list of 1\n  pop from xs\n  print 1\n  pop from xs\nbye\n"
+    with pytest.raises(SupRuntimeError) as info:
+        run_source(code, backend="python")
+    assert info.value.line == 5
+    with pytest.raises(SupRuntimeError) as info:
+        run_source("sup\n  print 1\n  throw \"boom\"\nbye\n", backend="python")
+    assert (info.value.message, info.value.line) == ("boom", 3)
+
+
+def test_imports_run_as_compiled_modules(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUP_PATH", str(tmp_path))
+    (tmp_path / "mathlib.sup").write_text(
+        "sup\n  set pi to 3.14\n  define function called square with x\n"
+        "    return multiply x and x\n  end function\nbye\n",
+        encoding="utf-8",
+    )
+    code = "sup\n  import mathlib\n  print mathlib.pi\n  print call mathlib.square with 2\nbye\n"
+    assert run_source(code, backend="python") == run_source(code)
+
+
+def test_typed_arithmetic_past_2_53_matches_interpreter():
+    code = """
+sup
+  set x to 1
+  repeat 40 times
+    set x to multiply x and 7
+  end repeat
+  print multiply 3 and x
+  set y to 9007199254740990
+  repeat 10 times
+    set y to add y and 3
+  end repeat
+  print y
+bye
+""".strip()
+    assert run_source(code, backend="python") == run_source(code)
+
+
+def test_sup_imports_never_resolve_to_python_modules(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUP_PATH", str(tmp_path))
+    (tmp_path / "json.sup").write_text("sup\n  set level to 42\nbye\n", encoding="utf-8")
+    code = "sup\n  import json\n  print json.level\nbye\n"
+    assert run_source(code, backend="python") == run_source(code) == "42\n"
+    with pytest.raises(SupRuntimeError) as info:
+        run_source("sup\n  print 1\n  import os\nbye\n", backend="python")
+    assert (info.value.message, info.value.line) == ("Cannot find module 'os'.", 3)
+
+
+def test_typed_comparisons_past_2_53_match_interpreter():
+    code = """
+sup
+  set big to 9007199254740992
+  set bigger to 9007199254740993
+  if bigger is greater than big
+    print "greater"
+  else
+    print "same"
+  end if
+  set i to 0
+  while i is less than 3
+    set i to add i and 1
+  end while
+  print i
+bye
+""".strip()
+    assert run_source(code, backend="python") == run_source(code)
@@ -0,0 +1,89 @@
+import os
+import shutil
+import time
+
+import pytest
+from sup.cli import run_source
+from sup.errors import SupRuntimeError
+from sup.procs import run_command
+
+
+def test_run_commands_is_parallel_and_ordered(monkeypatch):
+    monkeypatch.setenv("SUP_CAPS", "process")
+    code = """
+sup
+  make list of "sleep 0.3; echo a", "echo b", "sleep 0.3; echo c", "sleep 0.3; echo d"
+  set cmds to list
+  make map
+  set "parallel" to 4 in map
+  set results to run commands of cmds and map
+  for each r in results
+    print get "out" from r
+  end for
+bye
+""".strip()
+    t0 = time.perf_counter()
+    out = run_source(code)
+    assert time.perf_counter() - t0 < 0.8
+    assert out.split() == ["a", "b", "c", "d"]
+
+
+def test_run_commands_timeout_and_stream(monkeypatch):
+    monkeypatch.setenv("SUP_CAPS", "process")
+    code = """
+sup
+  make list of "echo first", "sleep 5", "echo third 1>&2; exit 3"
+  set cmds to list
+  make map
+  set "timeout" to 0.3 in map
+  set "stream" to 1 in map
+  set results to run commands of cmds and map
+  set slow to get 1 from results
+  print get "timed_out" from slow
+  set last to get 2 from results
+  print get "code" from last
+bye
+""".strip()
+    t0 = time.perf_counter()
+    out = run_source(code)
+    assert time.perf_counter() - t0 < 3
+    assert out.splitlines() == ["first", "third", "True", "3"]
+
+
+def test_run_commands_requires_process_capability(monkeypatch):
+    monkeypatch.delenv("SUP_CAPS", raising=False)
+    monkeypatch.delenv("SUP_UNSAFE", raising=False)
+    code = """
+sup
+  make list of "echo hi"
+  set results to run commands of list
+bye
+""".strip()
+    with pytest.raises(SupRuntimeError):
+        run_source(code)
+
+
+def test_streamed_output_matches_on_python_backend(monkeypatch):
+    monkeypatch.setenv("SUP_CAPS", "process")
+    code = """
+sup
+  make list of "echo hi", "echo there"
+  set cmds to list
+  make map
+  set "stream" to 1 in map
+  set results to run commands of cmds and map
+  print "done"
+bye
+""".strip()
+    assert run_source(code) == "hi\nthere\ndone\n"
+    assert run_source(code, backend="python") == run_source(code)
+
+
+@pytest.mark.skipif(os.name != "posix" or not shutil.which("setsid"), reason="needs setsid")
+def test_timeout_returns_while_an_escaped_grandchild_holds_the_pipes():
+    # The setsid'd sleep leaves the process group, so the kill misses it
+    t0 = time.perf_counter()
+    res = run_command("echo before; setsid sleep 3 & sleep 3", timeout=0.3)
+    assert time.perf_counter() - t0 < 2.5
+    assert res["timed_out"] is True
+    assert res["out"] == "before\n"
@@ -0,0 +1,74 @@
+import os
+import sqlite3
+import tempfile
+
+import pytest
+from sup.cli import run_source
+from sup.errors import SupRuntimeError
+
+
+def make_db(tmp, n):
+    path = os.path.join(tmp, "data.db")
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE t (id INTEGER, name TEXT)")
+    con.executemany("INSERT INTO t VALUES (?, ?)", [(i, f"n{i}") for i in range(n)])
+    con.commit()
+    con.close()
+    return path.replace("\\", "/")
+
+
+def test_for_each_streams_sqlite_rows(monkeypatch):
+    monkeypatch.setenv("SUP_CAPS", "sql")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_db(tmp, 1200)
+        code = f"""
+sup
+  set total to 0
+  for each row in sqlite stream of "{db}" and "SELECT id, name FROM t ORDER BY id"
+    set id to get 0 from row
+    set total to add total and id
+  end for
+  print total
+  set rows to sqlite stream of "{db}" and "SELECT id FROM t WHERE id < ?" and make list of 10
+  print length of rows
+bye
+""".strip()
+        out = run_source(code)
+        assert out.splitlines() == [str(sum(range(1200))), "10"]
+
+
+def test_stream_cursor_released_when_loop_throws(monkeypatch):
+    monkeypatch.setenv("SUP_CAPS", "sql")
+    monkeypatch.setenv("SUP_LIMIT_FD", "1")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_db(tmp, 5)
+        code = f"""
+sup
+  set s to sqlite stream of "{db}" and "SELECT id FROM t"
+  try
+    for each row in s
+      throw "stop"
+    end for
+  catch e
+    print e
+  end try
+  for each row in s
+    print get 0 from row
+  end for
+bye
+""".strip()
+        # A leaked cursor would trip the single-descriptor limit on the second loop
+        out = run_source(code)
+        assert out.splitlines() == ["stop", "0", "1", "2", "3", "4"]
+
+
+def test_sqlite_stream_requires_capability(monkeypatch):
+    monkeypatch.delenv("SUP_CAPS", raising=False)
+    monkeypatch.delenv("SUP_UNSAFE", raising=False)
+    code = """
+sup
+  set s to sqlite stream of "x.db" and "SELECT 1"
+bye
+""".strip()
+    with pytest.raises(SupRuntimeError):
+        run_source(code)
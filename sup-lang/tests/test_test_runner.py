@@ -0,0 +1,102 @@
+import json
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+from sup import testrunner, tooling
+from sup.cli import main
+
+PASSING = "sup\n  print 1\nbye\n"
+FAILING = 'sup\n  print "before"\n  throw "bad"\nbye\n'
+USES_LIB = "sup\n  import lib\n  print call lib.f with 1\nbye\n"
+LIB = "sup\n  define function called f with x\n    return add x and {n}\n  end function\nbye\n"
+
+
+def make_suite(tmp_path, monkeypatch):
+    suite = tmp_path / "suite"
+    suite.mkdir()
+    (suite / "a_pass.sup").write_text(PASSING, encoding="utf-8")
+    (suite / "b_fail.sup").write_text(FAILING, encoding="utf-8")
+    (suite / "c_uses_lib.sup").write_text(USES_LIB, encoding="utf-8")
+    libs = tmp_path / "libs"
+    libs.mkdir()
+    (libs / "lib.sup").write_text(LIB.format(n=1), encoding="utf-8")
+    monkeypatch.setenv("SUP_PATH", str(libs))
+    monkeypatch.setenv("SUP_TEST_CACHE", str(tmp_path / "cache"))
+    return suite, libs
+
+
+def test_parallel_results_keep_order(tmp_path, monkeypatch):
+    suite, _ = make_suite(tmp_path, monkeypatch)
+    paths = tooling.discover([str(suite)])
+    results = testrunner.run_tests(paths, jobs=2)
+    assert [r.path for r in results] == paths
+    assert [r.passed for r in results] == [True, False, True]
+    assert (results[1].message, results[1].output) == ("bad", "before\n")
+    assert results[2].output == "2.0\n"
+
+
+def test_cache_skips_unchanged_tests_and_dependencies(tmp_path, monkeypatch):
+    suite, libs = make_suite(tmp_path, monkeypatch)
+    paths = tooling.discover([str(suite)])
+
+    def run():
+        cache = testrunner.ResultCache(testrunner.default_cache_path(str(suite)))
+        return [r.cached for r in testrunner.run_tests(paths, cache=cache)]
+
+    assert run() == [False, False, False]
+    # Failures always run again
+    assert run() == [True, False, True]
+    (libs / "lib.sup").write_text(LIB.format(n=2), encoding="utf-8")
+    assert run() == [True, False, False]
+    # Editing the lexicon in place invalidates every cached result
+    lexicon = tmp_path / "lexicon.json"
+    lexicon.write_bytes((Path(tooling.__file__).parent / "lexicon" / "english.json").read_bytes())
+    monkeypatch.setenv("SUP_LEXICON", str(lexicon))
+    assert run() == [False, False, False]
+    lexicon.write_text(lexicon.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    assert run() == [False, False, False]
+    assert run() == [True, False, True]
+
+
+def test_cli_writes_reports(tmp_path, monkeypatch, capsys):
+    suite, _ = make_suite(tmp_path, monkeypatch)
+    report_json = tmp_path / "r.json"
+    report_xml = tmp_path / "r.xml"
+    rc = main(
+        ["test", str(suite), "-j", "1", "--no-cache", "--json", str(report_json), "--junit", str(report_xml)]
+    )
+    assert rc == 1
+    out = capsys.readouterr().out
+    assert "2 passed, 1 failed, 0 cached" in out
+    assert "slowest 3:" in out
+    data = json.loads(report_json.read_text(encoding="utf-8"))
+    assert data["summary"]["failed"] == 1
+    assert all(t["ms"] >= 0 for t in data["tests"])
+    suite_el = ET.parse(report_xml).getroot()
+    assert (suite_el.get("tests"), suite_el.get("failures")) == ("3", "1")
+    assert suite_el.find("testcase/failure").get("message") == "bad"
+
+
+def test_declared_data_and_no_cache_directives(tmp_path, monkeypatch):
+    suite, _ = make_suite(tmp_path, monkeypatch)
+    data = suite / "data.csv"
+    data.write_text("a,b\n", encoding="utf-8")
+    reads = suite / "d_reads_data.sup"
+    reads.write_text(
+        f'sup\n  note test: data data.csv\n  print read file of "{data}"\nbye\n',
+        encoding="utf-8",
+    )
+    (suite / "e_live.sup").write_text(
+        "sup\n  note test: no-cache\n  print 1\nbye\n", encoding="utf-8"
+    )
+    paths = tooling.discover([str(suite)])
+
+    def run():
+        cache = testrunner.ResultCache(testrunner.default_cache_path(str(suite)))
+        return [r.cached for r in testrunner.run_tests(paths, cache=cache)][3:]
+
+    assert run() == [False, False]
+    assert run() == [True, False]
+    data.write_text("a,b\n1,2\n", encoding="utf-8")
+    assert run() == [False, False]
+    assert run() == [True, False]
@@ -0,0 +1,36 @@
+import ast
+import contextlib
+import io
+import traceback
+
+import pytest
+from sup.parser import Parser
+from sup.transpiler import compile_program, to_python, to_python_module
+
+PROGRAM = """
+sup
+  define function called half with x
+    set y to 0
+    throw x
+  end function
+  set n to 4
+  print n
+  call half with n
+bye
+"""
+
+
+def test_traceback_points_at_sup_lines():
+    code = compile_program(Parser().parse(PROGRAM), "prog.sup")
+    with pytest.raises(Exception) as info:
+        with contextlib.redirect_stdout(io.StringIO()):
+            exec(code, {"__name__": "prog"})
+    frames = [(f.filename, f.lineno) for f in traceback.extract_tb(info.tb)]
+    assert frames[-2:] == [("prog.sup", 9), ("prog.sup", 5)]
+
+
+def test_unparsed_source_matches_module():
+    program = Parser().parse(PROGRAM)
+    module = to_python_module(program)
+    src = to_python(program)
+    assert ast.dump(ast.parse(src)) == ast.dump(module)
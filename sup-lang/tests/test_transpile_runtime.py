@@ -0,0 +1,135 @@
+import contextlib
+import io
+import runpy
+
+import pytest
+from sup.cli import run_source
+from sup.errors import SupRuntimeError
+from sup.parser import Parser
+from sup.transpiler import to_python
+
+
+def run_python(code, tmp_path):
+    path = tmp_path / "prog.py"
+    path.write_text(to_python(Parser().parse(code)), encoding="utf-8")
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        runpy.run_path(str(path))
+    return buf.getvalue()
+
+
+PROGRAM = """
+sup
+  write file of "data.txt" and "  alpha beta 42  "
+  set raw to read file of "data.txt"
+  set text to trim of raw
+  print text
+  print regex replace of "[0-9]+" and text and "N"
+  make list of "alpha", "beta"
+  set words to list
+  print join of "-" and words
+  print contains of words and "beta"
+  print min of 3 and 7
+  print floor of 7.9
+  make map
+  set "n" to 1 in map
+  set doc to json stringify of map
+  set back to json parse of doc
+  print get "n" from back
+  sqlite exec of "t.db" and "CREATE TABLE t (a INTEGER)"
+  sqlite exec of "t.db" and "INSERT INTO t VALUES (5)"
+  set rows to sqlite query of "t.db" and "SELECT a FROM t"
+  print rows
+  make list of 1, 2, 3
+  for each x in list
+    collect multiply x and x into squares
+  end for
+  print squares
+  print get 1 from squares
+  print basename of "/a/b/c.txt"
+  print power of 2 and 10
+bye
+""".strip()
+
+
+def test_transpiled_builtins_match_interpreter(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SUP_CAPS", "fs_write,sql")
+    expected = run_source(PROGRAM)
+    (tmp_path / "t.db").unlink()
+    assert run_python(PROGRAM, tmp_path) == expected
+
+
+def test_transpiled_code_keeps_capability_checks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SUP_CAPS", "fs_write")
+    code = 'sup\n  write file of "x.txt" and "hi"\nbye'
+    run_python(code, tmp_path)
+    (tmp_path / "x.txt").unlink()
+    # Capabilities granted to an earlier run do not carry over to the next one
+    monkeypatch.delenv("SUP_CAPS", raising=False)
+    monkeypatch.delenv("SUP_UNSAFE", raising=False)
+    with pytest.raises(SupRuntimeError) as ei:
+        run_python(code, tmp_path)
+    assert "fs_write" in str(ei.value)
+    assert not (tmp_path / "x.txt").exists()
+
+
+def test_transpiled_catch_binds_thrown_value(tmp_path):
+    code = """
+sup
+  try
+    make list of 1
+    print get 3 from list
+  catch e
+    print e
+  end try
+  try
+    throw 42
+  catch e
+    print e
+  end try
+bye
+""".strip()
+    assert run_python(code, tmp_path) == run_source(code)
+
+
+def test_main_variables_are_locals_unless_functions_read_them(tmp_path):
+    code = """
+sup
+  define function called scaled with x
+    return multiply x and factor
+  end function
+  set factor to 3
+  set i to 0
+  repeat 4 times
+    set i to add i and 1
+  end repeat
+  print call scaled with i
+bye
+""".strip()
+    py = to_python(Parser().parse(code))
+    assert "global factor" in py
+    assert "global i" not in py
+    assert "last_result" not in py.split("def __main__")[1]
+    assert run_python(code, tmp_path) == run_source(code)
+
+
+def test_last_result_kept_for_bare_print(tmp_path):
+    code = """
+sup
+  set x to add 2 and 3
+  print the result
+bye
+""".strip()
+    py = to_python(Parser().parse(code))
+    assert "last_result = x" in py
+    assert run_python(code, tmp_path) == run_source(code) == "5\n"
+
+
+def test_untyped_division_by_zero_is_a_sup_error(tmp_path):
+    code = "sup\n  set xs to make list of 1, 0\n  set b to get 1 from xs\n  print divide 1 by b\nbye"
+    assert "_rt.div(" in to_python(Parser().parse(code))
+    with pytest.raises(SupRuntimeError) as ei:
+        run_python(code, tmp_path)
+    assert ei.value.message == "Division by zero."
@@ -0,0 +1,70 @@
+from sup import ast as AST
+from sup.cli import run_source
+from sup.parser import Parser
+from sup.typecheck import annotate, check
+
+PROGRAM = """
+sup
+  define function called scale with x
+    return multiply x and 2
+  end function
+  set total to 0
+  set i to 0
+  while i is less than 5
+    set total to add total and call scale with i
+    set i to add i and 1
+  end while
+  set s to "3"
+  print add s and 1
+  print total
+  print divide 7 by 2
+bye
+"""
+
+
+def typed_lines(source):
+    program = Parser().parse(source)
+    annotate(program)
+    return {
+        (n.line, n.op): n.typed
+        for n in AST.walk(program)
+        if isinstance(n, AST.Binary)
+    }
+
+
+def test_numeric_operations_are_marked_typed():
+    marks = typed_lines(PROGRAM)
+    # x only ever receives ints, and function results are always numbers
+    assert marks[(4, "*")] and marks[(9, "+")] and marks[(10, "+")]
+    # s is a string: the generic path coerces it
+    assert not marks[(13, "+")]
+
+
+def test_typed_and_generic_paths_agree(monkeypatch):
+    monkeypatch.setenv("SUP_PY_CACHE", "0")
+    typed = run_source(PROGRAM)
+    assert typed == "4.0\n20.0\n3.5\n"
+    assert run_source(PROGRAM, backend="python") == typed
+    monkeypatch.setenv("SUP_TYPED", "0")
+    assert run_source(PROGRAM) == typed
+
+
+def test_check_reports_type_errors():
+    program = Parser().parse(
+        "sup\n"
+        "  make list of 1, 2\n"
+        "  print add list and 1\n"
+        "  define function called f with a\n"
+        "    return a\n"
+        "  end function\n"
+        "  print call f with 1 and 2\n"
+        "  print call g with 1\n"
+        "  print subtract \"abc\" from 3\n"
+        "bye\n"
+    )
+    assert [(i.line, i.code) for i in check(program)] == [
+        (3, "TYPE"),
+        (7, "ARITY"),
+        (8, "UNDEFINED"),
+        (9, "TYPE"),
+    ]
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""Measure cold start of a bundled program against the other ways to launch it.
+
+Generates a project with N imported modules, builds it, then times fresh
+processes running it: the interpreter, the loose transpiled files with no
+__pycache__ (every launch compiles them, as on a read-only install), the loose
+files with a warm __pycache__, and the zipapp from ``sup build --bundle``.
+Reports the median of several launches, next to a bare ``python -c pass``.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODULE = """sup
+  set base to {i}
+  define function called f{i} with x
+    if x is greater than {i}
+      return subtract {i} from x
+    end if
+    return add x and {i}
+  end function
+bye
+"""
+
+
+def launch(cmd: list[str], env: dict[str, str], cwd: str, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, env=env, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("-n", type=int, default=20, help="number of imported modules")
+    ap.add_argument("--runs", type=int, default=7)
+    args = ap.parse_args()
+
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "src")
+        os.makedirs(src)
+        lines = ["sup"]
+        for i in range(args.n):
+            with open(os.path.join(src, f"m{i}.sup"), "w", encoding="utf-8") as f:
+                f.write(MODULE.format(i=i))
+            lines += [f"  import m{i}", f"  print call m{i}.f{i} with {i + 1}"]
+        lines.append("bye")
+        entry = os.path.join(src, "main.sup")
+        with open(entry, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+        env = dict(os.environ, PYTHONPATH=repo, SUP_PATH=src, SUP_PY_CACHE="0")
+        out = os.path.join(tmp, "out")
+        app = os.path.join(tmp, "app.pyz")
+        subprocess.run(
+            [sys.executable, "-m", "sup.cli", "build", entry, "--out", out, "--bundle", app],
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        no_bytecode = dict(env, PYTHONDONTWRITEBYTECODE="1")
+        results = [
+            ("python -c pass", launch([sys.executable, "-c", "pass"], env, tmp, args.runs)),
+            (
+                "interpreter",
+                launch([sys.executable, "-m", "sup.cli", entry], env, tmp, args.runs),
+            ),
+            (
+                "loose .py, no cache",
+                launch([sys.executable, "run.py"], no_bytecode, out, args.runs),
+            ),
+        ]
+        launch([sys.executable, "run.py"], env, out, 1)  # populate __pycache__
+        results.append(
+            ("loose .py, __pycache__", launch([sys.executable, "run.py"], env, out, args.runs))
+        )
+        shutil.rmtree(os.path.join(out, "__pycache__"), ignore_errors=True)
+        # The bundle must not need the source tree or SUP_PATH
+        bare = {k: v for k, v in env.items() if k not in {"PYTHONPATH", "SUP_PATH"}}
+        results.append(("bundle .pyz", launch([sys.executable, app], bare, tmp, args.runs)))
+
+    for name, secs in results:
+        print(f"{name:24} {secs * 1000:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""Benchmark streaming CSV scans against the materializing `csv read`.
+
+Generates a CSV of the requested size (default 5 GB), then sums one column with
+`for each row in csv stream of ...` and reports wall time, throughput and peak RSS.
+Use `--compare` on small sizes to also time `csv read`, which loads every row.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS reports bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except Exception:
+        return float("nan")
+
+
+def generate(path: str, size_mb: int) -> int:
+    target = size_mb * 1024 * 1024
+    written = 0
+    rows = 0
+    line_tpl = "{0},name_{0},{1}.25,some free text column for padding\n"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("id,name,score,note\n")
+        chunk: list[str] = []
+        while written < target:
+            line = line_tpl.format(rows, rows % 97)
+            chunk.append(line)
+            written += len(line)
+            rows += 1
+            if len(chunk) >= 10000:
+                f.write("".join(chunk))
+                chunk.clear()
+        f.write("".join(chunk))
+    return rows
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--size-mb", type=int, default=5 * 1024)
+    ap.add_argument("--path", help="Reuse an existing CSV instead of generating one")
+    ap.add_argument("--compare", action="store_true", help="Also time csv read")
+    args = ap.parse_args()
+
+    from sup.cli import run_source
+
+    tmpdir = None
+    path = args.path
+    if path is None:
+        tmpdir = tempfile.mkdtemp(prefix="sup-bench-csv-")
+        path = os.path.join(tmpdir, "data.csv")
+        t0 = time.perf_counter()
+        rows = generate(path, args.size_mb)
+        print(f"generated {rows} rows in {time.perf_counter() - t0:.1f}s")
+    path_lit = path.replace("\\", "/")
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+
+    stream_src = f"""
+sup
+  make map
+  set "header" to 1 in map
+  set "types" to 1 in map
+  set "columns" to make list of "score" in map
+  set opts to map
+  set total to 0
+  for each row in csv stream of "{path_lit}" and opts
+    set s to get "score" from row
+    set total to add total and s
+  end for
+  print total
+bye
+"""
+    t0 = time.perf_counter()
+    out = run_source(stream_src)
+    dt = time.perf_counter() - t0
+    print(f"csv stream: {size_mb:.0f} MB in {dt:.2f}s ({size_mb / dt:.1f} MB/s), total={out.strip()}")
+    print(f"peak RSS after stream: {peak_rss_mb():.1f} MB")
+
+    if args.compare:
+        read_src = f"""
+sup
+  set rows to csv read of "{path_lit}"
+  print length of rows
+bye
+"""
+        t0 = time.perf_counter()
+        out = run_source(read_src)
+        dt = time.perf_counter() - t0
+        print(f"csv read:   {size_mb:.0f} MB in {dt:.2f}s, rows={out.strip()}")
+        print(f"peak RSS after read: {peak_rss_mb():.1f} MB")
+
+    if tmpdir is not None:
+        os.remove(path)
+        os.rmdir(tmpdir)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""Benchmark the pooled HTTP builtins against one-connection-per-call urllib.
+
+Starts a local keep-alive `http.server` stand-in and issues N GETs three ways:
+plain `urllib.request.urlopen` (the previous implementation), the sup runtime's
+`ConnectionPool` directly, and a sup program looping over `http get`.
+"""
+import argparse
+import os
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Header and body go out in separate writes; avoid Nagle + delayed-ACK stalls
+    disable_nagle_algorithm = True
+    body = b"x" * 512
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+
+def timed(label: str, n: int, fn) -> None:
+    t0 = time.perf_counter()
+    fn()
+    dt = time.perf_counter() - t0
+    print(f"{label:<10} {n} requests in {dt:.3f}s ({n / dt:.0f} req/s)")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("-n", type=int, default=2000)
+    args = ap.parse_args()
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{srv.server_address[1]}/"
+
+    from sup.cli import run_source
+    from sup.httpclient import ConnectionPool
+
+    def with_urllib() -> None:
+        for _ in range(args.n):
+            with urllib.request.urlopen(url, timeout=10) as r:
+                r.read()
+
+    pool = ConnectionPool()
+
+    def with_pool() -> None:
+        for _ in range(args.n):
+            pool.request("GET", url)
+
+    os.environ.setdefault("SUP_CAPS", "net")
+    src = f'sup\nrepeat {args.n} times\nset body to http get of "{url}"\nend repeat\nbye\n'
+
+    timed("urllib", args.n, with_urllib)
+    timed("pool", args.n, with_pool)
+    print(f"           pool opened {pool.connections_opened} connection(s)")
+    timed("sup", args.n, lambda: run_source(src))
+    pool.close()
+    srv.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
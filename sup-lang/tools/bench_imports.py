@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""Measure cold start of a program with many imports.
+
+Generates N modules that each do some top-level work, then runs a program that
+imports all of them but uses only one. Module caches are cleared before every
+run, and each configuration is timed: no prefetch, prefetch on threads,
+prefetch on processes, and lazy imports.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+MODULE = """sup
+  set total to 0
+  repeat {work} times
+    set total to add total and 1
+  end repeat
+{padding}
+  define function called ident
+    return {i}
+  end function
+bye
+"""
+
+PADDING = """  define function called helper{j} with a and b
+    if a is greater than b
+      return subtract b from a
+    end if
+    return add a and b
+  end function"""
+
+CONFIGS = [
+    ("eager", {"SUP_PREFETCH": "0"}),
+    ("prefetch/threads", {"SUP_PREFETCH": "threads"}),
+    ("prefetch/auto", {"SUP_PREFETCH": "auto"}),
+    ("prefetch/procs", {"SUP_PREFETCH": "processes"}),
+    ("lazy", {"SUP_LAZY_IMPORTS": "1"}),
+]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("-n", "--modules", type=int, default=50)
+    ap.add_argument("--work", type=int, default=2000, help="loop iterations per module")
+    ap.add_argument("--funcs", type=int, default=40, help="extra functions per module")
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    from sup import loader
+    from sup.cli import run_source
+
+    padding = "\n".join(PADDING.format(j=j) for j in range(args.funcs))
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(args.modules):
+            with open(os.path.join(tmp, f"mod{i}.sup"), "w", encoding="utf-8") as f:
+                f.write(MODULE.format(work=args.work, i=i, padding=padding))
+        imports = "\n".join(f"  import mod{i}" for i in range(args.modules))
+        src = f"sup\n{imports}\n  print call mod0.ident\nbye\n"
+        os.environ["SUP_PATH"] = tmp
+        for label, env in CONFIGS:
+            for key in ("SUP_PREFETCH", "SUP_LAZY_IMPORTS"):
+                os.environ.pop(key, None)
+            os.environ.update(env)
+            best = float("inf")
+            for _ in range(args.runs):
+                loader.clear_caches()
+                t0 = time.perf_counter()
+                run_source(src)
+                best = min(best, time.perf_counter() - t0)
+            print(f"{label:<17} {args.modules} imports: {best * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""Benchmark `for each ... in parallel` on a CPU-bound loop.
+
+Runs the same recursive-fib workload serially and with 1/2/4/8 worker
+processes, printing wall time and speedup over the serial loop.
+"""
+import argparse
+import time
+
+PROGRAM = """
+sup
+  define function called fib with n
+    if n is less than 2
+      return n
+    end if
+    set a to call fib with subtract 1 from n
+    set b to call fib with subtract 2 from n
+    return add a and b
+  end function
+  make list of {items}
+  for each n in list{mode}
+    collect call fib with n into results
+  end for
+  print length of results
+bye
+"""
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--items", type=int, default=16)
+    ap.add_argument("--depth", type=int, default=17)
+    args = ap.parse_args()
+
+    from sup.cli import run_source
+
+    items = ", ".join([str(args.depth)] * args.items)
+
+    def run(mode: str) -> float:
+        t0 = time.perf_counter()
+        run_source(PROGRAM.format(items=items, mode=mode).strip())
+        return time.perf_counter() - t0
+
+    base = run("")
+    print(f"serial     {base:.2f}s")
+    for w in (1, 2, 4, 8):
+        dt = run(f" in parallel with {w} workers")
+        print(f"{w} worker(s) {dt:.2f}s  ({base / dt:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
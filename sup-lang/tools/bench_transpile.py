@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Benchmark transpiled loops: globals + last_result stores versus locals-first.
+
+Transpiles the same loop-heavy program twice, once the old way (every assigned
+name global, every statement storing last_result) and once with locals-first
+code generation, then times both. Pass --interp to time the interpreter too.
+"""
+import argparse
+import contextlib
+import io
+import time
+
+PROGRAM = """
+sup
+  define function called step with x
+    return add x and 3
+  end function
+  set total to 0
+  set i to 0
+  make list
+  set xs to list
+  while i is less than {n}
+    set total to add total and i
+    set j to multiply i and 2
+    if j is greater than total
+      set total to subtract j from total
+    end if
+    set i to add i and 1
+  end while
+  repeat {calls} times
+    set total to call step with total
+  end repeat
+  print total
+bye
+"""
+
+
+def run(code: str) -> tuple[float, str]:
+    compiled = compile(code, "<bench>", "exec")
+    buf = io.StringIO()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(buf):
+        exec(compiled, {"__name__": "bench"})
+    return time.perf_counter() - t0, buf.getvalue()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("-n", type=int, default=2_000_000)
+    ap.add_argument("--calls", type=int, default=200_000)
+    ap.add_argument("--interp", action="store_true")
+    args = ap.parse_args()
+
+    from sup.cli import run_source
+    from sup.parser import Parser
+    from sup.transpiler import _PythonEmitter, compile_program, to_python
+
+    src = PROGRAM.format(n=args.n, calls=args.calls).strip()
+    program = Parser().parse(src)
+    before = _PythonEmitter(fast_locals=False).emit_program(program)
+    after = _PythonEmitter().emit_program(program)
+    t_before, out_before = run(before)
+    t_after, out_after = run(after)
+    assert out_before == out_after, (out_before, out_after)
+    print(f"globals      {t_before:.3f}s")
+    print(f"locals-first {t_after:.3f}s  ({t_before / t_after:.2f}x)")
+    reps = 200
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        compile(to_python(program), "<bench>", "exec")
+    t_text = (time.perf_counter() - t0) / reps
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        compile_program(program, "<bench>")
+    t_ast = (time.perf_counter() - t0) / reps
+    print(f"codegen via source {t_text * 1e3:.2f}ms")
+    print(f"codegen via ast    {t_ast * 1e3:.2f}ms  ({t_text / t_ast:.2f}x)")
+    if args.interp:
+        t0 = time.perf_counter()
+        run_source(src)
+        print(f"interpreter  {time.perf_counter() - t0:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())